@@ -0,0 +1,27 @@
+import cv2
+
+from postprocess import det_bbox
+
+# --- FRAME ANNOTATION ---
+# Shared by app.py, pi_navigator.py and benchmarks/replay_bench.py so the benchmark times the
+# exact drawing code the entry points run.
+
+
+def draw_primary(frame, det, caption, scale=1.0):
+    """App style: the primary object only, thick red box with its label and distance."""
+    x1, y1, x2, y2 = (int(v * scale) for v in det_bbox(det))
+    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), max(1, int(4 * scale)))
+    cv2.putText(frame, caption, (x1, y1 - int(10 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 255), max(1, int(3 * scale)))
+    return frame
+
+
+def draw_detections(frame, objs, names, sx=1.0, sy=1.0):
+    """Pi style: every object, red when it fills more than 40% of the frame."""
+    for o in objs:
+        x1, y1, x2, y2 = det_bbox(o)
+        x1, x2, y1, y2 = int(x1*sx), int(x2*sx), int(y1*sy), int(y2*sy)
+        color = (0, 255, 0) if o['area'] < 0.4 else (0, 0, 255)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, names[int(o['cls'])], (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return frame
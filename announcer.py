@@ -0,0 +1,230 @@
+import bisect
+from collections import namedtuple
+
+import numpy as np
+
+from languages import (LANGUAGES, NAV_BEHIND, NAV_BLOCKED, NAV_CLEAR, NAV_HINTS, NAV_LOOMING, NAV_SIDE, NAV_STOP,
+                       format_announcement, format_obstacle, translate_label)
+from postprocess import (CENTER, CLOSE, DIR_SPLIT, DIRECTIONS, DIST_LEVELS, DIST_THRESHOLDS, FAR, LEFT, VERY_CLOSE,
+                         primary_index, rank_order)
+from speech import INFO, URGENT, WARNING
+
+# --- ANNOUNCEMENTS ---
+# One event-driven announcement engine for app.py and pi_navigator.py. Each object's distance and
+# direction levels get hysteresis bands around the postprocess thresholds; the smoothed scene is
+# reduced to a small hashable "hazard picture"; phrases come from templates compiled once per
+# language. An event is emitted only when the picture changes (escalations at once, anything else
+# once it has settled), plus periodic repeats of an urgent picture.
+
+Announcement = namedtuple("Announcement", "text dist priority kind ts")
+
+DIST_BAND = 0.04   # of box height / frame height
+DIR_BAND = 0.04    # of box center x / frame width
+_DIST_ASC = tuple(sorted(DIST_THRESHOLDS))
+
+
+def _bucket(value, thresholds, current=None, band=0.0):
+    """Bucket of `value` among ascending thresholds; sticks to `current` until `band` past a boundary."""
+    raw = bisect.bisect_left(thresholds, value)
+    if current is None or raw == current:
+        return raw
+    if raw > current:
+        return max(current, bisect.bisect_left(thresholds, value - band))
+    return min(current, bisect.bisect_left(thresholds, value + band))
+
+
+def _priority(dist):
+    return URGENT if dist == VERY_CLOSE else (WARNING if dist == CLOSE else INFO)
+
+
+class AppPhrasebook:
+    """Caregiver-app phrases in one language: templates compiled once, rendered phrases cached."""
+
+    def __init__(self, language):
+        cfg = LANGUAGES[language]
+        self.language = language
+        self.templates = {(d, r): format_announcement("{label}", DIST_LEVELS[d], DIRECTIONS[r], cfg)
+                          for d in range(len(DIST_LEVELS)) for r in range(len(DIRECTIONS))}
+        self.fixed = {("obstacle", VERY_CLOSE): format_obstacle("VERY_CLOSE", cfg),
+                      ("obstacle", CLOSE): format_obstacle("CLOSE", cfg),
+                      ("clear",): cfg["clear"]}
+        self._labels = {}
+        self._phrases = {}
+
+    def label(self, cls, names):
+        text = self._labels.get(cls)
+        if text is None:
+            text = self._labels[cls] = translate_label(names[cls], self.language)
+        return text
+
+    def picture(self, dets, obstacle=None):
+        """(picture, dist level name, priority) for the primary object, else the obstacle, else clear."""
+        if len(dets):
+            p = dets[rank_order(dets)[0]]
+            d, r = int(p["dist"]), int(p["dir"])
+            return ("object", int(p["cls"]), d, r), DIST_LEVELS[d], _priority(d)
+        if obstacle:
+            d = DIST_LEVELS.index(obstacle)
+            return ("obstacle", d), obstacle, _priority(d)
+        return ("clear",), "FAR", INFO
+
+    def render(self, picture, names=None):
+        text = self._phrases.get(picture)
+        if text is None:
+            if picture[0] == "object":
+                _, cls, d, r = picture
+                text = self.templates[(d, r)].format(label=self.label(cls, names))
+            else:
+                text = self.fixed[picture]
+            self._phrases[picture] = text
+        return text
+
+
+class NavPhrasebook:
+    """Pi navigator cues (English): the largest object decides stop / blocked / side."""
+
+    def __init__(self):
+        self._phrases = {}
+        self._names = None
+
+    def picture(self, objs, behind=None, looming=False):
+        """`behind` (rear camera) and `looming` (short center TTC) replace informational cues only."""
+        picture, dist, priority = self._ahead(objs)
+        if priority == INFO and looming:
+            return ("looming",), "CLOSE", WARNING
+        if priority == INFO and behind is not None and len(behind):
+            near = behind[behind["dist"] <= CLOSE]
+            if len(near):
+                return ("behind", int(near[primary_index(near, by="area")]["cls"])), "CLOSE", WARNING
+        return picture, dist, priority
+
+    @staticmethod
+    def _ahead(objs):
+        if not len(objs):
+            return ("clear",), "FAR", INFO
+        primary = objs[primary_index(objs, by="area")]
+        cls, dist = int(primary["cls"]), DIST_LEVELS[primary["dist"]]
+        if primary["area"] > 0.4:
+            return ("stop", cls), dist, URGENT
+        if primary["dir"] == CENTER:
+            hint = 1 if (objs["dir"] == LEFT).any() else 0
+            return ("blocked", cls, hint), dist, WARNING
+        return ("side", cls, int(primary["dir"])), dist, INFO
+
+    def render(self, picture, names=None):
+        if names is not self._names:
+            self._names = names
+            self._phrases.clear()
+        text = self._phrases.get(picture)
+        if text is None:
+            kind = picture[0]
+            if kind == "clear":
+                text = NAV_CLEAR
+            elif kind == "looming":
+                text = NAV_LOOMING
+            elif kind == "stop":
+                text = NAV_STOP.format(label=names[picture[1]])
+            elif kind == "blocked":
+                text = NAV_BLOCKED.format(label=names[picture[1]], hint=NAV_HINTS[picture[2]])
+            elif kind == "side":
+                text = NAV_SIDE.format(label=names[picture[1]], zone=DIRECTIONS[picture[2]].lower())
+            else:
+                text = NAV_BEHIND.format(label=names[picture[1]])
+            self._phrases[picture] = text
+        return text
+
+
+class Announcer:
+    """
+    Turns per-frame detections into announcement events. update() returns an Announcement when
+    the hazard picture changed and None otherwise, so callers speak, vibrate and redraw only then.
+    """
+
+    def __init__(self, phrasebook, dir_split=DIR_SPLIT, dist_band=DIST_BAND, dir_band=DIR_BAND, settle=0.3,
+                 clear_after=1.5, min_gap=0.0, urgent_repeat=5.0, forget_after=1.0):
+        self.phrasebook = phrasebook
+        self.dir_split = tuple(dir_split)
+        self.dist_band = dist_band
+        self.dir_band = dir_band
+        self.settle = settle                # a non-escalating change must hold this long
+        self.clear_after = clear_after      # seconds without hazards before "clear"
+        self.min_gap = min_gap              # minimum seconds between non-escalating events
+        self.urgent_repeat = urgent_repeat  # an unchanged URGENT picture is repeated this often
+        self.forget_after = forget_after
+        self._objects = {}                  # object key -> [dist, dir, last seen]
+        self._picture = None
+        self._priority = INFO
+        self._pending = None                # (picture, first seen)
+        self._last_emit = 0.0
+        self._last_hazard = None
+        self.updates = 0
+        self.events = 0
+
+    def _keys(self, dets):
+        tids = dets["tid"]
+        if (tids >= 0).all():
+            return tids.tolist()
+        # Untracked (Pi): class plus left-to-right order within the class
+        keys, seen = [None] * len(dets), {}
+        for i in np.lexsort((dets["x1"] + dets["x2"], dets["cls"])):
+            if tids[i] >= 0:
+                keys[i] = int(tids[i])
+                continue
+            cls = int(dets["cls"][i])
+            keys[i] = ("cls", cls, seen.get(cls, 0))
+            seen[cls] = seen.get(cls, 0) + 1
+        return keys
+
+    def stabilize(self, dets, frame_w, frame_h, now):
+        """Copy of dets with distance and direction levels held by the hysteresis bands. Levels that
+        geometry does not explain (TTC boosts, side cameras) pass through unchanged."""
+        for key in [k for k, s in self._objects.items() if now - s[2] > self.forget_after]:
+            del self._objects[key]
+        if not len(dets):
+            return dets
+        out = dets.copy()
+        h_ratio = (dets["y2"] - dets["y1"]) / float(frame_h)
+        x_ratio = (dets["x1"] + dets["x2"]) * 0.5 / float(frame_w)
+        for i, key in enumerate(self._keys(dets)):
+            state = self._objects.get(key)
+            dist, direction = int(dets["dist"][i]), int(dets["dir"][i])
+            if dist == FAR - _bucket(h_ratio[i], _DIST_ASC):
+                current = None if state is None else FAR - state[0]
+                dist = FAR - _bucket(h_ratio[i], _DIST_ASC, current, self.dist_band)
+            if direction == _bucket(x_ratio[i], self.dir_split):
+                direction = _bucket(x_ratio[i], self.dir_split, None if state is None else state[1], self.dir_band)
+            out["dist"][i], out["dir"][i] = dist, direction
+            self._objects[key] = [dist, direction, now]
+        return out
+
+    def update(self, dets, frame_w, frame_h, now, names=None, **context):
+        """Feeds one frame. `context` goes to the phrasebook (obstacle=, behind=, looming=)."""
+        self.updates += 1
+        stable = self.stabilize(dets, frame_w, frame_h, now)
+        picture, dist, priority = self.phrasebook.picture(stable, **context)
+        if picture[0] != "clear":
+            self._last_hazard = now
+        elif self._last_hazard is not None and now - self._last_hazard < self.clear_after:
+            return None
+
+        if picture == self._picture:
+            self._pending = None
+            if priority == URGENT and now - self._last_emit >= self.urgent_repeat:
+                return self._emit(picture, dist, priority, now, names)
+            return None
+        if self._picture is None or priority < self._priority:
+            return self._emit(picture, dist, priority, now, names)
+        # Any other change has to hold for `settle` first (jitter, brief occlusions, id swaps)
+        if self._pending is None or self._pending[0] != picture:
+            self._pending = (picture, now)
+            return None
+        if now - self._pending[1] < self.settle or now - self._last_emit < self.min_gap:
+            return None
+        return self._emit(picture, dist, priority, now, names)
+
+    def _emit(self, picture, dist, priority, now, names):
+        self._picture, self._priority = picture, priority
+        self._pending = None
+        self._last_emit = now
+        self.events += 1
+        return Announcement(self.phrasebook.render(picture, names), dist, priority, picture[0], now)
@@ -1,12 +1,35 @@
 import streamlit as st
 import cv2
-import numpy as np
 import time
+import os
+import json
+import uuid
+import functools
 import streamlit.components.v1 as components
+import av # already loaded by streamlit_webrtc, so deferring it would save nothing
 from streamlit_webrtc import webrtc_streamer, RTCConfiguration, WebRtcMode
-from streamlit_autorefresh import st_autorefresh
-from ultralytics import YOLO
-import av
+
+from startup import StartupProfiler, ModelWarmup
+
+from languages import LANGUAGES
+from announcer import Announcer, AppPhrasebook
+from phrase_cache import APP_PHRASE_DIR, clip_path
+from cue_channel import CueEmitter, VIB_PATTERNS, start_cue_server
+from metrics import Metrics, MetricsExporter
+from inference_worker import InferenceWorker
+from batch_server import BatchInferenceServer
+from process_pool import ProcessInferencePool, default_workers
+from capture_budget import StreamBudget, LoadGovernor
+from foveate import Fovea
+from ttc import LoomingEstimator, raise_urgency, ttc_level
+from detectors import load_detector
+from preprocess import Preprocessor
+from tracker import Tracker
+from obstacle import ObstacleDetector
+from scheduler import InferenceScheduler
+from postprocess import (DIST_LEVELS, EMPTY_DETS, build_priority_table,
+                         process_boxes, rank_order)
+from annotate import draw_primary
 
 # --- HIGH CONTRAST ACCESSIBILITY UI CONFIG ---
 st.set_page_config(page_title="VisionAid", page_icon="👁️", layout="centered")
@@ -71,103 +94,19 @@ st.markdown("""
 
 
 # --- CONFIGURATIONS & STATE ---
-LANGUAGES = {
-    "English": {
-        "code": "en-US",
-        "warning": "Warning",
-        "ahead": "ahead",
-        "left": "on your left",
-        "right": "on your right",
-        "very_close": "very close",
-        "close": "close",
-        "nearby": "nearby",
-        "clear": "Path appears clear",
-        "dark": "Environment too dark",
-        "started": "VisionAid navigation started",
-        "obstacle": "Obstacle ahead",
-    },
-    "Tamil": {
-        "code": "ta-IN",
-        "warning": "எச்சரிக்கை",
-        "ahead": "முன்னால்",
-        "left": "இடதுபுறம்",
-        "right": "வலதுபுறம்",
-        "very_close": "மிக அருகில்",
-        "close": "அருகில்",
-        "nearby": "அண்மையில்",
-        "clear": "பாதை தெளிவாக உள்ளது",
-        "dark": "சூழல் மிகவும் இருட்டாக உள்ளது",
-        "started": "விஷன்எய்ட் தொடங்கியது",
-        "obstacle": "தடை முன்னால்",
-    },
-    "Hindi": {
-        "code": "hi-IN",
-        "warning": "चेतावनी",
-        "ahead": "आगे",
-        "left": "बाईं तरफ",
-        "right": "दाईं तरफ",
-        "very_close": "बहुत पास",
-        "close": "पास",
-        "nearby": "नज़दीक",
-        "clear": "रास्ता साफ है",
-        "dark": "वातावरण बहुत अंधेरा है",
-        "started": "VisionAid शुरू हो गया",
-        "obstacle": "बाधा आगे",
-    }
-}
-
-OBJECT_TRANSLATIONS = {
-    "Tamil": {
-        "person": "நபர்", "car": "கார்", "truck": "லாரி",
-        "bus": "பேருந்து", "motorcycle": "மோட்டார் சைக்கிள்",
-        "bicycle": "சைக்கிள்", "chair": "நாற்காலி",
-        "dining table": "மேசை", "bottle": "பாட்டில்",
-        "dog": "நாய்", "cat": "பூனை", "door": "கதவு",
-        "bed": "படுக்கை", "toilet": "கழிவறை",
-        "tv": "தொலைக்காட்சி", "laptop": "மடிக்கணினி",
-        "cell phone": "கைப்பேசி", "book": "புத்தகம்",
-        "clock": "கடிகாரம்", "cup": "கோப்பை",
-        "traffic light": "போக்குவரத்து விளக்கு",
-        "fire hydrant": "தீயணைப்பு குழாய்",
-        "stop sign": "நிறுத்த அடையாளம்",
-        "bench": "இருக்கை", "backpack": "பை",
-        "umbrella": "குடை", "handbag": "கைப்பை",
-        "suitcase": "பெட்டி", "sports ball": "பந்து",
-        "couch": "சோபா", "potted plant": "தாவரம்",
-        "sink": "கழுவுதொட்டி", "refrigerator": "குளிர்சாதனப்பெட்டி",
-        "scissors": "கத்தரிக்கோல்", "vase": "பூச்சட்டி",
-    },
-    "Hindi": {
-        "person": "व्यक्ति", "car": "कार", "truck": "ट्रक",
-        "bus": "बस", "motorcycle": "मोटरसाइकिल",
-        "bicycle": "साइकिल", "chair": "कुर्सी",
-        "dining table": "मेज़", "bottle": "बोतल",
-        "dog": "कुत्ता", "cat": "बिल्ली", "door": "दरवाज़ा",
-        "bed": "बिस्तर", "toilet": "शौचालय",
-        "tv": "टीवी", "laptop": "लैपटॉप",
-        "cell phone": "मोबाइल फ़ोन", "book": "किताब",
-        "clock": "घड़ी", "cup": "कप",
-        "traffic light": "ट्रैफ़िक लाइट",
-        "fire hydrant": "अग्निशमन यंत्र",
-        "stop sign": "रुकने का संकेत",
-        "bench": "बेंच", "backpack": "बैग",
-        "umbrella": "छाता", "handbag": "पर्स",
-        "suitcase": "सूटकेस", "sports ball": "गेंद",
-        "couch": "सोफ़ा", "potted plant": "पौधा",
-        "sink": "नल", "refrigerator": "फ्रिज",
-        "scissors": "कैंची", "vase": "फूलदान",
-    }
-}
-
 PRIORITY_OBJECTS = {"person", "car", "truck", "bus", "motorcycle", "bicycle", "chair", "stairs", "door"}
 
 if "last_spoken" not in st.session_state: st.session_state.last_spoken = ""
 if "last_speak_time" not in st.session_state: st.session_state.last_speak_time = 0
+if "announce_seq" not in st.session_state: st.session_state.announce_seq = 0
+if "push_failed" not in st.session_state: st.session_state.push_failed = False
+if "push_since" not in st.session_state: st.session_state.push_since = None
 if "last_dark_warn" not in st.session_state: st.session_state.last_dark_warn = 0
-if "frame_count" not in st.session_state: st.session_state.frame_count = 0
-if "det_count" not in st.session_state: st.session_state.det_count = 0
+if "metrics_snap" not in st.session_state: st.session_state.metrics_snap = None
 if "ui_msg" not in st.session_state: st.session_state.ui_msg = "START NAVIGATION to begin"
 if "ui_msg_class" not in st.session_state: st.session_state.ui_msg_class = "status-clear"
+if "cue_sid" not in st.session_state: st.session_state.cue_sid = uuid.uuid4().hex
+if "stream_playing" not in st.session_state: st.session_state.stream_playing = False
 
 # --- INJECT HAPTIC ARM BUTTON & POLLING LOOP ---
 components.html(f"""
@@ -187,8 +126,10 @@ components.html(f"""
         </div>
     </div>
     <script>
+    // Cue senders (polling iframes and the push client) write the pattern on the parent page
+    var P = window.parent.window;
     window.hapticsArmed = false;
-    window.currentVibrationPattern = [0];
+    P.currentVibrationPattern = P.currentVibrationPattern || [0];
     window.lastVibrationPattern = [0];
     window.lastVibrationTime = 0;
     document.getElementById('arm-btn').addEventListener('click', function() {{
@@ -200,10 +141,10 @@ components.html(f"""
     setInterval(function() {{
         if(!window.hapticsArmed || !navigator.vibrate) return;
         let now = Date.now();
-        if (JSON.stringify(window.currentVibrationPattern) !== JSON.stringify(window.lastVibrationPattern) || (now - window.lastVibrationTime) > 2000) {{
-             if (window.currentVibrationPattern.length > 0 && window.currentVibrationPattern[0] !== 0) {{
-                 navigator.vibrate(window.currentVibrationPattern);
-                 window.lastVibrationPattern = [...window.currentVibrationPattern];
+        if (JSON.stringify(P.currentVibrationPattern) !== JSON.stringify(window.lastVibrationPattern) || (now - window.lastVibrationTime) > 2000) {{
+             if (P.currentVibrationPattern.length > 0 && P.currentVibrationPattern[0] !== 0) {{
+                 navigator.vibrate(P.currentVibrationPattern);
+                 window.lastVibrationPattern = [...P.currentVibrationPattern];
                  window.lastVibrationTime = now;
              }}
         }}
@@ -227,21 +168,143 @@ Real-time navigation is currently running at optimized latency.
 st.sidebar.markdown("---")
 stats_placeholder = st.sidebar.empty()
 
+# --- PUSH CUE CHANNEL ---
+# Cues go from VideoProcessor to the browser over Server-Sent Events; the script no longer
+# reruns twice a second. Behind HTTPS/a proxy, set VISIONAID_CUE_URL to the proxied endpoint.
+# If the browser can't reach the channel (port not exposed, mixed content), the session falls
+# back to polling on its own: the hub never sees its EventSource connect or heart-beat.
+CUE_PORT = int(os.environ.get("VISIONAID_CUE_PORT", "8765"))
+CUE_PUBLIC_URL = os.environ.get("VISIONAID_CUE_URL", "")
+CUE_GRACE = 6.0        # s after the stream starts before a missing connection counts as failure
+CUE_CHECK_EVERY = 5.0  # s between connection checks while pushing
+
+@st.cache_resource
+def load_cue_channel():
+    if os.environ.get("VISIONAID_CUE_PUSH", "1") == "0":
+        return None
+    return start_cue_server(CUE_PORT)
+
+CUE_CHANNEL = load_cue_channel()
+CUE_HUB = CUE_CHANNEL[0] if CUE_CHANNEL else None
+use_push = CUE_HUB is not None and st.sidebar.toggle(
+    "Push cues (low latency)", value=True,
+    help="Turn off if cues stop arriving, e.g. when the cue port is blocked; falls back to 500 ms polling.")
+if use_push and st.session_state.push_failed:
+    st.sidebar.caption("Push cues are not reaching this browser (cue port blocked?); using 500 ms polling.")
+    use_push = False
+
+# --- CAREGIVER VIDEO MODE ---
+# "overlay" sends the camera frame back untouched and lets the browser draw the boxes from pushed
+# metadata; "reduced" annotates a downscaled frame and refreshes it every few frames only.
+VIEW_MODES = {"Annotated video": "annotated", "Browser overlay (lowest CPU)": "overlay", "Reduced caregiver view": "reduced"}
+REDUCED_SCALE = float(os.environ.get("VISIONAID_REDUCED_SCALE", "0.5"))
+REDUCED_EVERY = max(1, int(os.environ.get("VISIONAID_REDUCED_EVERY", "3")))
+OVERLAY_INTERVAL = 1 / 15
+
+view_mode = VIEW_MODES[st.sidebar.selectbox("Caregiver video", options=list(VIEW_MODES))]
+if view_mode == "overlay" and not use_push:
+    st.sidebar.caption("Browser overlay needs push cues; showing annotated video.")
+    view_mode = "annotated"
+
 # --- ML MODELS ---
-@st.cache_resource(show_spinner="Loading YOLOv8n model...")
-def load_yolo():
-    return YOLO("yolov8n.pt")
-
-try:
-    MODEL = load_yolo()
-except Exception as e:
-    st.error(f"Error loading models: {e}")
+APP_IMGSZ = 320
+# Foveated mode: a second same-size pass on a crop around the walking corridor (in-process path only)
+FOVEATED = os.environ.get("VISIONAID_FOVEATED", "0") == "1"
+# Optical-flow time to contact raises urgency between inference ticks
+USE_TTC = os.environ.get("VISIONAID_TTC", "1") == "1"
+
+@st.cache_resource
+def startup_profiler():
+    return StartupProfiler("web")
+
+STARTUP = startup_profiler()
+
+# One batching server per process: frames from every active session share each forward pass
+BATCH_MAX_SIZE = int(os.environ.get("VISIONAID_BATCH_MAX", "8"))
+BATCH_MAX_WAIT = float(os.environ.get("VISIONAID_BATCH_WAIT_MS", "15")) / 1000
+
+def build_runtime(model):
+    server = BatchInferenceServer(model, max_batch=BATCH_MAX_SIZE, max_wait=BATCH_MAX_WAIT, conf=0.70)
+    prio_table = build_priority_table(model.names, {label: 0 for label in PRIORITY_OBJECTS}, default=1)
+    return model, server, prio_table
+
+# The detector loads and warms up in the background while the page and camera come up;
+# inference workers wait on it, the UI does not
+@st.cache_resource
+def start_model_warmup():
+    # Benchmarks the installed backends once per host and caches the choice
+    return ModelWarmup(lambda: load_detector(imgsz=APP_IMGSZ), build=build_runtime, profiler=STARTUP)
+
+# Optional metrics export: JSON lines / Prometheus file and/or a /metrics endpoint
+@st.cache_resource
+def load_metrics_exporter():
+    path = os.environ.get("VISIONAID_METRICS_FILE")
+    port = int(os.environ.get("VISIONAID_METRICS_PORT", "0"))
+    return MetricsExporter(path=path, port=port) if path or port else None
+
+METRICS_EXPORTER = load_metrics_exporter()
+
+# Capture size and frame rate are negotiated per session from the host's decode budget
+@st.cache_resource
+def load_stream_budget():
+    return StreamBudget()
+
+CAPTURE_BUDGET = load_stream_budget()
+
+# Optional process-pool mode: detection (model + obstacle detector) runs in worker processes,
+# frames pass through shared memory and each session is pinned to one worker
+PROCESS_WORKERS = os.environ.get("VISIONAID_PROCESS_WORKERS", "0")
+
+@st.cache_resource
+def start_process_pool():
+    workers = default_workers() if PROCESS_WORKERS == "auto" else int(PROCESS_WORKERS)
+    return ProcessInferencePool(workers, imgsz=APP_IMGSZ, conf=0.70,
+                                priorities={label: 0 for label in PRIORITY_OBJECTS}, default_priority=1)
+
+POOL = start_process_pool() if PROCESS_WORKERS not in ("", "0") else None
+WARMUP = start_model_warmup() if POOL is None else None
+RUNTIME = POOL or WARMUP
+if RUNTIME.error is not None:
+    st.error(f"Error loading models: {RUNTIME.error}")
     st.stop()
+if not RUNTIME.ready:
+    st.sidebar.info("Warming up the detector...")
+
+def model_names():
+    return POOL.names if POOL is not None else WARMUP.model.names
     
 # --- HELPER FUNCTIONS ---
-def translate_label(label, language):
-    if language == "English": return label
-    return OBJECT_TRANSLATIONS.get(language, {}).get(label, label)
+# Shared by the polling fallback and the push client: plays the pre-rendered clip when there
+# is one, browser speech synthesis otherwise, and hands the vibration pattern to the haptic loop.
+CUE_PLAYER_JS = """
+function playCue(P, cue) {
+    if (P.currentVibrationPattern !== undefined) P.currentVibrationPattern = cue.vib;
+    function speakLive() {
+        var msg = new SpeechSynthesisUtterance(cue.text);
+        msg.lang = cue.code;
+        msg.rate = 1.0;
+        window.speechSynthesis.cancel();
+        window.speechSynthesis.speak(msg);
+    }
+    if (!cue.clip) { speakLive(); return; }
+    // Small LRU of decoded clips kept on the parent page across reruns
+    P.visionaidClips = P.visionaidClips || new Map();
+    var audio = P.visionaidClips.get(cue.clip) || new Audio(new URL(cue.clip, P.location.href).href);
+    P.visionaidClips.delete(cue.clip);
+    P.visionaidClips.set(cue.clip, audio);
+    if (P.visionaidClips.size > 32) P.visionaidClips.delete(P.visionaidClips.keys().next().value);
+    if (P.visionaidPlaying) P.visionaidPlaying.pause();
+    window.speechSynthesis.cancel();
+    audio.currentTime = 0;
+    P.visionaidPlaying = audio;
+    audio.play().catch(speakLive);
+}
+"""
+
+def clip_url(text, language):
+    # Pre-rendered clip (phrase_cache.py) when available, browser speech synthesis otherwise
+    clip = clip_path(text, language, APP_PHRASE_DIR)
+    return "app/" + clip.replace(os.sep, "/") if os.path.exists(clip) else ""
 
 def trigger_voice_and_haptic(text, dist_level="FAR"):
     # [FIX 5] Debounce optimization
@@ -257,77 +320,134 @@ def trigger_voice_and_haptic(text, dist_level="FAR"):
     st.session_state.last_spoken = text
     st.session_state.last_speak_time = now
     
-    # Haptic Pattern for JS
-    vib_pattern = "[150]"
-    if dist_level == "VERY_CLOSE": vib_pattern = "[100, 50, 100, 50, 100]"
-    elif dist_level == "CLOSE": vib_pattern = "[200, 100, 200]"
-    elif dist_level == "MEDIUM": vib_pattern = "[300]"
-    
+    cue = {"text": text, "code": lang_cfg["code"], "vib": VIB_PATTERNS.get(dist_level, [150]),
+           "clip": clip_url(text, selected_lang_name)}
     components.html(f"""
         <script>
-        if (window.parent.window.currentVibrationPattern !== undefined) {{
-            window.parent.window.currentVibrationPattern = {vib_pattern};
+        {CUE_PLAYER_JS}
+        playCue(window.parent.window, {json.dumps(cue)});
+        </script>
+    """, height=0)
+
+# Draws boxes (normalized to the frame) on a canvas laid over the WebRTC <video> element
+OVERLAY_JS = """
+var OVERLAY_COLORS = ['#DB4437', '#F4B400', '#0F9D58', '#888888'];
+function findVideo(P) {
+    if (P.visionaidVideo && P.visionaidVideo.isConnected) return P.visionaidVideo;
+    var frames = P.document.querySelectorAll('iframe');
+    for (var i = 0; i < frames.length; i++) {
+        try {
+            var v = frames[i].contentDocument.querySelector('video');
+            if (v) return (P.visionaidVideo = v);
+        } catch (e) {}
+    }
+    return null;
+}
+function drawOverlay(P, ev) {
+    var video = findVideo(P);
+    if (!video) return;
+    var doc = video.ownerDocument;
+    var canvas = doc.getElementById('visionaid-overlay');
+    if (!canvas) {
+        canvas = doc.createElement('canvas');
+        canvas.id = 'visionaid-overlay';
+        canvas.style.cssText = 'position:absolute;pointer-events:none;';
+        video.parentNode.style.position = 'relative';
+        video.parentNode.appendChild(canvas);
+    }
+    canvas.style.left = video.offsetLeft + 'px';
+    canvas.style.top = video.offsetTop + 'px';
+    canvas.width = video.clientWidth;
+    canvas.height = video.clientHeight;
+    var ctx = canvas.getContext('2d');
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    // <video> letterboxes like object-fit: contain
+    var vw = video.videoWidth || 1, vh = video.videoHeight || 1;
+    var s = Math.min(canvas.width / vw, canvas.height / vh);
+    var ox = (canvas.width - vw * s) / 2, oy = (canvas.height - vh * s) / 2;
+    ctx.font = 'bold 16px Inter, sans-serif';
+    ev.boxes.forEach(function(b, i) {
+        var x = ox + b[0] * vw * s, y = oy + b[1] * vh * s;
+        ctx.strokeStyle = ctx.fillStyle = i === 0 ? '#FF0000' : OVERLAY_COLORS[b[5]];
+        ctx.lineWidth = i === 0 ? 4 : 2;
+        ctx.strokeRect(x, y, (b[2] - b[0]) * vw * s, (b[3] - b[1]) * vh * s);
+        if (i === 0) ctx.fillText(b[4], x, Math.max(16, y - 6));
+    });
+}
+"""
+
+def inject_cue_client(sid):
+    """One EventSource per page: speaks cues, updates the status/stats panels and draws the overlay without reruns."""
+    url = CUE_PUBLIC_URL.rstrip("/") if CUE_PUBLIC_URL else ""
+    components.html(f"""
+        <script>
+        {CUE_PLAYER_JS}
+        {OVERLAY_JS}
+        var P = window.parent.window;
+        var base = {json.dumps(url)} || (P.location.protocol + '//' + P.location.hostname + ':{CUE_PORT}');
+        // The server answers 404 until this session's processor exists (and after it ended); EventSource
+        // gives up on that, so retry a few times
+        var tries = 0;
+        function connect() {{
+            var es = new EventSource(base + '/cues/{sid}');
+            es.onopen = function() {{ tries = 0; }};
+            es.onmessage = onCue;
+            es.onerror = function() {{
+                if (es.readyState === EventSource.CLOSED && ++tries <= 5) setTimeout(connect, 2000);
+            }};
         }}
-        var msg = new SpeechSynthesisUtterance('{text}');
-        msg.lang = '{lang_cfg["code"]}';
-        msg.rate = 1.0;
-        window.speechSynthesis.cancel();
-        window.speechSynthesis.speak(msg);
+        function onCue(e) {{
+            var ev = JSON.parse(e.data);
+            var doc = P.document;
+            if (ev.type === 'cue') {{
+                playCue(P, ev);
+                var status = doc.querySelector('.status-panel .status-text');
+                if (status) {{
+                    status.className = 'status-text ' + ev.ui_class;
+                    status.firstChild.textContent = ev.text.toUpperCase();
+                }}
+            }} else if (ev.type === 'stats') {{
+                var stats = doc.getElementById('visionaid-stats');
+                if (stats) stats.innerHTML = ev.html;
+            }} else if (ev.type === 'overlay') {{
+                drawOverlay(P, ev);
+            }}
+        }}
+        connect();
         </script>
     """, height=0)
 
-# [FIX 1] Drop MiDaS entirely and use lightweight detect_large_obstacle
-def detect_large_obstacle(frame_bgr):
-    """
-    Fast obstacle detection using contour area — no neural network.
-    Detects any large object in center zone occupying > 20% of frame area.
-    Takes < 5ms on CPU.
-    """
-    h, w = frame_bgr.shape[:2]
-    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (21, 21), 0)
-    edges = cv2.Canny(blurred, 30, 100)
-
-    # Center zone only
-    cx1, cx2 = int(w*0.25), int(w*0.75)
-    cy1, cy2 = int(h*0.15), int(h*0.85)
-    center_edges = edges[cy1:cy2, cx1:cx2]
-
-    contours, _ = cv2.findContours(center_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    center_area = (cx2-cx1) * (cy2-cy1)
-    total_contour_area = sum(cv2.contourArea(c) for c in contours if cv2.contourArea(c) > 500)
-    ratio = total_contour_area / center_area
-
-    if ratio > 0.45:   return "VERY_CLOSE"
-    elif ratio > 0.25: return "CLOSE"
-    return None
-
-def letterbox(image_bgr, target_size=320): # [FIX 3] Target 320
-    h, w = image_bgr.shape[:2]
-    scale = target_size / max(h, w)
-    new_w, new_h = int(w * scale), int(h * scale)
-    resized = cv2.resize(image_bgr, (new_w, new_h))
-    canvas = np.zeros((target_size, target_size, 3), dtype=np.uint8)
-    pad_x, pad_y = (target_size - new_w) // 2, (target_size - new_h) // 2
-    canvas[pad_y:pad_y+new_h, pad_x:pad_x+new_w] = resized
-    return canvas, scale, pad_x, pad_y
-
-def unletterbox_bbox(x1, y1, x2, y2, scale, pad_x, pad_y):
-    return (x1-pad_x)/scale, (y1-pad_y)/scale, (x2-pad_x)/scale, (y2-pad_y)/scale
-
-def estimate_distance(bbox_height, frame_height):
-    ratio = bbox_height / frame_height
-    if ratio > 0.60:   return "VERY_CLOSE"
-    elif ratio > 0.40: return "CLOSE"
-    elif ratio > 0.20: return "MEDIUM"
-    return "FAR"
-
-def classify_direction(bbox_center_x, frame_width):
-    ratio = bbox_center_x / frame_width
-    if ratio < 0.35: return "LEFT"
-    elif ratio > 0.65: return "RIGHT"
-    return "CENTER"
+STAT_STAGES = (("Preprocess", "preprocess"), ("Inference", "inference"), ("Postprocess", "postprocess"),
+               ("Obstacle", "obstacle"), ("Looming (TTC)", "ttc"), ("Annotate", "annotate"), ("Detection → cue", "detect_to_cue"))
+
+def format_stats(snap):
+    if not snap:
+        return "<b>Waiting for frames...</b>"
+    c = snap["counters"]
+    rows = [f"<b>Frames:</b> {c.get('frames', 0)} | <b>Detections:</b> {c.get('detections', 0)} | "
+            f"<b>Cues:</b> {c.get('announcements', 0)}",
+            f"<b>Dropped:</b> {c.get('frames_dropped', 0)} | <b>Stale:</b> {c.get('frames_stale', 0)} | "
+            f"<b>Skipped:</b> {c.get('frames_skipped', 0)}"]
+    for title, key in STAT_STAGES:
+        s = snap["stages"].get(key)
+        if s:
+            rate = f" @ {s['rate']:.1f} FPS" if key == "inference" else ""
+            rows.append(f"<b>{title}:</b> {s['p50']:.1f} / {s['p95']:.1f} ms{rate}")
+    if POOL is not None and POOL.ready and POOL.error is None:
+        rows.append(f"<b>Engine:</b> {POOL.name} × {POOL.workers} processes | "
+                    f"<b>Avg batch:</b> {POOL.avg_batch_size:.1f}")
+    elif WARMUP is not None and WARMUP.ready and WARMUP.error is None:
+        model, server, _ = WARMUP.result()
+        rows.append(f"<b>Engine:</b> {model.name} | <b>Avg batch:</b> {server.avg_batch_size:.1f}")
+    elif RUNTIME.error is not None:
+        rows.append("<b>Engine:</b> failed (see logs)")
+    else:
+        rows.append("<b>Engine:</b> warming up...")
+    g = snap["gauges"]
+    if "capture_fps" in g:
+        rows.append(f"<b>Capture:</b> {g['capture_width']}×{g['capture_height']} @ {g['capture_fps']} fps | "
+                    f"<b>Rate-limited:</b> {c.get('frames_rate_limited', 0)}")
+    return "<br>".join(rows) + "<br><span style='font-size: 0.8rem;'>stage times: p50 / p95</span>"
 
 def get_dist_class(dist_lvl):
     if dist_lvl == "VERY_CLOSE": return "dist-very-close"
@@ -342,116 +462,308 @@ def get_dir_icon(direction):
 
 # --- WEBRTC PROCESSOR ---
 class VideoProcessor:
-    def __init__(self):
+    def __init__(self, cue_sid=None, view_mode="annotated", capture_tier=0):
+        self.view_mode = view_mode   # updated from the script when the caregiver switches modes
         self.latest_announce = ""
         self.latest_dist = "FAR"
         self.total_frames = 0
         self.total_dets = 0
-        self.last_inference_time = 0 # [FIX 4]
-        self.last_results = []
-        self.empty_count = 0
+        self.last_results = EMPTY_DETS
+        self.stale_frames = 0
+        # Speaks only when the (hysteresis-smoothed) hazard picture changes
+        self.phrases = AppPhrasebook(selected_lang_name)
+        self.announcer = Announcer(self.phrases)
+        self.announce_seq = 0   # bumped per event, for the polling fallback
+        self.preproc = None   # sized from the loaded model (static exports only take their own imgsz)
+        self.tracker = Tracker()
+        self.obstacles = ObstacleDetector() # [FIX 1] Lightweight MiDaS replacement
+        self.pool_session = POOL.session() if POOL is not None else None
+        self.pool_obstacle = None   # obstacle level from the worker's last detection-free frame
+        self.foveated = FOVEATED and POOL is None
+        self.fovea = None   # built with the preprocessor, at the model's imgsz
+        self.looming = LoomingEstimator() if USE_TTC else None
+        self.scheduler = InferenceScheduler(base_interval=0.4) # [FIX 4] 400ms baseline, adapted per scene
+        # Inference runs off the WebRTC thread; recv only publishes frames and reads results
+        self.worker = InferenceWorker(self._run_inference, name="visionaid-inference")
+        # Cues are pushed as they happen; the caregiver stats at most once a second
+        self.cues = CueEmitter(CUE_HUB, cue_sid) if CUE_HUB is not None and cue_sid else None
+        self.last_stats_push = 0.0
+        self.last_detect_time = None
+        self.metrics = Metrics(labels={"app": "web", "session": (cue_sid or uuid.uuid4().hex)[:8]})
+        if METRICS_EXPORTER is not None:
+            METRICS_EXPORTER.register(id(self), self.metrics)
+        self.last_overlay_push = 0.0
+        self.overlay_shown = False
+        self.reduced_frame = None
+        self.reduced_tick = 0
+        # Server-side backpressure once the stream is running: decode smaller, process fewer frames
+        self.governor = LoadGovernor(start_tier=capture_tier)
+        self.rate_limited = 0
+        self.last_out = None
+        self._set_capture_gauges()
+        CAPTURE_BUDGET.register(id(self))
+
+    def _run_inference(self, item):
+        frame_bgr, captured_at = item
+        t0 = time.perf_counter()
+        if self.pool_session is not None:
+            # Preprocess, model, box decoding and the obstacle check all run in the worker process
+            with self.metrics.timer("inference"):
+                detections, self.pool_obstacle = self.pool_session.infer(frame_bgr)
+            with self.metrics.timer("postprocess"):
+                detections = self.tracker.update(detections, captured_at)
+        else:
+            model, server, prio_table = WARMUP.result() # returns at once after warm-up
+            if self.preproc is None:
+                self.preproc = Preprocessor(target_size=model.imgsz)
+                self.fovea = Fovea(model.imgsz) if self.foveated else None
+            orig_h, orig_w = frame_bgr.shape[:2]
+            # [FIX 3] Run inference at the model's imgsz (320 unless the export fixes it), preprocessed
+            # into this session's reusable tensor
+            with self.metrics.timer("preprocess"):
+                tensor, scale, pad_x, pad_y = self.preproc(frame_bgr)
+                crop = self.fovea.prepare(frame_bgr) if self.fovea is not None and self.fovea.due(frame_bgr) else None
+            with self.metrics.timer("inference"):
+                if crop is None:
+                    xyxy, cls, conf = server.infer(tensor)
+                else:
+                    # Both passes go to the batching server together and share one forward pass
+                    (xyxy, cls, conf), crop_out = server.infer_many([tensor, crop[0]])
+            with self.metrics.timer("postprocess"):
+                detections = process_boxes(xyxy, cls, conf, orig_w, orig_h, prio_table, scale, pad_x, pad_y)
+                if self.fovea is not None:
+                    if crop is not None:
+                        self.fovea.crop_boxes(*crop_out, orig_w, orig_h, prio_table, *crop[1:])
+                    detections = self.fovea.merge(detections)
+                detections = self.tracker.update(detections, captured_at)
+        self.scheduler.record_latency(time.perf_counter() - t0)
+        if not STARTUP.reported:
+            STARTUP.first_inference(time.perf_counter() - t0)
+        self.total_dets += len(detections)
+        self.last_detect_time = time.time()
+        return detections
+
+    @property
+    def dropped_frames(self):
+        return self.worker.frames_dropped
 
     def recv(self, frame):
-        frame_bgr = frame.to_ndarray(format="bgr24")
+        now = time.time()
+        t_in = time.perf_counter()
+        if not self.governor.admit(now):
+            self.rate_limited += 1
+            if self.view_mode == "overlay" or self.last_out is None:
+                return frame
+            return av.VideoFrame.from_ndarray(self.last_out, format="bgr24")
+        # Scale during the YUV -> BGR conversion instead of converting full size and resizing
+        w, h = self.governor.scaled_size(frame.width, frame.height)
+        if (w, h) != (frame.width, frame.height):
+            frame_bgr = frame.reformat(width=w, height=h, format="bgr24").to_ndarray()
+        else:
+            frame_bgr = frame.to_ndarray(format="bgr24")
         orig_h, orig_w = frame_bgr.shape[:2]
         self.total_frames += 1
         
-        now = time.time()
-        INFERENCE_INTERVAL = 0.4 # [FIX 4] 400ms interval
-        
-        if now - self.last_inference_time >= INFERENCE_INTERVAL:
-            # [FIX 3] Run inference at 320
-            lb_img, scale, pad_x, pad_y = letterbox(frame_bgr, target_size=320)
-            results = MODEL(lb_img, verbose=False, conf=0.70, imgsz=320)[0]
-            
-            detections = []
-            for box in results.boxes:
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                ux1, uy1, ux2, uy2 = unletterbox_bbox(x1, y1, x2, y2, scale, pad_x, pad_y)
-                cls_id = int(box.cls[0])
-                label_en = MODEL.names[cls_id]
-                dist = estimate_distance(uy2-uy1, orig_h)
-                direction = classify_direction((ux1+ux2)/2, orig_w)
-                
-                detections.append({
-                    "label": translate_label(label_en, selected_lang_name),
-                    "label_en": label_en,
-                    "dist": dist,
-                    "dir": direction,
-                    "bbox": (int(ux1), int(uy1), int(ux2), int(uy2)),
-                    "rank": (0 if label_en in PRIORITY_OBJECTS else 1, 
-                             0 if dist=="VERY_CLOSE" else (1 if dist=="CLOSE" else 2))
-                })
-            
-            self.last_results = detections
-            self.last_inference_time = now
-            self.total_dets += len(detections)
+        self.scheduler.observe_frame(frame_bgr)
+        if self.scheduler.due(now):
+            self.worker.publish((frame_bgr, now))
+
+        result_seq, _ = self.worker.latest()
+        if result_seq < self.worker.published_seq:
+            self.stale_frames += 1
+
+        # Between inference ticks, carry the tracked boxes forward to this frame
+        tracked = self.tracker.predict(now, orig_w, orig_h)
+        if self.looming is not None:
+            # Every frame: fast-approaching boxes get a closer distance level before ranking
+            with self.metrics.timer("ttc"):
+                _, box_ttc = self.looming.update(frame_bgr, now, tracked)
+                raise_urgency(tracked, box_ttc)
+        self.last_results = tracked[rank_order(tracked)] # primary first
         
         # UI logic using latest results (persistent display)
-        annotated_frame = frame_bgr.copy()
+        caption = None
+        names = obs_dist = None
         if len(self.last_results) > 0:
-            self.empty_count = 0
-            self.last_results.sort(key=lambda x: x["rank"])
+            names = model_names()
             primary = self.last_results[0]
-            plabel, pdist, pdir = primary["label"], primary["dist"], primary["dir"]
-            
-            px1, py1, px2, py2 = primary["bbox"]
-            cv2.rectangle(annotated_frame, (px1, py1), (px2, py2), (0, 0, 255), 4)
-            cv2.putText(annotated_frame, f"{plabel.upper()} {pdist}", (px1, py1 - 10), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
-            
-            # Formulate announce string
-            if pdist == "VERY_CLOSE" and pdir == "CENTER":
-                self.latest_announce = f"{lang_cfg['warning']}! {plabel} {lang_cfg['ahead']}, {lang_cfg['very_close']}"
-            elif pdist == "FAR" and pdir == "CENTER":
-                self.latest_announce = f"{plabel} {lang_cfg['ahead']}"
-            else:
-                dir_str = lang_cfg["left"] if pdir == "LEFT" else (lang_cfg["right"] if pdir == "RIGHT" else lang_cfg["ahead"])
-                dist_str = lang_cfg["very_close"] if pdist == "VERY_CLOSE" else (lang_cfg["close"] if pdist == "CLOSE" else (lang_cfg["nearby"] if pdist == "MEDIUM" else ""))
-                self.latest_announce = f"{plabel} {dir_str}, {dist_str}".strip(", ")
-            self.latest_dist = pdist
+            caption = f"{self.phrases.label(int(primary['cls']), names).upper()} {DIST_LEVELS[primary['dist']]}"
+            self.scheduler.update_hazard(self.last_results)
             
         else: # No YOLO detections
             # [FIX 1] Fast obstacle detection proxy
-            obs_dist = detect_large_obstacle(frame_bgr)
-            if obs_dist:
-                self.empty_count = 0
-                dist_str = lang_cfg["very_close"] if obs_dist == "VERY_CLOSE" else lang_cfg["close"]
-                self.latest_announce = f"{lang_cfg['warning']}! {lang_cfg['obstacle']}, {dist_str}"
-                self.latest_dist = obs_dist
+            if self.pool_session is not None:
+                obs_dist = self.pool_obstacle
             else:
-                self.empty_count += 1
-                if self.empty_count >= 10:
-                    self.latest_announce = lang_cfg["clear"]
-                    self.latest_dist = "FAR"
+                with self.metrics.timer("obstacle"):
+                    obs_dist = self.obstacles(frame_bgr)
+            looming = ttc_level(self.looming.center_ttc) if self.looming is not None else None
+            if looming is not None and (obs_dist is None or looming < DIST_LEVELS.index(obs_dist)):
+                obs_dist = DIST_LEVELS[looming]
+            self.scheduler.update_hazard(self.last_results, obs_dist)
+
+        # Announce string: only rebuilt and sent when the announcer reports a change
+        with self.metrics.timer("announce"):
+            event = self.announcer.update(self.last_results, orig_w, orig_h, now, names=names, obstacle=obs_dist)
+        if event is not None:
+            self.latest_announce, self.latest_dist = event.text, event.dist
+            self.announce_seq += 1
+            if self.cues is not None:
+                self._push_cue(event, now)
+        if now - self.last_stats_push >= 1.0:
+            self.last_stats_push = now
+            self._update_counters()
+            if self.cues is not None:
+                self.cues.send("stats", html=format_stats(self.metrics.snapshot()))
             
-        return av.VideoFrame.from_ndarray(annotated_frame, format="bgr24")
+        out = self._render(frame, frame_bgr, caption, now)
+        if self.governor.update(now, time.perf_counter() - t_in):
+            self._set_capture_gauges()
+        return out
+
+    def _set_capture_gauges(self):
+        w, h, fps = self.governor.target
+        self.metrics.set_gauge("capture_width", w)
+        self.metrics.set_gauge("capture_height", h)
+        self.metrics.set_gauge("capture_fps", fps)
+
+    def _update_counters(self):
+        m = self.metrics
+        m.set_counter("frames", self.total_frames)
+        m.set_counter("detections", self.total_dets)
+        m.set_counter("frames_dropped", self.dropped_frames)
+        m.set_counter("frames_stale", self.stale_frames)
+        m.set_counter("frames_skipped", self.scheduler.skipped)
+        m.set_counter("frames_rate_limited", self.rate_limited)
+        m.set_counter("announcements", self.announcer.events)
+        if self.fovea is not None:
+            m.set_counter("fovea_runs", self.fovea.runs)
+            m.set_counter("fovea_reused", self.fovea.reused)
+
+    def stats_snapshot(self):
+        self._update_counters()
+        return self.metrics.snapshot()
+
+    def _render(self, frame, frame_bgr, caption, now):
+        mode = self.view_mode
+        if mode == "overlay" and self.cues is not None:
+            # No copy, no drawing, no new frame: the browser draws from the pushed metadata
+            if now - self.last_overlay_push >= OVERLAY_INTERVAL:
+                self.last_overlay_push = now
+                self._push_overlay(frame_bgr.shape, caption)
+            return frame
+        if self.overlay_shown:
+            self.cues.send("overlay", boxes=[])
+            self.overlay_shown = False
+
+        t0 = time.perf_counter()
+        if mode == "reduced":
+            self.reduced_tick += 1
+            if self.reduced_frame is not None and self.reduced_tick % REDUCED_EVERY:
+                self.last_out = self.reduced_frame
+                out = av.VideoFrame.from_ndarray(self.reduced_frame, format="bgr24")
+                self.metrics.add("annotate", time.perf_counter() - t0)
+                return out
+            h, w = frame_bgr.shape[:2]
+            scale = REDUCED_SCALE
+            out = cv2.resize(frame_bgr, (max(1, int(w * scale)), max(1, int(h * scale))),
+                             interpolation=cv2.INTER_AREA)
+        else:
+            scale = 1.0
+            out = frame_bgr.copy() # frame_bgr may still be in the inference worker's hands
+        if caption:
+            draw_primary(out, self.last_results[0], caption, scale)
+        if mode == "reduced":
+            self.reduced_frame = out
+        self.last_out = out
+        out = av.VideoFrame.from_ndarray(out, format="bgr24")
+        self.metrics.add("annotate", time.perf_counter() - t0)
+        return out
+
+    def _push_overlay(self, shape, caption):
+        h, w = shape[:2]
+        dets = self.last_results
+        boxes = [[round(float(d["x1"]) / w, 4), round(float(d["y1"]) / h, 4),
+                  round(float(d["x2"]) / w, 4), round(float(d["y2"]) / h, 4),
+                  caption if i == 0 else "", int(d["dist"])] for i, d in enumerate(dets)]
+        if boxes or self.overlay_shown:
+            self.cues.send("overlay", boxes=boxes)
+        self.overlay_shown = bool(boxes)
+
+    def _push_cue(self, event, now):
+        sent = self.cues.emit(event.text, event.dist, code=lang_cfg["code"],
+                              clip=clip_url(event.text, selected_lang_name),
+                              ui_class=get_dist_class(event.dist))
+        if sent and event.kind == "object" and self.last_detect_time:
+            self.metrics.add("detect_to_cue", now - self.last_detect_time)
+
+    def on_ended(self):
+        self.worker.stop()
+        CAPTURE_BUDGET.unregister(id(self))
+        if self.pool_session is not None:
+            self.pool_session.close()
+        if METRICS_EXPORTER is not None:
+            METRICS_EXPORTER.unregister(id(self))
+        if self.cues is not None:
+            self.cues.close()
 
 # --- MAIN UI ---
 st.markdown("<h1>VisionAid</h1>", unsafe_allow_html=True)
 st.markdown("<p class='caregiver-subtitle'>👁 CAREGIVER VIEW — Optimized Performance</p>", unsafe_allow_html=True)
 
+# Re-negotiated only while stopped: constraints take effect when the stream starts, and a running
+# stream keeps its own (its processor adapts on the server side instead)
+if not st.session_state.stream_playing:
+    st.session_state.capture_tier = CAPTURE_BUDGET.start_tier()
+capture_tier = st.session_state.capture_tier
+
 webrtc_ctx = webrtc_streamer(
     key="visionaid",
     mode=WebRtcMode.SENDRECV,
     rtc_configuration=RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}),
-    video_processor_factory=VideoProcessor,
-    media_stream_constraints={"video": {"facingMode": "environment"}, "audio": False},
+    video_processor_factory=functools.partial(VideoProcessor, st.session_state.cue_sid, view_mode, capture_tier),
+    media_stream_constraints=CAPTURE_BUDGET.constraints(capture_tier),
     async_processing=False,
 )
 
-if webrtc_ctx.state.playing:
-    st_autorefresh(interval=500, key="voice_trigger_loop") # [FIX 4] 500ms polling
+st.session_state.stream_playing = webrtc_ctx.state.playing
+if webrtc_ctx.video_processor:
+    webrtc_ctx.video_processor.view_mode = view_mode
+
+push_live = webrtc_ctx.state.playing and use_push
+if push_live:
+    # The page can't report a blocked EventSource to the server, but the hub knows whether this
+    # session's connection ever opened and is still heart-beating
+    if st.session_state.push_since is None:
+        st.session_state.push_since = time.time()
+    elif (time.time() - st.session_state.push_since > CUE_GRACE
+          and not CUE_HUB.connected(st.session_state.cue_sid)):
+        print("[WARN] Push cue channel not reachable from the browser; falling back to polling")
+        st.session_state.push_failed = True
+        push_live = False
+elif not webrtc_ctx.state.playing:
+    st.session_state.push_since = None
+
+if push_live:
+    inject_cue_client(st.session_state.cue_sid)
+    from streamlit_autorefresh import st_autorefresh
+    st_autorefresh(interval=int(CUE_CHECK_EVERY * 1000), key="cue_health_check")
+elif webrtc_ctx.state.playing:
+    from streamlit_autorefresh import st_autorefresh
+    st_autorefresh(interval=500, key="voice_trigger_loop") # [FIX 4] 500ms polling fallback
     if webrtc_ctx.video_processor:
         proc = webrtc_ctx.video_processor
         if proc.latest_announce:
-            st.session_state.frame_count = proc.total_frames
-            st.session_state.det_count = proc.total_dets
-            trigger_voice_and_haptic(proc.latest_announce, proc.latest_dist)
+            st.session_state.metrics_snap = proc.stats_snapshot()
+            if proc.announce_seq != st.session_state.announce_seq:
+                st.session_state.announce_seq = proc.announce_seq
+                trigger_voice_and_haptic(proc.latest_announce, proc.latest_dist)
             st.session_state.ui_msg = proc.latest_announce.upper()
             st.session_state.ui_msg_class = get_dist_class(proc.latest_dist)
 
-stats_placeholder.markdown(f"**Frames:** {st.session_state.frame_count} | **Detections:** {st.session_state.det_count}")
+stats_placeholder.markdown(
+    f"<div id='visionaid-stats'>{format_stats(st.session_state.metrics_snap)}</div>",
+    unsafe_allow_html=True)
 
 st.markdown(f"""
     <div class="status-panel">
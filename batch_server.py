@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+
+class BatchInferenceServer:
+    """
+    Shares one detector backend between all sessions by batching their requests.
+    Frames submitted within `max_wait` seconds of the first queued frame (up to `max_batch`)
+    go through a single forward pass, and each caller gets its own (xyxy, cls, conf) back.
+    Submitted images are preprocessed (1, 3, H, W) tensors from preprocess.Preprocessor; they are
+    copied on submit, so callers may reuse their buffers as soon as submit() returns.
+    """
+
+    def __init__(self, detector, max_batch=8, max_wait=0.015, **predict_kwargs):
+        self.detector = detector
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait))
+        self.predict_kwargs = predict_kwargs
+        self._queue = queue.Queue()
+        self._running = True
+
+        # Stats
+        self.batches_run = 0
+        self.frames_run = 0
+        self.last_batch_size = 0
+        self.last_batch_latency = 0.0
+
+        self._thread = threading.Thread(target=self._loop, name="batch-inference", daemon=True)
+        self._thread.start()
+
+    @property
+    def avg_batch_size(self):
+        return self.frames_run / self.batches_run if self.batches_run else 0.0
+
+    def submit(self, image):
+        """Queues one image and returns a Future resolving to its detections."""
+        fut = Future()
+        # Copy: a batch may still be reading this request after the caller timed out
+        self._queue.put((np.array(image, copy=True), fut))
+        return fut
+
+    def infer(self, image, timeout=5.0):
+        """Blocking convenience wrapper around submit()."""
+        fut = self.submit(image)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            # Drop the request if no batch has picked it up yet (its image is a private copy)
+            fut.cancel()
+            raise
+
+    def infer_many(self, images, timeout=5.0):
+        """Submits several images together, so they share a forward pass, and waits for all."""
+        futs = [self.submit(image) for image in images]
+        try:
+            return [fut.result(timeout=timeout) for fut in futs]
+        except FutureTimeout:
+            for fut in futs:
+                fut.cancel()
+            raise
+
+    def _collect(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while self._running:
+            batch = self._collect()
+            if batch is None:
+                break
+            # Drop requests whose callers already gave up
+            batch = [(img, fut) for img, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                images = [img for img, _ in batch]
+                stacked = images[0] if len(images) == 1 else np.concatenate(images)
+                results = self.detector.predict(stacked, **self.predict_kwargs)
+                for (_, fut), res in zip(batch, results):
+                    fut.set_result(res)
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+            self.last_batch_latency = time.perf_counter() - t0
+            self.last_batch_size = len(batch)
+            self.batches_run += 1
+            self.frames_run += len(batch)
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        self._queue.put(None)
+        self._thread.join(timeout)
@@ -0,0 +1,66 @@
+"""
+Benchmark: per-call cost of the original full-frame detect_large_obstacle vs. ObstacleDetector
+at 480p, 720p and 1080p. Uses synthetic frames with a large rectangle in the center zone.
+Fails if the detector's raw ratio or (settled) verdict differs from the original's.
+Run from the repo root:  python benchmarks/bench_obstacle.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from obstacle import detect_large_obstacle, ObstacleDetector  # noqa: E402
+
+
+def synthetic_frame(h, w, rng):
+    frame = rng.integers(40, 80, (h, w, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (9, 9), 0)
+    cv2.rectangle(frame, (int(w*0.3), int(h*0.2)), (int(w*0.7), int(h*0.8)), (200, 200, 200), -1)
+    return frame
+
+
+def original_ratio(frame):
+    """detect_large_obstacle's fill ratio (it only returns the level)."""
+    h, w = frame.shape[:2]
+    edges = cv2.Canny(cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (21, 21), 0), 30, 100)
+    cx1, cx2, cy1, cy2 = int(w*0.25), int(w*0.75), int(h*0.15), int(h*0.85)
+    contours, _ = cv2.findContours(edges[cy1:cy2, cx1:cx2], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return sum(cv2.contourArea(c) for c in contours if cv2.contourArea(c) > 500) / ((cx2-cx1) * (cy2-cy1))
+
+
+def time_per_call(fn, frame, iters):
+    fn(frame)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn(frame)
+    return (time.perf_counter() - t0) * 1000 / iters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Obstacle detector benchmark")
+    parser.add_argument("--iters", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    mismatches = []
+    print(f"{'input':>10} | {'original ms':>11} | {'detector ms':>11} | {'speedup':>7} | result (orig / new)")
+    for name, (h, w) in [("480p", (480, 640)), ("720p", (720, 1280)), ("1080p", (1080, 1920))]:
+        frame = synthetic_frame(h, w, rng)
+        det = ObstacleDetector()
+        orig_ms = time_per_call(detect_large_obstacle, frame, args.iters)
+        new_ms = time_per_call(det, frame, args.iters)
+        # The timing loop has settled the detector's smoothing on this frame
+        orig, new = detect_large_obstacle(frame), det(frame)
+        print(f"{name:>10} | {orig_ms:11.3f} | {new_ms:11.3f} | {orig_ms / new_ms:6.1f}x | {orig} / {new}")
+        if orig != new or abs(det.raw_ratio(frame) - original_ratio(frame)) > 1e-6:
+            mismatches.append(name)
+    if mismatches:
+        sys.exit(f"[ERROR] ObstacleDetector disagrees with detect_large_obstacle at {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Microbenchmark: letterbox() + model-side preprocessing vs. the reusable Preprocessor.
+
+The "baseline" path reproduces what happened before: letterbox() allocates a fresh canvas,
+then the model letterboxes again and converts BGR->RGB, HWC->CHW and uint8->float itself.
+Run from the repo root:  python benchmarks/bench_preprocess.py
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocess import letterbox, Preprocessor  # noqa: E402
+
+
+def model_side_preprocess(canvas, imgsz):
+    """Mirrors Ultralytics' numpy-input path: letterbox to imgsz, BGR->RGB, CHW, /255."""
+    h, w = canvas.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    im = cv2.resize(canvas, (new_w, new_h)) if (new_w, new_h) != (w, h) else canvas
+    dw, dh = imgsz - new_w, imgsz - new_h
+    im = cv2.copyMakeBorder(im, dh // 2, dh - dh // 2, dw // 2, dw - dw // 2,
+                            cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    im = np.stack([im])[..., ::-1].transpose(0, 3, 1, 2)
+    im = np.ascontiguousarray(im)
+    return im.astype(np.float32) / 255.0
+
+
+def baseline(frame, imgsz):
+    canvas, _, _, _ = letterbox(frame, target_size=imgsz)
+    return model_side_preprocess(canvas, imgsz)
+
+
+def run(fn, frames, iters):
+    # Warm-up, then timing
+    for f in frames[:5]:
+        fn(f)
+    t0 = time.perf_counter()
+    for i in range(iters):
+        fn(frames[i % len(frames)])
+    ms = (time.perf_counter() - t0) * 1000 / iters
+
+    tracemalloc.start()
+    for i in range(20):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn(frames[i % len(frames)])
+        _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ms, peak - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing microbenchmark")
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--iters", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'input':>10} | {'baseline ms':>11} | {'reuse ms':>8} | {'baseline alloc':>14} | {'reuse alloc':>11}")
+    for h, w in [(480, 640), (720, 1280), (1080, 1920)]:
+        frames = [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(4)]
+        pre = Preprocessor(target_size=args.imgsz)
+        b_ms, b_alloc = run(lambda f: baseline(f, args.imgsz), frames, args.iters)
+        r_ms, r_alloc = run(pre, frames, args.iters)
+        print(f"{f'{w}x{h}':>10} | {b_ms:11.3f} | {r_ms:8.3f} | {b_alloc/1024:11.1f} KB | {r_alloc/1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
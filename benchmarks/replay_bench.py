@@ -0,0 +1,264 @@
+"""
+Offline replay benchmark: runs a video file or synthetic frames through the same per-frame
+code paths as app.py (VideoProcessor.recv) and pi_navigator.py (NavigatorPi.run), without a
+camera, browser, network or speech, and reports per-stage latency.
+
+    python benchmarks/replay_bench.py --video walk.mp4 --profile pi --out results.json
+    python benchmarks/replay_bench.py --synthetic 300 --backend none          # everything but the model
+    python benchmarks/replay_bench.py --video walk.mp4 --compare baseline.json # exit 1 on regression
+
+Stages: decode, preprocess (letterbox + tensor), inference, postprocess (box decoding, tracking,
+ranking), ttc (optical-flow time to contact, every frame), obstacle, annotate, announce. Inference runs on every frame so each stage has a sample
+per frame (the live apps skip frames via InferenceScheduler).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from annotate import draw_primary, draw_detections  # noqa: E402
+from capture import SyntheticSource, VideoFileSource  # noqa: E402
+from detectors import BACKENDS, COCO_NAMES, load_detector  # noqa: E402
+from foveate import Fovea  # noqa: E402
+from announcer import Announcer, AppPhrasebook, NavPhrasebook  # noqa: E402
+from obstacle import ObstacleDetector  # noqa: E402
+from postprocess import DIST_LEVELS, build_priority_table, process_boxes, rank_order  # noqa: E402
+from preprocess import Preprocessor  # noqa: E402
+from tracker import Tracker  # noqa: E402
+from ttc import LoomingEstimator, raise_urgency, ttc_level  # noqa: E402
+
+STAGES = ("decode", "preprocess", "inference", "postprocess", "ttc", "obstacle", "annotate", "announce")
+
+# Per-entry-point settings, as in app.py / pi_navigator.py
+PROFILES = {
+    "app": {"imgsz": 320, "conf": 0.70, "dir_split": (0.35, 0.65)},
+    "pi": {"imgsz": 320, "conf": 0.45, "dir_split": (1/3, 2/3)},
+}
+APP_PRIORITY = {"person", "car", "truck", "bus", "motorcycle", "bicycle", "chair", "stairs", "door"}
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = {s: [] for s in STAGES}
+
+    def time(self, stage, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        self.samples[stage].append(time.perf_counter() - t0)
+        return out
+
+    def summary(self):
+        out = {}
+        for stage, samples in self.samples.items():
+            if not samples:
+                continue
+            ms = np.array(samples) * 1000
+            out[stage] = {"n": len(ms), "mean_ms": round(float(ms.mean()), 3),
+                          "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                          "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                          "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                          "max_ms": round(float(ms.max()), 3)}
+        return out
+
+
+def looming_step(looming, frame, dets):
+    """As in VideoProcessor.recv / NavigatorPi: raise fast-approaching boxes, return the center zone's level."""
+    center_ttc, box_ttc = looming.update(frame, time.time(), dets)
+    return ttc_level(center_ttc), raise_urgency(dets, box_ttc)
+
+
+def replay(source, model, profile, max_frames, warmup, foveated=False, ttc=True):
+    cfg = PROFILES[profile]
+    names = model.names if model is not None else COCO_NAMES
+    imgsz = model.imgsz if model is not None else cfg["imgsz"]
+    preproc = Preprocessor(target_size=imgsz)
+    tracker = Tracker(dir_split=cfg["dir_split"])
+    obstacles = ObstacleDetector()
+    fovea = Fovea(imgsz, dir_split=cfg["dir_split"]) if foveated else None
+    looming = LoomingEstimator(dir_split=cfg["dir_split"]) if ttc else None
+    if profile == "app":
+        prio = build_priority_table(names, {label: 0 for label in APP_PRIORITY}, default=1)
+        phrases = AppPhrasebook("English")
+        announcer = Announcer(phrases, dir_split=cfg["dir_split"])
+    else:
+        from pi_navigator import PRIORITIES
+        prio = build_priority_table(names, PRIORITIES, default=3)
+        announcer = Announcer(NavPhrasebook(), dir_split=cfg["dir_split"])
+
+    timer = StageTimer()
+    frames = 0
+    t_start = None
+    while frames < max_frames + warmup:
+        if frames == warmup:
+            timer = StageTimer()
+            t_start = time.perf_counter()
+        item = timer.time("decode", source.read)
+        if item is None:
+            timer.samples["decode"].pop()   # end-of-stream read
+            break
+        frame, infer_frame = item
+        h, w = infer_frame.shape[:2]
+
+        def prep():
+            # As on the Pi: crop the display frame, boxes come back in infer_frame coordinates
+            crop = fovea.prepare(frame, out_w=w) if fovea is not None and fovea.due(frame) else None
+            return preproc(infer_frame), crop
+        (tensor, scale, pad_x, pad_y), crop = timer.time("preprocess", prep)
+        outputs = None
+        if model is not None:
+            batch = tensor if crop is None else np.concatenate([tensor, crop[0]])
+            outputs = timer.time("inference", model.predict, batch, conf=cfg["conf"])
+            xyxy, cls, conf = outputs[0]
+        else:
+            xyxy, cls, conf = np.zeros((0, 4), np.float32), np.zeros(0, np.int64), np.zeros(0, np.float32)
+
+        def detections():
+            dets = process_boxes(xyxy, cls, conf, w, h, prio, scale, pad_x, pad_y, dir_split=cfg["dir_split"])
+            if fovea is None:
+                return dets
+            if crop is not None and outputs is not None:
+                fovea.crop_boxes(*outputs[1], w, h, prio, *crop[1:])
+            return fovea.merge(dets)
+
+        if profile == "app":
+            def post():
+                dets = tracker.update(detections(), time.time())
+                return dets[rank_order(dets)]
+            dets = timer.time("postprocess", post)
+            center = None
+            if looming is not None:
+                center, raised = timer.time("ttc", looming_step, looming, infer_frame, dets)
+                if raised:
+                    dets = dets[rank_order(dets)]
+            obs = None
+            if len(dets):
+                primary = dets[0]
+                caption = f"{phrases.label(int(primary['cls']), names).upper()} {DIST_LEVELS[primary['dist']]}"
+                timer.time("annotate", lambda: draw_primary(frame.copy(), primary, caption))
+            else:
+                obs = timer.time("obstacle", obstacles, frame)
+                if center is not None and (obs is None or center < DIST_LEVELS.index(obs)):
+                    obs = DIST_LEVELS[center]
+                timer.time("annotate", frame.copy)
+            timer.time("announce", announcer.update, dets, w, h, time.time(), names=names, obstacle=obs)
+        else:
+            dets = timer.time("postprocess", detections)
+            center = None
+            if looming is not None:
+                center, _ = timer.time("ttc", looming_step, looming, infer_frame, dets)
+            sx, sy = frame.shape[1] / w, frame.shape[0] / h
+            timer.time("annotate", draw_detections, frame, dets, names, sx, sy)
+            timer.time("announce", announcer.update, dets, w, h, time.time(), names=names,
+                       looming=center is not None)
+        frames += 1
+
+    wall = time.perf_counter() - t_start if t_start else 0.0
+    measured = max(0, frames - warmup)
+    if fovea is not None:
+        print(f"[INFO] Corridor pass ran on {fovea.runs} frames, reused on {fovea.reused}")
+    print(f"[INFO] {announcer.events} announcements over {announcer.updates} frames")
+    return timer, measured, wall
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(result, baseline_path, tolerance, min_delta_ms=0.05):
+    """Stages whose p95 got slower than the baseline by more than `tolerance` (fraction)."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for stage, cur in result["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old is None:
+            continue
+        delta = cur["p95_ms"] - old["p95_ms"]
+        if delta > min_delta_ms and cur["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append((stage, old["p95_ms"], cur["p95_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmark with per-stage latency")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--video", help="Video file to replay")
+    src.add_argument("--synthetic", type=int, metavar="N", help="Use N generated frames instead of a video")
+    parser.add_argument("--size", default="640x480", help="Synthetic frame size, WxH")
+    parser.add_argument("--profile", choices=list(PROFILES), default="app", help="Which entry point's path to replay")
+    parser.add_argument("--backend", choices=list(BACKENDS) + ["none"],
+                        help="Detector backend (default: fastest available; 'none' skips inference)")
+    parser.add_argument("--imgsz", type=int, default=None, help="Inference resolution (default: profile's)")
+    parser.add_argument("--foveated", action="store_true", help="Add the corridor crop pass (see foveate.py)")
+    parser.add_argument("--no-ttc", action="store_true", help="Skip the time-to-collision stage (VISIONAID_TTC=0 / --no-ttc)")
+    parser.add_argument("--frames", type=int, default=1000, help="Max frames to measure")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--out", default=None, help="Write results as JSON")
+    parser.add_argument("--compare", default=None, help="Baseline JSON; exit 1 if a stage's p95 regressed")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed p95 slowdown for --compare")
+    args = parser.parse_args()
+
+    imgsz = args.imgsz or PROFILES[args.profile]["imgsz"]
+    model = None if args.backend == "none" else load_detector(imgsz=imgsz, backend=args.backend)
+    if args.video:
+        source = VideoFileSource(args.video)
+    else:
+        w, h = (int(v) for v in args.size.lower().split("x"))
+        source = SyntheticSource(size=(w, h), frames=args.synthetic + args.warmup)
+
+    try:
+        timer, frames, wall = replay(source, model, args.profile, args.frames, args.warmup, args.foveated,
+                                     not args.no_ttc)
+    finally:
+        source.close()
+
+    stages = timer.summary()
+    result = {
+        "source": args.video or f"synthetic:{args.size}",
+        "profile": args.profile,
+        "backend": model.name if model is not None else "none",
+        "imgsz": imgsz,
+        "foveated": args.foveated,
+        "ttc": not args.no_ttc,
+        "frames": frames,
+        "fps": round(frames / wall, 2) if wall > 0 else None,
+        "stages": stages,
+        "env": {"git": git_revision(), "python": platform.python_version(), "platform": platform.platform(),
+                "machine": platform.machine(), "cpus": os.cpu_count(), "opencv": cv2.__version__,
+                "numpy": np.__version__},
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    print(f"{result['source']} | profile {args.profile} | backend {result['backend']} @ {imgsz} | "
+          f"{frames} frames | {result['fps']} FPS")
+    print(f"{'stage':<12} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for stage, s in stages.items():
+        print(f"{stage:<12} {s['n']:>6} {s['p50_ms']:8.3f} {s['p95_ms']:8.3f} {s['p99_ms']:8.3f} {s['max_ms']:8.3f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[INFO] Results written to {args.out}")
+
+    if args.compare:
+        regressions = compare(result, args.compare, args.tolerance)
+        for stage, old, new in regressions:
+            print(f"[WARN] {stage} p95 regressed: {old:.3f} ms -> {new:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"[INFO] No p95 regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import csv
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+# --- FRAME SOURCES & CAPTURE THREAD ---
+# A source's read() returns (display_frame, inference_frame) or None when it is exhausted.
+# Both may be the same array; on Picamera2 the inference frame comes from the lores stream.
+# Replay sources also have frame_time(): the recorded timestamp of the last frame read.
+
+FramePacket = namedtuple("FramePacket", "seq ts frame infer_frame")
+
+
+class OpenCVSource:
+    def __init__(self, index=0):
+        print("[INFO] Initializing PC Webcam (cv2.VideoCapture)...")
+        self.cap = cv2.VideoCapture(index)
+        if not self.cap.isOpened():
+            raise ConnectionError("Could not open PC Webcam. Please check connection.")
+        # Keep the driver queue short so reads return a fresh frame
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        return frame, frame
+
+    def close(self):
+        self.cap.release()
+
+
+def lores_size(imgsz, main_size=(640, 480)):
+    """Lores stream size that feeds an `imgsz` model without upscaling: `imgsz` wide at the main
+    stream's aspect, or None when the model needs the main stream's full resolution."""
+    w, h = main_size
+    if imgsz >= w:
+        return None
+    return imgsz, (imgsz * h // w) & ~1
+
+
+class Picamera2Source:
+    def __init__(self, main_size=(640, 480), lores_size=(320, 240), camera_num=0):
+        from picamera2 import Picamera2
+        print(f"[INFO] Initializing Picamera2 (camera {camera_num})...")
+        self.picam2 = Picamera2(camera_num)
+        self.lores = lores_size is not None
+        config = {"main": {"size": main_size, "format": "RGB888"}}
+        if self.lores:
+            # The ISP downscales for free; inference reads the small stream, display the main one
+            config["lores"] = {"size": lores_size, "format": "YUV420"}
+        self.picam2.configure(self.picam2.create_video_configuration(**config, buffer_count=2))
+        self.picam2.start()
+
+    def read(self):
+        if not self.lores:
+            frame = self.picam2.capture_array()
+            return frame, frame
+        (main, lores), _ = self.picam2.capture_arrays(["main", "lores"])
+        return main, cv2.cvtColor(lores, cv2.COLOR_YUV2BGR_I420)
+
+    def close(self):
+        self.picam2.stop()
+        self.picam2.close()
+
+
+class _Pacer:
+    """Sleeps so recorded timestamps are replayed at their original spacing."""
+
+    def __init__(self):
+        self._offset = None
+
+    def wait(self, ts):
+        now = time.monotonic()
+        if self._offset is None:
+            self._offset = now - ts
+        delay = ts + self._offset - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class VideoFileSource:
+    """Replays a video file. realtime=True paces reads at the file's frame rate, like a live camera."""
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Could not open video file: {path}")
+        self.loop = loop
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pacer = _Pacer() if realtime else None
+        self.n = 0
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.n += 1
+        if self.pacer:
+            self.pacer.wait(self.frame_time())
+        return frame, frame
+
+    def frame_time(self):
+        return (self.n - 1) / self.fps
+
+    def close(self):
+        self.cap.release()
+
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+RECORD_INDEX = "frames.csv"
+
+
+class ImageDirSource:
+    """
+    Replays a folder of images in name order. Timestamps come from the frames.csv written by
+    FrameRecorder when present, otherwise frames are spaced at `fps`.
+    """
+
+    def __init__(self, path, realtime=False, fps=30.0):
+        self.paths = sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTS))
+        if not self.paths:
+            raise FileNotFoundError(f"No images found in {path}")
+        times = {}
+        index = os.path.join(path, RECORD_INDEX)
+        if os.path.exists(index):
+            with open(index, newline="") as f:
+                times = {row["file"]: float(row["ts"]) for row in csv.DictReader(f)}
+        self.times = [times.get(os.path.basename(p), i / fps) for i, p in enumerate(self.paths)]
+        self.pacer = _Pacer() if realtime else None
+        self.n = 0
+
+    def read(self):
+        while self.n < len(self.paths):
+            frame = cv2.imread(self.paths[self.n])
+            self.n += 1
+            if frame is None:
+                continue
+            if self.pacer:
+                self.pacer.wait(self.frame_time())
+            return frame, frame
+        return None
+
+    def frame_time(self):
+        return self.times[self.n - 1]
+
+    def close(self):
+        pass
+
+
+def open_replay_source(path, realtime=False):
+    return ImageDirSource(path, realtime=realtime) if os.path.isdir(path) else VideoFileSource(path, realtime=realtime)
+
+
+class FrameRecorder:
+    """
+    Writes captured frames as JPEGs plus a frames.csv index (file, seq, ts) for later replay
+    with ImageDirSource. Encoding runs on its own thread; if it falls behind, frames are
+    skipped (counted in `dropped`) rather than stalling capture.
+    """
+
+    def __init__(self, out_dir, quality=90, max_queue=32):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        index = os.path.join(out_dir, RECORD_INDEX)
+        new_index = not os.path.exists(index)
+        self._index = open(index, "a", newline="")
+        self._csv = csv.writer(self._index)
+        if new_index:
+            self._csv.writerow(["file", "seq", "ts"])
+        # Continue numbering after an earlier recording in the same folder
+        self._base = sum(1 for f in os.listdir(out_dir) if f.lower().endswith(IMAGE_EXTS))
+        self._thread = threading.Thread(target=self._loop, name="recorder", daemon=True)
+        self._thread.start()
+
+    def write(self, packet):
+        try:
+            self._queue.put_nowait(packet)
+        except queue.Full:
+            self.dropped += 1
+
+    def _loop(self):
+        while True:
+            packet = self._queue.get()
+            if packet is None:
+                break
+            name = f"{self._base + packet.seq:06d}.jpg"
+            cv2.imwrite(os.path.join(self.out_dir, name), packet.frame, self.params)
+            self._csv.writerow([name, packet.seq, f"{packet.ts:.6f}"])
+            self.written += 1
+        self._index.close()
+
+    def close(self, timeout=5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class SyntheticSource:
+    """
+    Deterministic generated frames: a textured background with a box that moves across the
+    view and grows as it "approaches". Cheap enough not to skew per-stage timings.
+    """
+
+    def __init__(self, size=(640, 480), frames=300, seed=0):
+        import numpy as np
+        self.w, self.h = size
+        self.frames = frames
+        rng = np.random.default_rng(seed)
+        self.background = cv2.GaussianBlur(rng.integers(30, 90, (self.h, self.w, 3), dtype=np.uint8), (9, 9), 0)
+        self.n = 0
+
+    def read(self):
+        if self.n >= self.frames:
+            return None
+        t = self.n / max(1, self.frames - 1)
+        self.n += 1
+        frame = self.background.copy()
+        half_w, half_h = int(self.w * (0.05 + 0.2 * t)), int(self.h * (0.1 + 0.3 * t))
+        cx, cy = int(self.w * (0.2 + 0.6 * t)), self.h // 2
+        cv2.rectangle(frame, (cx - half_w, cy - half_h), (cx + half_w, cy + half_h), (190, 190, 190), -1)
+        return frame, frame
+
+    def close(self):
+        pass
+
+
+class LatestFrameBuffer:
+    """
+    Single-slot buffer: writers overwrite, readers always get the newest unseen frame.
+    lossless=True makes put() wait until the previous frame was read (deterministic replay).
+    """
+
+    def __init__(self, lossless=False):
+        self.lossless = lossless
+        self._cond = threading.Condition()
+        self._packet = None
+        self._closed = False
+        self.dropped = 0
+        self._last_read_seq = 0
+
+    def put(self, packet):
+        with self._cond:
+            while self.lossless and not self._closed and self._packet is not None \
+                    and self._packet.seq > self._last_read_seq:
+                self._cond.wait()
+            if self._packet is not None and self._packet.seq > self._last_read_seq:
+                self.dropped += 1
+            self._packet = packet
+            self._cond.notify_all()
+
+    def get(self, timeout=1.0):
+        """Waits for a frame newer than the last one returned. None on timeout or close."""
+        with self._cond:
+            deadline = time.monotonic() + timeout
+            while not self._closed and (self._packet is None or self._packet.seq <= self._last_read_seq):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._packet is None or self._packet.seq <= self._last_read_seq:
+                return None
+            self._last_read_seq = self._packet.seq
+            self._cond.notify_all()
+            return self._packet
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class CaptureThread(threading.Thread):
+    """Reads the source as fast as it delivers and publishes into a LatestFrameBuffer."""
+
+    def __init__(self, source, buffer, on_read=None, recorder=None, recorded_time=False):
+        super().__init__(name="capture", daemon=True)
+        self.source = source
+        self.buffer = buffer
+        self.on_read = on_read     # optional callback(seconds spent in read())
+        self.recorder = recorder
+        # Stamp packets with the source's recorded time instead of the wall clock (replay)
+        self.clock = source.frame_time if recorded_time else time.time
+        self.frames = 0
+        self.stop_event = threading.Event()
+        self.exhausted = False
+
+    def run(self):
+        seq = 0
+        try:
+            while not self.stop_event.is_set():
+                t0 = time.perf_counter()
+                item = self.source.read()
+                if item is None:
+                    self.exhausted = True
+                    break
+                if self.on_read:
+                    self.on_read(time.perf_counter() - t0)
+                seq += 1
+                self.frames = seq
+                frame, infer_frame = item
+                packet = FramePacket(seq, self.clock(), frame, infer_frame)
+                if self.recorder is not None:
+                    self.recorder.write(packet)
+                self.buffer.put(packet)
+        except Exception as e:
+            print(f"[ERROR] Capture failed: {e}")
+        finally:
+            self.buffer.close()
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,139 @@
+import os
+import threading
+
+# --- CAPTURE NEGOTIATION ---
+# The browser is asked for a resolution and frame rate that fits this host's share of decode work,
+# not whatever the phone defaults to. Constraints only apply when a stream starts; once it is
+# running, LoadGovernor lowers the *processed* size and rate on the server (decode-time downscale
+# and frame-rate gating) until the next start renegotiates.
+
+# (width, height, fps), best first. Inference letterboxes to 320, so nothing above 960 pays off
+CAPTURE_TIERS = ((960, 540, 24), (640, 480, 20), (640, 360, 15), (480, 360, 12), (320, 240, 10))
+# Decoded megapixels per second the host can afford across all sessions (default: 8 per core)
+PIXEL_BUDGET = float(os.environ.get("VISIONAID_CAPTURE_BUDGET", 8 * (os.cpu_count() or 1))) * 1e6
+
+
+def cpu_load():
+    """1-minute load average per core (0 where unavailable)."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+def tier_cost(tier):
+    w, h, fps = tier
+    return w * h * fps
+
+
+class StreamBudget:
+    """Process-wide: counts active sessions and picks the capture tier for the next one."""
+
+    def __init__(self, budget=PIXEL_BUDGET, tiers=CAPTURE_TIERS, cpu_high=0.9):
+        self.budget = budget
+        self.tiers = tiers
+        self.cpu_high = cpu_high
+        self._sessions = set()
+        self._lock = threading.Lock()
+
+    @property
+    def sessions(self):
+        return len(self._sessions)
+
+    def register(self, key):
+        with self._lock:
+            self._sessions.add(key)
+
+    def unregister(self, key):
+        with self._lock:
+            self._sessions.discard(key)
+
+    def start_tier(self):
+        """Best tier whose cost fits an even share of the budget with one more session."""
+        share = self.budget / (self.sessions + 1)
+        if cpu_load() > self.cpu_high:
+            share *= 0.5
+        for i, tier in enumerate(self.tiers):
+            if tier_cost(tier) <= share:
+                return i
+        return len(self.tiers) - 1
+
+    def constraints(self, tier, facing_mode="environment"):
+        """media_stream_constraints for webrtc_streamer."""
+        w, h, fps = self.tiers[tier]
+        return {"video": {"facingMode": facing_mode, "width": {"ideal": w}, "height": {"ideal": h},
+                          "frameRate": {"ideal": fps, "max": fps}},
+                "audio": False}
+
+
+class LoadGovernor:
+    """
+    Per session: steps the processed tier down when the host or this session's recv falls
+    behind, and back up (never above the negotiated start tier) after a calm period.
+    """
+
+    def __init__(self, start_tier=0, tiers=CAPTURE_TIERS, check_every=2.0, recover_after=10.0,
+                 cpu_high=0.9, cpu_low=0.6, busy_high=0.8, busy_low=0.3):
+        self.tiers = tiers
+        self.start_tier = start_tier
+        self.tier = start_tier
+        self.check_every = check_every
+        self.recover_after = recover_after
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.busy_high = busy_high      # recv time / frame interval considered falling behind
+        self.busy_low = busy_low
+        self.busy = 0.0                 # EWMA of recv seconds per processed frame
+        self.changes = 0
+        self._checked = 0.0
+        self._calm_since = None
+        self._next_frame = 0.0
+
+    @property
+    def target(self):
+        return self.tiers[self.tier]
+
+    def admit(self, now):
+        """Frame-rate gate: False for frames arriving faster than the current tier's fps."""
+        if now < self._next_frame:
+            return False
+        interval = 1.0 / self.target[2]
+        # Schedule from the previous slot so the average rate matches fps; don't bank a backlog
+        self._next_frame = max(self._next_frame, now - interval) + interval
+        return True
+
+    def scaled_size(self, width, height):
+        """Frame size to decode to: the tier's size in the frame's orientation, never upscaled."""
+        w, h, _ = self.target
+        scale = min(1.0, max(w, h) / max(width, height), min(w, h) / min(width, height))
+        if scale >= 1.0:
+            return width, height
+        # Even dimensions keep the YUV -> BGR conversion simple
+        return max(2, int(width * scale) & ~1), max(2, int(height * scale) & ~1)
+
+    def update(self, now, busy):
+        """Records one processed frame's recv time; returns True when the tier changed."""
+        self.busy += 0.1 * (busy - self.busy)
+        if now - self._checked < self.check_every:
+            return False
+        self._checked = now
+        interval = 1.0 / self.target[2]
+        load = cpu_load()
+        if load > self.cpu_high or self.busy > self.busy_high * interval:
+            self._calm_since = None
+            if self.tier < len(self.tiers) - 1:
+                self.tier += 1
+                self.changes += 1
+                return True
+            return False
+        if load < self.cpu_low and self.busy < self.busy_low * interval and self.tier > self.start_tier:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recover_after:
+                self._calm_since = now
+                self.tier -= 1
+                self.changes += 1
+                return True
+        else:
+            self._calm_since = None
+        return False
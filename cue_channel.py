@@ -0,0 +1,208 @@
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- PUSH CUE CHANNEL ---
+# VideoProcessor publishes cue events per session; the browser holds one Server-Sent Events
+# connection and speaks/vibrates as soon as an event arrives. No Streamlit reruns involved.
+
+VIB_PATTERNS = {"VERY_CLOSE": [100, 50, 100, 50, 100], "CLOSE": [200, 100, 200], "MEDIUM": [300], "FAR": [150]}
+DEBOUNCE_MS = 1500
+URGENT_DEBOUNCE_MS = 800
+HEARTBEAT = 5.0   # s between keep-alives on an idle connection
+
+
+class _Session:
+    __slots__ = ("cond", "queue", "owners", "clients", "seen")
+
+    def __init__(self, lock, backlog):
+        self.cond = threading.Condition(lock)
+        self.queue = deque(maxlen=backlog)
+        self.owners = 0     # live CueEmitters for this sid
+        self.clients = 0    # open SSE connections
+        self.seen = None    # last time an SSE connection for it was known to be open
+
+
+class CueHub:
+    """
+    Per-session event queues. Only sids registered by a live CueEmitter exist; the SSE server
+    answers 404 for anything else. Publishers never block; slow subscribers lose the oldest events.
+    """
+
+    def __init__(self, backlog=32):
+        self.backlog = backlog
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self.published = 0
+
+    def register(self, sid):
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                session = self._sessions[sid] = _Session(self._lock, self.backlog)
+            session.owners += 1
+
+    def unregister(self, sid):
+        """Drops the session once its last emitter is gone; open connections for it then end."""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return
+            session.owners -= 1
+            if session.owners <= 0:
+                del self._sessions[sid]
+                session.cond.notify_all()
+
+    def __contains__(self, sid):
+        with self._lock:
+            return sid in self._sessions
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def publish(self, sid, event):
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return False
+            session.queue.append(event)
+            self.published += 1
+            session.cond.notify_all()
+            return True
+
+    def attach(self, sid):
+        """Counts an SSE connection for sid. False if the session does not exist."""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return False
+            session.clients += 1
+            session.seen = time.time()
+            return True
+
+    def detach(self, sid):
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is not None:
+                session.clients -= 1
+                session.seen = time.time()
+
+    def connected(self, sid, within=2 * HEARTBEAT):
+        """True if a browser holds this session's SSE connection, or held it in the last `within` seconds."""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None or session.seen is None:
+                return False
+            return session.clients > 0 or time.time() - session.seen <= within
+
+    def next_events(self, sid, timeout=HEARTBEAT):
+        """Blocks until events are queued for sid (or timeout) and drains them. None once the session is gone."""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return None
+            if not session.queue:
+                session.cond.wait(timeout)
+                if self._sessions.get(sid) is not session:
+                    return None
+            session.seen = time.time()
+            events = list(session.queue)
+            session.queue.clear()
+            return events
+
+
+class CueEmitter:
+    """
+    Session-side sender. Applies the same debounce the polling path used (1500 ms, 800 ms for
+    VERY_CLOSE) so identical cues are not re-sent on every frame.
+    """
+
+    def __init__(self, hub, sid):
+        self.hub = hub
+        self.sid = sid
+        hub.register(sid)
+        self.last_text = ""
+        self.last_time = 0.0
+        self.sent = 0
+
+    def emit(self, text, dist_level="FAR", **extra):
+        now = time.time() * 1000
+        debounce = URGENT_DEBOUNCE_MS if dist_level == "VERY_CLOSE" else DEBOUNCE_MS
+        if text == self.last_text and now - self.last_time < debounce:
+            return False
+        self.last_text, self.last_time = text, now
+        self.hub.publish(self.sid, {"type": "cue", "text": text, "dist": dist_level,
+                                    "vib": VIB_PATTERNS.get(dist_level, [150]), "ts": now, **extra})
+        self.sent += 1
+        return True
+
+    def send(self, event_type, **payload):
+        """Non-debounced side events (stats, overlay metadata...)."""
+        self.hub.publish(self.sid, {"type": event_type, **payload})
+
+    def close(self):
+        self.hub.unregister(self.sid)
+
+
+_SID_RE = re.compile(r"^/cues/([A-Za-z0-9_-]{1,64})$")
+
+
+def _make_handler(hub):
+    class CueHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            m = _SID_RE.match(self.path.split("?")[0])
+            if not m:
+                self.send_error(404)
+                return
+            sid = m.group(1)
+            if not hub.attach(sid):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Connection", "keep-alive")
+            self.end_headers()
+            try:
+                self.wfile.write(b"retry: 1000\n\n")
+                self.wfile.flush()
+                while True:
+                    events = hub.next_events(sid)
+                    if events is None:
+                        break   # session ended; the browser's reconnect gets a 404
+                    if not events:
+                        self.wfile.write(b": keep-alive\n\n")   # also detects closed clients
+                    for ev in events:
+                        self.wfile.write(f"data: {json.dumps(ev, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                pass
+            finally:
+                hub.detach(sid)
+                self.close_connection = True
+
+    return CueHandler
+
+
+def start_cue_server(port, host="0.0.0.0"):
+    """Starts the SSE server on a daemon thread. Returns (hub, server), or None if the port is unavailable."""
+    hub = CueHub()
+    try:
+        server = ThreadingHTTPServer((host, port), _make_handler(hub))
+    except OSError as e:
+        print(f"[WARN] Cue channel disabled, could not bind port {port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="cue-channel", daemon=True).start()
+    print(f"[INFO] Cue channel listening on {host}:{port}")
+    return hub, server
@@ -0,0 +1,348 @@
+import glob
+import importlib.util
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+
+# --- PLUGGABLE DETECTOR BACKENDS ---
+# Every backend takes a preprocessed NCHW float32 RGB batch in [0, 1] (see preprocess.Preprocessor)
+# and returns, per image, (xyxy, cls, conf) numpy arrays in the letterboxed canvas coordinates.
+
+MODEL_DIR = os.environ.get("VISIONAID_MODEL_DIR", ".")
+CACHE_PATH = os.path.join(os.path.expanduser(os.environ.get("VISIONAID_CACHE_DIR", "~/.cache/visionaid")), "backend.json")
+
+COCO_NAMES = [
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light",
+    "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow",
+    "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee",
+    "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard", "surfboard",
+    "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
+    "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch",
+    "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard",
+    "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase",
+    "scissors", "teddy bear", "hair drier", "toothbrush",
+]
+
+# MobileNet-SSD (VOC) labels, renamed to their COCO equivalents so PRIORITIES/translations still apply
+SSD_NAMES = [
+    "background", "airplane", "bicycle", "bird", "boat", "bottle", "bus", "car", "cat", "chair", "cow",
+    "dining table", "dog", "horse", "motorcycle", "person", "potted plant", "sheep", "couch", "train", "tv",
+]
+
+EMPTY_RESULT = (np.zeros((0, 4), np.float32), np.zeros(0, np.int16), np.zeros(0, np.float32))
+
+
+def _has_module(name):
+    return importlib.util.find_spec(name) is not None
+
+
+def _path(*parts):
+    return os.path.join(MODEL_DIR, *parts)
+
+
+def decode_yolo(output, conf, iou=0.45, max_det=100):
+    """Decodes a raw YOLOv8 head output (84, N) into (xyxy, cls, conf) with class-aware NMS."""
+    preds = output.T
+    scores = preds[:, 4:]
+    cls = scores.argmax(1)
+    best = scores[np.arange(len(cls)), cls]
+    keep = best >= conf
+    if not keep.any():
+        return EMPTY_RESULT
+    boxes, cls, best = preds[keep, :4], cls[keep], best[keep]
+    xyxy = np.empty_like(boxes)
+    xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+    xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+    # Offset boxes per class so one NMS call never suppresses across classes
+    offset = (cls * 4096.0)[:, None]
+    nms_boxes = np.concatenate([xyxy[:, :2] + offset, boxes[:, 2:]], axis=1)
+    idx = cv2.dnn.NMSBoxes(nms_boxes.tolist(), best.tolist(), conf, iou, top_k=max_det)
+    idx = np.asarray(idx, dtype=np.intp).reshape(-1)
+    return xyxy[idx].astype(np.float32), cls[idx].astype(np.int16), best[idx].astype(np.float32)
+
+
+class DetectorBackend:
+    """Base class: subclasses implement available(), _load() and predict()."""
+
+    name = "base"
+    max_batch = 1
+    auto_select = True   # False: only used when asked for by name (--backend / VISIONAID_BACKEND)
+
+    def __init__(self, imgsz=320, path=None):
+        self.imgsz = imgsz
+        self.path = path   # explicit model artifact; otherwise looked up in MODEL_DIR
+        self.names = dict(enumerate(COCO_NAMES))
+        self._load()
+
+    @classmethod
+    def available(cls):
+        return False
+
+    def _load(self):
+        raise NotImplementedError
+
+    def predict(self, batch, conf=0.5):
+        """batch: (B, 3, imgsz, imgsz) float32. Returns a list of (xyxy, cls, conf) per image."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{type(self).__name__} imgsz={self.imgsz}>"
+
+
+class UltralyticsBackend(DetectorBackend):
+    name = "pytorch"
+    weights = "yolov8n.pt"
+
+    @classmethod
+    def available(cls):
+        return _has_module("ultralytics")
+
+    def _load(self):
+        from ultralytics import YOLO
+        weights = self.path or (_path(self.weights) if os.path.exists(_path(self.weights)) else self.weights)
+        self.model = YOLO(weights)
+        self.names = self.model.names
+
+    def predict(self, batch, conf=0.5):
+        import torch
+        # Tensor input: Ultralytics skips its own letterbox/normalize
+        results = self.model(torch.from_numpy(np.ascontiguousarray(batch)), verbose=False, conf=conf, imgsz=self.imgsz)
+        out = []
+        for r in results:
+            if r.boxes is None or len(r.boxes) == 0:
+                out.append(EMPTY_RESULT)
+                continue
+            b = r.boxes.cpu().numpy()
+            out.append((b.xyxy, b.cls.astype(np.int16), b.conf))
+        return out
+
+
+def _names_from_metadata(value):
+    if isinstance(value, dict):
+        return {int(k): v for k, v in value.items()}
+    import ast
+    return {int(k): v for k, v in ast.literal_eval(value).items()}
+
+
+class OnnxRuntimeBackend(DetectorBackend):
+    name = "onnxruntime"
+    patterns = ("yolov8n.onnx",)
+
+    @classmethod
+    def model_path(cls):
+        for pattern in cls.patterns:
+            found = sorted(glob.glob(_path(pattern)))
+            if found:
+                return found[0]
+        return None
+
+    @classmethod
+    def available(cls):
+        return _has_module("onnxruntime") and cls.model_path() is not None
+
+    def _load(self):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.path or self.model_path(), opts, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        if isinstance(inp.shape[2], int):
+            self.imgsz = inp.shape[2]
+        self.max_batch = inp.shape[0] if isinstance(inp.shape[0], int) else 64
+        meta = self.session.get_modelmeta().custom_metadata_map
+        if "names" in meta:
+            self.names = _names_from_metadata(meta["names"])
+
+    def predict(self, batch, conf=0.5):
+        out = []
+        for i in range(0, len(batch), self.max_batch):
+            raw = self.session.run(None, {self.input_name: batch[i:i+self.max_batch]})[0]
+            out.extend(decode_yolo(r, conf) for r in raw)
+        return out
+
+
+class OpenVINOBackend(DetectorBackend):
+    name = "openvino"
+    patterns = ("yolov8n_openvino_model",)
+
+    @classmethod
+    def model_path(cls):
+        for pattern in cls.patterns:
+            for d in sorted(glob.glob(_path(pattern))):
+                xml = glob.glob(os.path.join(d, "*.xml"))
+                if xml:
+                    return xml[0]
+        return None
+
+    @classmethod
+    def available(cls):
+        return _has_module("openvino") and cls.model_path() is not None
+
+    def _load(self):
+        import openvino as ov
+        core = ov.Core()
+        xml = self.path or self.model_path()
+        model = core.read_model(xml)
+        self.compiled = core.compile_model(model, "CPU", {"PERFORMANCE_HINT": "LATENCY"})
+        self.output = self.compiled.output(0)
+        shape = self.compiled.input(0).get_partial_shape()
+        if shape[2].is_static:
+            self.imgsz = shape[2].get_length()
+        self.max_batch = shape[0].get_length() if shape[0].is_static else 64
+        meta = os.path.join(os.path.dirname(xml), "metadata.yaml")
+        if os.path.exists(meta) and _has_module("yaml"):
+            import yaml
+            with open(meta) as f:
+                names = (yaml.safe_load(f) or {}).get("names")
+            if names:
+                self.names = _names_from_metadata(names)
+
+    def predict(self, batch, conf=0.5):
+        out = []
+        for i in range(0, len(batch), self.max_batch):
+            raw = self.compiled(batch[i:i+self.max_batch])[self.output]
+            out.extend(decode_yolo(r, conf) for r in raw)
+        return out
+
+
+class OnnxRuntimeInt8Backend(OnnxRuntimeBackend):
+    """INT8 model written by export_quant.py."""
+    name = "onnxruntime-int8"
+    patterns = ("yolov8n_int8.onnx",)
+
+
+class OpenVINOInt8Backend(OpenVINOBackend):
+    """INT8 model written by export_quant.py."""
+    name = "openvino-int8"
+    patterns = ("yolov8n_int8_openvino_model",)
+
+
+class OpenCVDnnBackend(DetectorBackend):
+    """MobileNet-SSD (deploy.prototxt + MobileNetSSD_deploy.caffemodel) through cv2.dnn."""
+
+    name = "opencv-dnn"
+    # A different model (20 VOC classes: no truck, stairs, door...), so never swapped in for speed
+    auto_select = False
+    prototxt = "deploy.prototxt"
+    weights = "MobileNetSSD_deploy.caffemodel"
+
+    @classmethod
+    def available(cls):
+        return os.path.exists(_path(cls.prototxt)) and os.path.exists(_path(cls.weights))
+
+    def _load(self):
+        self.net = cv2.dnn.readNetFromCaffe(_path(self.prototxt), _path(self.weights))
+        self.names = dict(enumerate(SSD_NAMES))
+
+    def predict(self, batch, conf=0.5):
+        # Back to uint8 HWC; blobFromImages then resizes to 300x300, scales and swaps to BGR
+        images = [(img.transpose(1, 2, 0) * 255).astype(np.uint8) for img in batch]
+        blob = cv2.dnn.blobFromImages(images, 0.007843, (300, 300), 127.5, swapRB=True)
+        self.net.setInput(blob)
+        dets = self.net.forward().reshape(-1, 7)   # [image_id, label, conf, x1, y1, x2, y2]
+        dets = dets[dets[:, 2] >= conf]
+        out = []
+        for i, img in enumerate(batch):
+            d = dets[dets[:, 0] == i]
+            h, w = img.shape[1:]
+            xyxy = (d[:, 3:7] * np.array([w, h, w, h], np.float32)).astype(np.float32)
+            out.append((xyxy, d[:, 1].astype(np.int16), d[:, 2].astype(np.float32)))
+        return out
+
+
+BACKENDS = {b.name: b for b in (OpenVINOInt8Backend, OpenVINOBackend, OnnxRuntimeInt8Backend, OnnxRuntimeBackend,
+                                UltralyticsBackend, OpenCVDnnBackend)}
+
+
+def available_backends():
+    return [name for name, b in BACKENDS.items() if b.available()]
+
+
+def benchmark_backend(backend, iters=5, batch=1):
+    """Median seconds per frame on synthetic input (after one warm-up call)."""
+    rng = np.random.default_rng(0)
+    x = rng.random((batch, 3, backend.imgsz, backend.imgsz), dtype=np.float32)
+    backend.predict(x)
+    times = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        backend.predict(x)
+        times.append((time.perf_counter() - t0) / batch)
+    return float(np.median(times))
+
+
+def _cache_key(imgsz, names):
+    return f"{platform.machine()}|{platform.processor()}|{os.cpu_count()}|{imgsz}|{','.join(sorted(names))}"
+
+
+def _read_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"[WARN] Could not cache backend choice: {e}")
+
+
+def load_detector(imgsz=320, backend=None, candidates=None, iters=5, use_cache=True):
+    """
+    Returns a ready detector backend.
+    backend: force one by name (also VISIONAID_BACKEND). Otherwise every available candidate
+    is benchmarked on synthetic frames and the fastest one is kept; the choice is cached per
+    CPU / imgsz / installed-backends combination so later startups skip the benchmark.
+    Candidates default to the backends that run the YOLO model (not opencv-dnn).
+    """
+    backend = backend or os.environ.get("VISIONAID_BACKEND")
+    if backend:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+        print(f"[INFO] Using detector backend: {backend}")
+        return BACKENDS[backend](imgsz)
+
+    candidates = candidates or [n for n, b in BACKENDS.items() if b.auto_select]
+    names = [n for n in candidates if n in BACKENDS and BACKENDS[n].available()]
+    if not names:
+        hint = " (opencv-dnn is available but must be chosen explicitly)" if OpenCVDnnBackend.available() else ""
+        raise RuntimeError("No detector backend available. Install ultralytics or provide an exported model"
+                           f"{hint}.")
+
+    key = _cache_key(imgsz, names)
+    cache = _read_cache() if use_cache else {}
+    if key in cache and cache[key]["backend"] in names:
+        choice = cache[key]["backend"]
+        print(f"[INFO] Using cached detector backend choice: {choice}")
+        return BACKENDS[choice](imgsz)
+
+    best, best_t, timings = None, float("inf"), {}
+    for name in names:
+        try:
+            det = BACKENDS[name](imgsz)
+            t = benchmark_backend(det, iters=iters)
+        except Exception as e:
+            print(f"[WARN] Backend {name} failed to load: {e}")
+            continue
+        timings[name] = round(t * 1000, 2)
+        print(f"[INFO] Backend {name}: {t*1000:.1f} ms/frame")
+        if t < best_t:
+            best, best_t = det, t
+    if best is None:
+        raise RuntimeError("Every detector backend failed to load.")
+
+    print(f"[INFO] Selected detector backend: {best.name}")
+    if use_cache:
+        cache[key] = {"backend": best.name, "ms_per_frame": timings}
+        _write_cache(cache)
+    return best
@@ -0,0 +1,265 @@
+"""
+Export FP32 + INT8 variants of the detector and compare them on recorded navigation frames.
+
+    python3 export_quant.py --calib-dir recordings/ --imgsz 320
+
+Writes (into --out, default: current directory, where detectors.py looks for models):
+    yolov8n.onnx, yolov8n_openvino_model/                 FP32 (Ultralytics export)
+    yolov8n_int8.onnx                                     INT8, ONNX Runtime static quantization (QDQ)
+    yolov8n_int8_openvino_model/yolov8n_int8.xml          INT8, NNCF post-training quantization
+    quant_report.json                                     latency / size / peak memory / agreement
+"""
+import argparse
+import glob
+import json
+import multiprocessing as mp
+import os
+import queue as queue_mod
+import resource
+import shutil
+import time
+
+import cv2
+import numpy as np
+
+from preprocess import Preprocessor
+from tracker import iou_matrix
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_frames(calib_dir, limit):
+    paths = sorted(p for p in glob.glob(os.path.join(calib_dir, "**", "*"), recursive=True)
+                   if p.lower().endswith(IMAGE_EXTS))
+    if not paths:
+        raise SystemExit(f"[ERROR] No images found in {calib_dir}")
+    if len(paths) > limit:
+        # Spread the sample over the whole recording instead of taking the first N frames
+        paths = [paths[i] for i in np.linspace(0, len(paths) - 1, limit).astype(int)]
+    frames = [cv2.imread(p) for p in paths]
+    return [f for f in frames if f is not None]
+
+
+def to_tensors(frames, imgsz):
+    pre = Preprocessor(target_size=imgsz)
+    return [pre(f)[0].copy() for f in frames]
+
+
+def split_frames(items, calib_size, eval_size):
+    """Disjoint (calibration, evaluation) sets; the evaluation frames are spread over the whole
+    sample so the report is never measured on the data the INT8 ranges were fitted to."""
+    n = len(items)
+    if n < 2:
+        raise SystemExit("[ERROR] Need at least 2 frames (calibration and evaluation sets are disjoint)")
+    n_eval = max(1, min(eval_size, n * eval_size // (calib_size + eval_size)))
+    eval_idx = set(np.linspace(0, n - 1, n_eval).round().astype(int).tolist())
+    calib = [t for i, t in enumerate(items) if i not in eval_idx][:calib_size]
+    return calib, [items[i] for i in sorted(eval_idx)]
+
+
+# --- EXPORT ---
+def export_fp32(weights, imgsz, out_dir):
+    from ultralytics import YOLO
+    model = YOLO(weights)
+    onnx_path = model.export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+    ov_dir = model.export(format="openvino", imgsz=imgsz)
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    targets = {"onnx": os.path.join(out_dir, f"{stem}.onnx"), "openvino": os.path.join(out_dir, f"{stem}_openvino_model")}
+    for src, dst in ((onnx_path, targets["onnx"]), (ov_dir, targets["openvino"])):
+        if os.path.abspath(src) != os.path.abspath(dst):
+            if os.path.isdir(dst):
+                shutil.rmtree(dst)
+            shutil.move(src, dst)
+    return targets
+
+
+def quantize_onnx(fp32_path, tensors, out_path):
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          CalibrationMethod, quantize_static)
+    import onnxruntime as ort
+
+    input_name = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self._it = iter(tensors)
+
+        def get_next(self):
+            t = next(self._it, None)
+            return None if t is None else {input_name: t}
+
+    quantize_static(fp32_path, out_path, Reader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                    per_channel=True, calibrate_method=CalibrationMethod.MinMax)
+    return out_path
+
+
+def quantize_openvino(fp32_dir, tensors, out_dir):
+    import nncf
+    import openvino as ov
+
+    xml = glob.glob(os.path.join(fp32_dir, "*.xml"))[0]
+    core = ov.Core()
+    model = core.read_model(xml)
+    dataset = nncf.Dataset(tensors)
+    # Keep the detection head's final concat/box decode in FP32: quantizing it costs box accuracy
+    quantized = nncf.quantize(model, dataset, preset=nncf.QuantizationPreset.MIXED,
+                              subset_size=len(tensors),
+                              ignored_scope=nncf.IgnoredScope(types=["Multiply", "Subtract", "Sigmoid"]))
+    os.makedirs(out_dir, exist_ok=True)
+    out_xml = os.path.join(out_dir, "yolov8n_int8.xml")
+    ov.save_model(quantized, out_xml)
+    meta = os.path.join(fp32_dir, "metadata.yaml")
+    if os.path.exists(meta):
+        shutil.copy(meta, out_dir)
+    return out_xml
+
+
+# --- EVALUATION ---
+def _size_on_disk(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs)
+    if path.endswith(".xml"):
+        return os.path.getsize(path) + os.path.getsize(path[:-4] + ".bin")
+    return os.path.getsize(path)
+
+
+def _evaluate_worker(backend_name, path, imgsz, tensors, conf, queue):
+    # Runs in a fresh process so ru_maxrss reflects this variant alone
+    from detectors import BACKENDS
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    det = BACKENDS[backend_name](imgsz, path=path)
+    det.predict(tensors[0], conf=conf)
+    times, dets = [], []
+    for t in tensors:
+        t0 = time.perf_counter()
+        xyxy, cls, c = det.predict(t, conf=conf)[0]
+        times.append(time.perf_counter() - t0)
+        dets.append((xyxy, cls))
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({"times": times, "dets": dets, "peak_rss_kb": rss1, "model_rss_kb": rss1 - rss0})
+
+
+def evaluate(backend_name, path, imgsz, tensors, conf, timeout=1800.0):
+    """Runs one variant in a spawned process. Returns its measurements, or None when the process
+    died (model load error, out of memory) or ran past `timeout` seconds."""
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_evaluate_worker, args=(backend_name, path, imgsz, tensors, conf, queue))
+    proc.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1.0)
+        except queue_mod.Empty:
+            if proc.exitcode is not None or time.monotonic() > deadline:
+                break
+    if result is None and proc.exitcode == 0:
+        try:   # exited right after putting its result
+            result = queue.get(timeout=1.0)
+        except queue_mod.Empty:
+            pass
+    proc.join(5.0)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+    if result is None:
+        reason = "timed out" if proc.exitcode in (None, -15) else f"exit code {proc.exitcode}"
+        print(f"[ERROR] Evaluation of {path} with {backend_name} failed ({reason})")
+    return result
+
+
+def agreement(ref_dets, dets, iou_thresh=0.5):
+    """F1 of same-class IoU>=0.5 matches against the FP32 reference, over all frames."""
+    matched = n_ref = n_det = 0
+    for (rb, rc), (b, c) in zip(ref_dets, dets):
+        n_ref += len(rb)
+        n_det += len(b)
+        if len(rb) == 0 or len(b) == 0:
+            continue
+        iou = iou_matrix(rb, b)
+        iou[rc[:, None] != c[None, :]] = 0
+        used = set()
+        for i in range(len(rb)):
+            for j in np.argsort(-iou[i]):
+                if iou[i, j] < iou_thresh:
+                    break
+                if j not in used:
+                    used.add(j)
+                    matched += 1
+                    break
+    if n_ref == 0 and n_det == 0:
+        return 1.0
+    return 2 * matched / (n_ref + n_det)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export INT8 OpenVINO/ONNX detectors and write a comparison report")
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--calib-dir", required=True, help="Folder of recorded frames (e.g. from pi_navigator.py --record)")
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--calib-size", type=int, default=300, help="Max frames used for calibration")
+    parser.add_argument("--eval-size", type=int, default=100, help="Max frames used for the report")
+    parser.add_argument("--conf", type=float, default=0.45)
+    parser.add_argument("--out", default=".")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["onnx", "openvino"], help="Formats to skip")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    frames = load_frames(args.calib_dir, args.calib_size + args.eval_size)
+    calib, eval_set = split_frames(to_tensors(frames, args.imgsz), args.calib_size, args.eval_size)
+    print(f"[INFO] {len(frames)} frames loaded ({len(calib)} calibration, {len(eval_set)} evaluation)")
+
+    print("[INFO] Exporting FP32 models...")
+    fp32 = export_fp32(args.weights, args.imgsz, args.out)
+    variants = []
+    if "onnx" not in args.skip:
+        print("[INFO] Quantizing ONNX (static INT8, QDQ)...")
+        int8_onnx = quantize_onnx(fp32["onnx"], calib, os.path.join(args.out, "yolov8n_int8.onnx"))
+        variants += [("onnxruntime", fp32["onnx"], "onnx-fp32"), ("onnxruntime-int8", int8_onnx, "onnx-int8")]
+    if "openvino" not in args.skip:
+        print("[INFO] Quantizing OpenVINO (NNCF INT8)...")
+        ov_fp32_xml = glob.glob(os.path.join(fp32["openvino"], "*.xml"))[0]
+        int8_ov = quantize_openvino(fp32["openvino"], calib, os.path.join(args.out, "yolov8n_int8_openvino_model"))
+        variants += [("openvino", ov_fp32_xml, "openvino-fp32"), ("openvino-int8", int8_ov, "openvino-int8")]
+
+    # Reference detections: the FP32 model of each format
+    report = {"imgsz": args.imgsz, "eval_frames": len(eval_set), "conf": args.conf, "variants": {}}
+    refs = {}
+    for backend_name, path, label in variants:
+        print(f"[INFO] Evaluating {label}...")
+        r = evaluate(backend_name, path, args.imgsz, eval_set, args.conf)
+        fmt = label.split("-")[0]
+        if r is None:
+            report["variants"][label] = {"path": path, "error": "evaluation failed"}
+            continue
+        if label.endswith("fp32"):
+            refs[fmt] = r["dets"]
+        times_ms = np.array(r["times"]) * 1000
+        report["variants"][label] = {
+            "path": path,
+            "size_mb": round(_size_on_disk(path) / 1e6, 2),
+            "latency_ms_p50": round(float(np.percentile(times_ms, 50)), 2),
+            "latency_ms_p95": round(float(np.percentile(times_ms, 95)), 2),
+            "peak_rss_mb": round(r["peak_rss_kb"] / 1024, 1),
+            "agreement_f1_vs_fp32": round(agreement(refs[fmt], r["dets"]), 3) if fmt in refs else None,
+        }
+
+    report_path = os.path.join(args.out, "quant_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'variant':<15} {'size MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'peak MB':>8} {'agree':>6}")
+    for label, v in report["variants"].items():
+        if "error" in v:
+            print(f"{label:<15} {v['error']}")
+            continue
+        agree = v["agreement_f1_vs_fp32"]
+        print(f"{label:<15} {v['size_mb']:8.2f} {v['latency_ms_p50']:8.2f} {v['latency_ms_p95']:8.2f} "
+              f"{v['peak_rss_mb']:8.1f} {'-' if agree is None else f'{agree:.3f}':>6}")
+    print(f"\n[INFO] Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
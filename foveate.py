@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+
+from postprocess import DIR_SPLIT, process_boxes
+from preprocess import Preprocessor
+
+# --- FOVEATED INFERENCE ---
+# The full frame is inferred at the usual low resolution; a square crop around the walking
+# corridor (the CENTER band of postprocess.directions) goes through a second pass at the same imgsz,
+# i.e. at `1 / fovea` times the full pass's resolution. The crop pass runs every `refresh_every`
+# inferences; a changed corridor can bring the next run forward, but never closer than `min_every`
+# inferences to the last one. In between, its last detections are reused. The crop may be taken
+# from a larger frame than the full pass (the Pi's main stream vs its lores stream).
+
+
+class Fovea:
+    """Plans, prepares and merges the corridor crop pass for one stream."""
+
+    def __init__(self, imgsz=320, dir_split=DIR_SPLIT, fovea=0.5, refresh_every=4, min_every=2,
+                 motion_threshold=0.03, iou=0.5, thumb=(48, 48)):
+        self.preproc = Preprocessor(target_size=imgsz)
+        self.dir_split = dir_split
+        self.fovea = fovea                  # crop side as a fraction of the frame's long side
+        self.refresh_every = refresh_every
+        self.min_every = min_every
+        self.motion_threshold = motion_threshold
+        self.iou = iou
+        self.thumb = thumb
+        self.crop_dets = None
+        self._prev_thumb = None
+        self._since = 0
+        self._region = None
+        self._src = None        # (w, h) of the frame the crop is taken from
+        self._out = 1.0         # crop-source coordinates -> detection frame coordinates
+        self.runs = 0
+        self.reused = 0
+
+    def region(self, w, h):
+        """(x0, y0, x1, y1) of the crop: centered on the corridor, at least the corridor's width."""
+        left, right = self.dir_split
+        side = min(min(w, h), max(int((right - left) * w), int(max(w, h) * self.fovea)))
+        cx, cy = int((left + right) * 0.5 * w), h // 2
+        x0 = min(max(0, cx - side // 2), w - side)
+        y0 = min(max(0, cy - side // 2), h - side)
+        return x0, y0, x0 + side, y0 + side
+
+    def _thumbnail(self, frame, region):
+        x0, y0, x1, y1 = region
+        return cv2.cvtColor(cv2.resize(frame[y0:y1, x0:x1], self.thumb, interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+
+    def due(self, frame):
+        """True when the crop pass should run on this inference: every `refresh_every` inferences,
+        or from `min_every` on when the corridor changed."""
+        h, w = frame.shape[:2]
+        region = self.region(w, h)
+        self._since += 1
+        small = None
+        run = self._region is None or region != self._region or self._since >= self.refresh_every
+        if not run and self._since >= self.min_every:
+            small = self._thumbnail(frame, region)
+            run = float(cv2.absdiff(small, self._prev_thumb).mean()) / 255.0 > self.motion_threshold
+        if not run:
+            self.reused += 1
+            return False
+        self._prev_thumb = small if small is not None else self._thumbnail(frame, region)
+        self._region = region
+        self._since = 0
+        self.runs += 1
+        return True
+
+    def prepare(self, frame, out_w=None):
+        """Letterboxes the crop. Returns (tensor, scale, pad_x, pad_y) with the padding shifted so
+        process_boxes maps the crop's boxes straight into frame coordinates, or into those of an
+        `out_w` wide copy of the frame (the stream the full pass ran on)."""
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self._region or self.region(w, h)
+        tensor, scale, pad_x, pad_y = self.preproc(frame[y0:y1, x0:x1])
+        self._src = (w, h)
+        self._out = 1.0 if out_w is None else out_w / w
+        return tensor, scale / self._out, pad_x - x0 * scale, pad_y - y0 * scale
+
+    def crop_boxes(self, xyxy, cls, conf, frame_w, frame_h, prio_table, scale, pad_x, pad_y):
+        """Crop-pass output -> detections in frame coordinates, minus boxes cut off at the crop
+        edge (the full-frame pass sees those objects whole)."""
+        dets = process_boxes(xyxy, cls, conf, frame_w, frame_h, prio_table, scale, pad_x, pad_y,
+                             dir_split=self.dir_split)
+        x0, y0, x1, y1 = self._region
+        src_w, src_h = self._src
+        s, m = self._out, 2.0   # m: px tolerance
+        cut = (((dets["x1"] <= x0 * s + m) & (x0 > 0)) | ((dets["x2"] >= x1 * s - m) & (x1 < src_w)) |
+               ((dets["y1"] <= y0 * s + m) & (y0 > 0)) | ((dets["y2"] >= y1 * s - m) & (y1 < src_h)))
+        self.crop_dets = dets[~cut]
+        return self.crop_dets
+
+    def merge(self, full_dets):
+        """Full-frame detections plus the latest crop detections, duplicates suppressed."""
+        if self.crop_dets is None or not len(self.crop_dets):
+            return full_dets
+        return merge_detections(full_dets, self.crop_dets, self.iou)
+
+
+def merge_detections(a, b, iou=0.5):
+    """Class-aware NMS over two DET_DTYPE arrays; the higher-confidence box of a pair survives."""
+    if not len(a):
+        return b.copy()
+    dets = np.concatenate([a, b])
+    # Offset boxes per class so one NMS call never suppresses across classes
+    offset = dets["cls"].astype(np.float32) * 8192.0
+    boxes = np.stack([dets["x1"] + offset, dets["y1"], dets["x2"] - dets["x1"], dets["y2"] - dets["y1"]], axis=1)
+    keep = cv2.dnn.NMSBoxes(boxes.tolist(), dets["conf"].tolist(), 0.0, iou)
+    keep = np.sort(np.asarray(keep, dtype=np.intp).reshape(-1))
+    return dets[keep]
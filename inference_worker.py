@@ -0,0 +1,79 @@
+import threading
+import time
+
+
+class InferenceWorker:
+    """
+    Runs inference on a dedicated thread so the video callback never waits on the model.
+    Frames go into a single-slot "latest frame" mailbox: publishing while a frame is still
+    pending replaces it (counted as dropped), so the model always works on the newest frame.
+    """
+
+    def __init__(self, infer_fn, name="inference-worker"):
+        self.infer_fn = infer_fn
+        self._cond = threading.Condition()
+        self._pending = None          # (seq, frame) waiting to be picked up
+        self._latest = (0, [])        # (seq, results) of the last finished inference
+        self._seq = 0
+        self._running = True
+
+        # Counters (read by the UI, written under the lock or by the worker only)
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self.frames_inferred = 0
+        self.busy = False
+        self.last_latency = 0.0
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def published_seq(self):
+        return self._seq
+
+    def publish(self, frame):
+        """Hands a frame to the worker without blocking. Returns its sequence number."""
+        with self._cond:
+            self._seq += 1
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = (self._seq, frame)
+            self.frames_published += 1
+            self._cond.notify()
+            return self._seq
+
+    def latest(self):
+        """Returns (seq, results) for the most recent finished inference."""
+        return self._latest
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                seq, frame = self._pending
+                self._pending = None
+                self.busy = True
+
+            t0 = time.perf_counter()
+            try:
+                results = self.infer_fn(frame)
+                self._latest = (seq, results)
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the previous results; a single bad frame must not kill the worker
+                self.last_error = e
+                print(f"[WARN] Inference failed: {e}")
+            self.last_latency = time.perf_counter() - t0
+            self.frames_inferred += 1
+            self.busy = False
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._pending = None
+            self._cond.notify()
+        self._thread.join(timeout)
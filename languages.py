@@ -0,0 +1,121 @@
+# --- LANGUAGES & PHRASES ---
+# Shared by app.py (browser voice) and pi_navigator.py / phrase_cache.py (on-device voice).
+
+LANGUAGES = {
+    "English": {
+        "code": "en-US",
+        "warning": "Warning",
+        "ahead": "ahead",
+        "left": "on your left",
+        "right": "on your right",
+        "very_close": "very close",
+        "close": "close",
+        "nearby": "nearby",
+        "clear": "Path appears clear",
+        "dark": "Environment too dark",
+        "started": "VisionAid navigation started",
+        "obstacle": "Obstacle ahead",
+    },
+    "Tamil": {
+        "code": "ta-IN",
+        "warning": "எச்சரிக்கை",
+        "ahead": "முன்னால்",
+        "left": "இடதுபுறம்",
+        "right": "வலதுபுறம்",
+        "very_close": "மிக அருகில்",
+        "close": "அருகில்",
+        "nearby": "அண்மையில்",
+        "clear": "பாதை தெளிவாக உள்ளது",
+        "dark": "சூழல் மிகவும் இருட்டாக உள்ளது",
+        "started": "விஷன்எய்ட் தொடங்கியது",
+        "obstacle": "தடை முன்னால்",
+    },
+    "Hindi": {
+        "code": "hi-IN",
+        "warning": "चेतावनी",
+        "ahead": "आगे",
+        "left": "बाईं तरफ",
+        "right": "दाईं तरफ",
+        "very_close": "बहुत पास",
+        "close": "पास",
+        "nearby": "नज़दीक",
+        "clear": "रास्ता साफ है",
+        "dark": "वातावरण बहुत अंधेरा है",
+        "started": "VisionAid शुरू हो गया",
+        "obstacle": "बाधा आगे",
+    }
+}
+
+OBJECT_TRANSLATIONS = {
+    "Tamil": {
+        "person": "நபர்", "car": "கார்", "truck": "லாரி",
+        "bus": "பேருந்து", "motorcycle": "மோட்டார் சைக்கிள்",
+        "bicycle": "சைக்கிள்", "chair": "நாற்காலி",
+        "dining table": "மேசை", "bottle": "பாட்டில்",
+        "dog": "நாய்", "cat": "பூனை", "door": "கதவு",
+        "bed": "படுக்கை", "toilet": "கழிவறை",
+        "tv": "தொலைக்காட்சி", "laptop": "மடிக்கணினி",
+        "cell phone": "கைப்பேசி", "book": "புத்தகம்",
+        "clock": "கடிகாரம்", "cup": "கோப்பை",
+        "traffic light": "போக்குவரத்து விளக்கு",
+        "fire hydrant": "தீயணைப்பு குழாய்",
+        "stop sign": "நிறுத்த அடையாளம்",
+        "bench": "இருக்கை", "backpack": "பை",
+        "umbrella": "குடை", "handbag": "கைப்பை",
+        "suitcase": "பெட்டி", "sports ball": "பந்து",
+        "couch": "சோபா", "potted plant": "தாவரம்",
+        "sink": "கழுவுதொட்டி", "refrigerator": "குளிர்சாதனப்பெட்டி",
+        "scissors": "கத்தரிக்கோல்", "vase": "பூச்சட்டி",
+    },
+    "Hindi": {
+        "person": "व्यक्ति", "car": "कार", "truck": "ट्रक",
+        "bus": "बस", "motorcycle": "मोटरसाइकिल",
+        "bicycle": "साइकिल", "chair": "कुर्सी",
+        "dining table": "मेज़", "bottle": "बोतल",
+        "dog": "कुत्ता", "cat": "बिल्ली", "door": "दरवाज़ा",
+        "bed": "बिस्तर", "toilet": "शौचालय",
+        "tv": "टीवी", "laptop": "लैपटॉप",
+        "cell phone": "मोबाइल फ़ोन", "book": "किताब",
+        "clock": "घड़ी", "cup": "कप",
+        "traffic light": "ट्रैफ़िक लाइट",
+        "fire hydrant": "अग्निशमन यंत्र",
+        "stop sign": "रुकने का संकेत",
+        "bench": "बेंच", "backpack": "बैग",
+        "umbrella": "छाता", "handbag": "पर्स",
+        "suitcase": "सूटकेस", "sports ball": "गेंद",
+        "couch": "सोफ़ा", "potted plant": "पौधा",
+        "sink": "नल", "refrigerator": "फ्रिज",
+        "scissors": "कैंची", "vase": "फूलदान",
+    }
+}
+
+
+def translate_label(label, language):
+    if language == "English": return label
+    return OBJECT_TRANSLATIONS.get(language, {}).get(label, label)
+
+
+def format_announcement(plabel, pdist, pdir, lang_cfg):
+    """App announcement for the primary object (label already translated)."""
+    if pdist == "VERY_CLOSE" and pdir == "CENTER":
+        return f"{lang_cfg['warning']}! {plabel} {lang_cfg['ahead']}, {lang_cfg['very_close']}"
+    elif pdist == "FAR" and pdir == "CENTER":
+        return f"{plabel} {lang_cfg['ahead']}"
+    dir_str = lang_cfg["left"] if pdir == "LEFT" else (lang_cfg["right"] if pdir == "RIGHT" else lang_cfg["ahead"])
+    dist_str = lang_cfg["very_close"] if pdist == "VERY_CLOSE" else (lang_cfg["close"] if pdist == "CLOSE" else (lang_cfg["nearby"] if pdist == "MEDIUM" else ""))
+    return f"{plabel} {dir_str}, {dist_str}".strip(", ")
+
+
+def format_obstacle(obs_dist, lang_cfg):
+    dist_str = lang_cfg["very_close"] if obs_dist == "VERY_CLOSE" else lang_cfg["close"]
+    return f"{lang_cfg['warning']}! {lang_cfg['obstacle']}, {dist_str}"
+
+
+# Pi navigator cues (English, spoken on-device)
+NAV_CLEAR = "The path ahead is clear."
+NAV_STOP = "Stop immediately. A {label} is directly in front of you."
+NAV_BLOCKED = "A {label} is blocking the center. {hint}"
+NAV_SIDE = "I see a {label} on your {zone}."
+NAV_BEHIND = "A {label} is close behind you."
+NAV_LOOMING = "Careful. Something ahead is getting close fast."
+NAV_HINTS = ("Move left.", "Move right.")
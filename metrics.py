@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# --- HOT-PATH INSTRUMENTATION ---
+# Recording is a lock + two array stores per sample; percentiles are only computed when a
+# snapshot is taken (sidebar refresh, periodic report, export).
+
+
+class RollingHistogram:
+    """Last `size` samples (ms) with their timestamps, for percentiles and event rate."""
+
+    def __init__(self, size=512):
+        self.values = np.zeros(size, np.float32)
+        self.stamps = np.zeros(size, np.float64)
+        self.size = size
+        self.count = 0          # all-time
+        self.total = 0.0        # all-time sum, ms
+
+    def add(self, ms, now):
+        i = self.count % self.size
+        self.values[i] = ms
+        self.stamps[i] = now
+        self.count += 1
+        self.total += ms
+
+    def summary(self):
+        n = min(self.count, self.size)
+        if n == 0:
+            return None
+        vals = self.values[:n]
+        p50, p95, p99 = np.percentile(vals, (50, 95, 99))
+        span = self.stamps[:n].max() - self.stamps[:n].min()
+        return {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2),
+                "mean": round(float(vals.mean()), 2), "rate": round((n - 1) / span, 2) if span > 0 else 0.0,
+                "count": self.count, "sum": round(self.total, 1)}
+
+
+class Metrics:
+    """Per-stage timers with rolling histograms plus monotonically increasing counters."""
+
+    def __init__(self, window=512, labels=None):
+        self.window = window
+        self.labels = labels or {}
+        self._hist = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        now = time.time()
+        with self._lock:
+            h = self._hist.get(stage)
+            if h is None:
+                h = self._hist[stage] = RollingHistogram(self.window)
+            h.add(seconds * 1000, now)
+
+    def timer(self, stage):
+        return _Timer(self, stage)
+
+    def incr(self, counter, n=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + n
+
+    def set_counter(self, counter, value):
+        """For counters owned by another object (e.g. a worker's drop count)."""
+        with self._lock:
+            self._counters[counter] = value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self):
+        with self._lock:
+            stages = {k: h.summary() for k, h in self._hist.items()}
+            return {"ts": round(time.time(), 3), "labels": dict(self.labels),
+                    "stages": {k: v for k, v in stages.items() if v is not None},
+                    "counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def report(self):
+        """One-line summary for terminal logs."""
+        snap = self.snapshot()
+        parts = [f"{k} p50 {v['p50']:.1f}/p95 {v['p95']:.1f}ms @ {v['rate']:.1f}/s" for k, v in snap["stages"].items()]
+        parts += [f"{k} {v}" for k, v in snap["counters"].items()]
+        return " | ".join(parts)
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "t0")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add(self.stage, time.perf_counter() - self.t0)
+
+
+# --- EXPORT ---
+def _prom_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def to_prometheus(snapshots, prefix="visionaid"):
+    """Prometheus text exposition for a list of Metrics snapshots."""
+    lines = [f"# TYPE {prefix}_stage_ms summary", f"# TYPE {prefix}_stage_rate gauge"]
+    for snap in snapshots:
+        for stage, s in snap["stages"].items():
+            labels = {**snap["labels"], "stage": stage}
+            for q, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+                lines.append(f"{prefix}_stage_ms{_prom_labels({**labels, 'quantile': quantile})} {s[q]}")
+            lines.append(f"{prefix}_stage_ms_sum{_prom_labels(labels)} {s['sum']}")
+            lines.append(f"{prefix}_stage_ms_count{_prom_labels(labels)} {s['count']}")
+            lines.append(f"{prefix}_stage_rate{_prom_labels(labels)} {s['rate']}")
+        for name, value in snap["counters"].items():
+            lines.append(f"{prefix}_{name}_total{_prom_labels(snap['labels'])} {value}")
+        for name, value in snap["gauges"].items():
+            lines.append(f"{prefix}_{name}{_prom_labels(snap['labels'])} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Periodically writes every registered Metrics to `path` (JSON lines appended, or Prometheus
+    text replaced atomically when path ends in .prom) and/or serves them at
+    http://<host>:<port>/metrics (Prometheus) and /metrics.json.
+    """
+
+    def __init__(self, path=None, port=None, interval=5.0, host="0.0.0.0"):
+        self.path = path
+        self.interval = interval
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.server = None
+        if port:
+            try:
+                self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+                print(f"[INFO] Metrics served on {host}:{port}/metrics")
+            except OSError as e:
+                print(f"[WARN] Metrics endpoint disabled, could not bind port {port}: {e}")
+        if path:
+            threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True).start()
+
+    def register(self, key, metrics):
+        with self._lock:
+            self._sources[key] = metrics
+
+    def unregister(self, key):
+        with self._lock:
+            self._sources.pop(key, None)
+
+    def snapshots(self):
+        with self._lock:
+            sources = list(self._sources.values())
+        return [m.snapshot() for m in sources]
+
+    def write(self):
+        snaps = self.snapshots()
+        if not snaps:
+            return
+        if self.path.endswith(".prom"):
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(to_prometheus(snaps))
+            os.replace(tmp, self.path)
+        else:
+            with open(self.path, "a") as f:
+                for snap in snaps:
+                    f.write(json.dumps(snap) + "\n")
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"[WARN] Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self.path:
+            self.write()
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def _make_handler(exporter):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, ctype = to_prometheus(exporter.snapshots()), "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body, ctype = json.dumps(exporter.snapshots()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return MetricsHandler
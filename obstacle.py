@@ -0,0 +1,128 @@
+import cv2
+import numpy as np
+
+
+# [FIX 1] Drop MiDaS entirely and use lightweight detect_large_obstacle
+def detect_large_obstacle(frame_bgr):
+    """
+    Fast obstacle detection using contour area — no neural network.
+    Detects any large object in center zone occupying > 20% of frame area.
+    Takes < 5ms on CPU.
+    Reference implementation; the app uses ObstacleDetector.
+    """
+    h, w = frame_bgr.shape[:2]
+    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (21, 21), 0)
+    edges = cv2.Canny(blurred, 30, 100)
+
+    # Center zone only
+    cx1, cx2 = int(w*0.25), int(w*0.75)
+    cy1, cy2 = int(h*0.15), int(h*0.85)
+    center_edges = edges[cy1:cy2, cx1:cx2]
+
+    contours, _ = cv2.findContours(center_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    center_area = (cx2-cx1) * (cy2-cy1)
+    total_contour_area = sum(cv2.contourArea(c) for c in contours if cv2.contourArea(c) > 500)
+    ratio = total_contour_area / center_area
+
+    if ratio > 0.45:   return "VERY_CLOSE"
+    elif ratio > 0.25: return "CLOSE"
+    return None
+
+
+class ObstacleDetector:
+    """
+    Fast obstacle detection using contour area — no neural network.
+    Processes only the center zone (plus a margin wide enough for the blur and Canny to see the
+    same neighbourhood as the full frame), reuses its scratch buffers between calls and smooths
+    the fill ratio over time with hysteresis so the VERY_CLOSE / CLOSE output doesn't flicker.
+    Per frame, the raw ratio matches the original full-frame detect_large_obstacle.
+    `work_size` (longest ROI side in px) trades that parity for speed: whether a thin outline
+    closes depends on resolution, so downscaled verdicts can differ from the reference.
+    """
+
+    ZONE_X = (0.25, 0.75)
+    ZONE_Y = (0.15, 0.85)
+
+    def __init__(self, work_size=None, min_contour_area=500, very_close=0.45, close=0.25,
+                 hysteresis=0.05, smoothing=0.5, blur_ksize=21):
+        self.work_size = work_size
+        self.very_close = very_close
+        self.close = close
+        self.hysteresis = hysteresis     # ratio must fall this far below a threshold to release it
+        self.smoothing = smoothing       # EWMA weight of the newest ratio
+        self.min_contour_area = min_contour_area
+        self.blur_ksize = blur_ksize
+        self.ratio = 0.0
+        self.level = None
+        self._shape = None
+        self._small = self._gray = self._blur = self._edges = None
+
+    def _prepare(self, h, w):
+        cx1, cx2 = int(w*self.ZONE_X[0]), int(w*self.ZONE_X[1])
+        cy1, cy2 = int(h*self.ZONE_Y[0]), int(h*self.ZONE_Y[1])
+        roi_w, roi_h = cx2 - cx1, cy2 - cy1
+        # Scale factor from the ROI to the working resolution; full-res pixel constants are rescaled by it
+        f = 1.0 if not self.work_size else min(1.0, self.work_size / max(roi_h, roi_w))
+        k = max(3, int(self.blur_ksize * f) | 1)
+        self._ksize = (k, k)
+        self._min_area = self.min_contour_area * f * f
+        self._center_area = float(max(1, int(roi_w * f)) * max(1, int(roi_h * f)))
+        # Margin (in full-res px) so blur, Sobel and edge linking inside the zone see real pixels
+        m = int(np.ceil((k // 2 + 2) / f))
+        self._src = (max(0, cy1 - m), min(h, cy2 + m), max(0, cx1 - m), min(w, cx2 + m))
+        sy1, sy2, sx1, sx2 = self._src
+        sw, sh = max(1, round((sx2 - sx1) * f)), max(1, round((sy2 - sy1) * f))
+        self._size = (sw, sh)
+        # Zone inside the processed (padded, scaled) image
+        zx1, zy1 = round((cx1 - sx1) * f), round((cy1 - sy1) * f)
+        self._zone = (zy1, zy1 + max(1, int(roi_h * f)), zx1, zx1 + max(1, int(roi_w * f)))
+        self._small = np.empty((sh, sw, 3), np.uint8) if f < 1.0 else None
+        self._gray = np.empty((sh, sw), np.uint8)
+        self._blur = np.empty((sh, sw), np.uint8)
+        self._edges = np.empty((sh, sw), np.uint8)
+
+    def raw_ratio(self, frame_bgr):
+        """Fraction of the center zone covered by large edge contours for this frame only."""
+        h, w = frame_bgr.shape[:2]
+        if self._shape != (h, w):
+            self._prepare(h, w)
+            self._shape = (h, w)
+
+        sy1, sy2, sx1, sx2 = self._src
+        src = frame_bgr[sy1:sy2, sx1:sx2]
+        if self._small is not None:
+            src = cv2.resize(src, self._size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.GaussianBlur(self._gray, self._ksize, 0, dst=self._blur)
+        cv2.Canny(self._blur, 30, 100, edges=self._edges)
+
+        zy1, zy2, zx1, zx2 = self._zone
+        contours, _ = cv2.findContours(self._edges[zy1:zy2, zx1:zx2], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        total = 0.0
+        for c in contours:
+            a = cv2.contourArea(c)
+            if a > self._min_area:
+                total += a
+        return total / self._center_area
+
+    def __call__(self, frame_bgr):
+        ratio = self.raw_ratio(frame_bgr)
+        self.ratio += self.smoothing * (ratio - self.ratio)
+
+        # Hysteresis: enter a level at its threshold, leave it only once clearly below
+        r, hy = self.ratio, self.hysteresis
+        if self.level == "VERY_CLOSE" and r > self.very_close - hy:
+            return self.level
+        if r > self.very_close:
+            self.level = "VERY_CLOSE"
+        elif r > self.close or (self.level is not None and r > self.close - hy):
+            self.level = "CLOSE"
+        else:
+            self.level = None
+        return self.level
+
+    def reset(self):
+        self.ratio = 0.0
+        self.level = None
@@ -0,0 +1,284 @@
+"""
+Pre-rendered phrase audio: every cue the navigator can say is synthesized once to a compact
+16 kHz mono WAV clip, then played back instantly instead of being synthesized at cue time.
+
+    python3 phrase_cache.py --pi                          # Pi navigator cues -> ~/.cache/visionaid/phrases
+    python3 phrase_cache.py --out static/phrases          # app cues, all LANGUAGES (served to the browser)
+"""
+import argparse
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+
+import numpy as np
+
+from languages import (LANGUAGES, OBJECT_TRANSLATIONS, translate_label, format_announcement, format_obstacle,
+                       NAV_CLEAR, NAV_STOP, NAV_BLOCKED, NAV_SIDE, NAV_HINTS, NAV_BEHIND, NAV_LOOMING)
+
+CACHE_DIR = os.path.expanduser(os.environ.get("VISIONAID_PHRASE_DIR", "~/.cache/visionaid/phrases"))
+APP_PHRASE_DIR = os.path.join("static", "phrases")
+ESPEAK_VOICES = {"English": "en-us", "Tamil": "ta", "Hindi": "hi"}
+SAMPLE_RATE = 16000
+# Labels that get pre-rendered; anything else is rendered the first time it is needed
+DEFAULT_LABELS = sorted(OBJECT_TRANSLATIONS["Tamil"])
+
+
+def clip_path(text, language="English", root=CACHE_DIR):
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(root, language.lower(), f"{digest}.wav")
+
+
+# --- PHRASE ENUMERATION ---
+def app_phrases(language, labels=DEFAULT_LABELS):
+    cfg = LANGUAGES[language]
+    for label in labels:
+        plabel = translate_label(label, language)
+        for dist in ("VERY_CLOSE", "CLOSE", "MEDIUM", "FAR"):
+            for direction in ("LEFT", "CENTER", "RIGHT"):
+                yield format_announcement(plabel, dist, direction, cfg)
+    yield format_obstacle("VERY_CLOSE", cfg)
+    yield format_obstacle("CLOSE", cfg)
+    for key in ("clear", "dark", "started"):
+        yield cfg[key]
+
+
+def nav_phrases(labels=DEFAULT_LABELS):
+    yield NAV_CLEAR
+    yield NAV_LOOMING
+    for label in labels:
+        yield NAV_STOP.format(label=label)
+        for hint in NAV_HINTS:
+            yield NAV_BLOCKED.format(label=label, hint=hint)
+        for zone in ("left", "right"):
+            yield NAV_SIDE.format(label=label, zone=zone)
+        yield NAV_BEHIND.format(label=label)
+
+
+# --- RENDERING ---
+def _read_wav(path):
+    with wave.open(path, "rb") as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        data = w.readframes(w.getnframes())
+    pcm = np.frombuffer(data, dtype={1: np.uint8, 2: np.int16}[width]).astype(np.float32)
+    if width == 1:
+        pcm = (pcm - 128) * 256
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    return pcm, rate
+
+
+def _write_compact(pcm, rate, path):
+    """Resamples to 16 kHz mono int16 and trims leading/trailing silence."""
+    if rate != SAMPLE_RATE and len(pcm):
+        n = int(len(pcm) * SAMPLE_RATE / rate)
+        pcm = np.interp(np.linspace(0, len(pcm) - 1, n), np.arange(len(pcm)), pcm)
+    loud = np.flatnonzero(np.abs(pcm) > 300)
+    if len(loud):
+        pad = SAMPLE_RATE // 50
+        pcm = pcm[max(0, loud[0] - pad):loud[-1] + pad]
+    # Written next to the final path and renamed into place: PhraseCache.get() on the speech
+    # thread must never open a half-written clip
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(np.clip(pcm, -32768, 32767).astype(np.int16).tobytes())
+        os.chmod(tmp, 0o644)   # mkstemp creates 0600; the app's clips are served as static files
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class PhraseRenderer:
+    """Offline synthesis with espeak-ng (all three languages) or pyttsx3 (whatever voice it has)."""
+
+    def __init__(self, rate=160):
+        self.rate = rate
+        self.espeak = shutil.which("espeak-ng") or shutil.which("espeak")
+        self._engine = None
+
+    def render(self, text, language, path):
+        fd, tmp = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            if self.espeak:
+                voice = ESPEAK_VOICES.get(language, "en-us")
+                subprocess.run([self.espeak, "-v", voice, "-s", str(self.rate), "-w", tmp, text],
+                               check=True, capture_output=True)
+            else:
+                if self._engine is None:
+                    import pyttsx3
+                    self._engine = pyttsx3.init()
+                    self._engine.setProperty("rate", self.rate)
+                self._engine.save_to_file(text, tmp)
+                self._engine.runAndWait()
+            pcm, rate = _read_wav(tmp)
+            _write_compact(pcm, rate, path)
+        finally:
+            os.remove(tmp)
+        return path
+
+
+# --- CACHE & PLAYBACK ---
+class PhraseCache:
+    """
+    Disk-backed phrase clips with an in-memory LRU of hot clips.
+    get() never synthesizes on the caller's thread: a missing clip returns None and is queued
+    for background rendering, so the next request for it is instant.
+    """
+
+    def __init__(self, root=CACHE_DIR, language="English", max_items=64, renderer=None, render_missing=True):
+        self.root = root
+        self.language = language
+        self.max_items = max_items
+        self.renderer = renderer or PhraseRenderer()
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._todo = queue.Queue()
+        self.hits = self.misses = 0
+        self.render_missing = render_missing
+        if render_missing:
+            threading.Thread(target=self._render_loop, name="phrase-render", daemon=True).start()
+
+    def get(self, text):
+        """Returns (pcm_int16_bytes, path) or None when the clip is not rendered yet."""
+        with self._lock:
+            clip = self._lru.get(text)
+            if clip is not None:
+                self._lru.move_to_end(text)
+                self.hits += 1
+                return clip
+        path = clip_path(text, self.language, self.root)
+        if not os.path.exists(path):
+            self.misses += 1
+            if self.render_missing and text not in self._pending:
+                self._pending.add(text)
+                self._todo.put(text)
+            return None
+        with wave.open(path, "rb") as w:
+            clip = (w.readframes(w.getnframes()), path)
+        with self._lock:
+            self._lru[text] = clip
+            if len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+            self.hits += 1
+        return clip
+
+    def _render_loop(self):
+        while True:
+            text = self._todo.get()
+            try:
+                self.renderer.render(text, self.language, clip_path(text, self.language, self.root))
+            except Exception as e:
+                print(f"[WARN] Could not render phrase '{text}': {e}")
+            self._pending.discard(text)
+
+
+class CachedVoice:
+    """
+    pyttsx3-compatible engine (say / runAndWait / stop) that plays pre-rendered clips and
+    falls back to live synthesis with `engine` for phrases not in the cache yet.
+    Drop-in for speech.SpeechWorker.
+    """
+
+    def __init__(self, cache, engine=None):
+        self.cache = cache
+        self.engine = engine
+        self._text = None
+        self._play = None
+        try:
+            import simpleaudio
+            self._sa = simpleaudio
+        except ImportError:
+            self._sa = None
+        self._aplay = shutil.which("aplay")
+
+    def say(self, text):
+        self._text = text
+
+    def runAndWait(self):
+        text, self._text = self._text, None
+        if not text:
+            return
+        clip = self.cache.get(text) if (self._sa or self._aplay) else None
+        if clip is not None:
+            pcm, path = clip
+            if self._sa is not None:
+                self._play = self._sa.play_buffer(pcm, 1, 2, SAMPLE_RATE)
+                self._play.wait_done()
+            else:
+                self._play = subprocess.Popen([self._aplay, "-q", path])
+                self._play.wait()
+            self._play = None
+        elif self.engine is not None:
+            self.engine.say(text)
+            self.engine.runAndWait()
+        else:
+            print(f"[VOICE SIM] {text}")
+
+    def stop(self):
+        play = self._play
+        if play is not None:
+            try:
+                play.stop() if hasattr(play, "stop") else play.terminate()
+            except Exception:
+                pass
+        if self.engine is not None:
+            try:
+                self.engine.stop()
+            except Exception:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render VisionAid phrase audio")
+    parser.add_argument("--pi", action="store_true", help="Render the Pi navigator's English cues")
+    parser.add_argument("--languages", nargs="*", default=list(LANGUAGES), choices=list(LANGUAGES),
+                        help="App languages to render (ignored with --pi)")
+    parser.add_argument("--labels", choices=["default", "all"], default="default",
+                        help="'all' renders every COCO label instead of the common navigation ones")
+    parser.add_argument("--out", default=None, help=f"Output folder (default: {CACHE_DIR}, or {APP_PHRASE_DIR} for app cues)")
+    parser.add_argument("--force", action="store_true", help="Re-render clips that already exist")
+    args = parser.parse_args()
+
+    labels = DEFAULT_LABELS
+    if args.labels == "all":
+        from detectors import COCO_NAMES
+        labels = COCO_NAMES
+
+    jobs = []
+    if args.pi:
+        root = args.out or CACHE_DIR
+        jobs = [("English", t, root) for t in nav_phrases(labels)]
+    else:
+        root = args.out or APP_PHRASE_DIR
+        for lang in args.languages:
+            jobs += [(lang, t, root) for t in app_phrases(lang, labels)]
+
+    renderer = PhraseRenderer()
+    done = skipped = 0
+    for lang, text, root in dict.fromkeys(jobs):
+        path = clip_path(text, lang, root)
+        if os.path.exists(path) and not args.force:
+            skipped += 1
+            continue
+        renderer.render(text, lang, path)
+        done += 1
+        if done % 50 == 0:
+            print(f"[INFO] Rendered {done} clips...")
+    print(f"[INFO] Rendered {done} clips ({skipped} already cached) into {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,33 @@ import cv2
 import numpy as np
 import time
 import threading
-import pyttsx3
+import queue
 import argparse
 import os
 
+from postprocess import DIST_LEVELS, EMPTY_DETS, LEFT, RIGHT, build_priority_table, process_boxes
+from annotate import draw_detections
+from foveate import Fovea
+from ttc import LoomingEstimator, raise_urgency, ttc_level
+from scheduler import InferenceScheduler
+from preprocess import Preprocessor
+from detectors import BACKENDS, load_detector
+from announcer import Announcer, NavPhrasebook
+from phrase_cache import PhraseCache, CachedVoice
+from speech import SpeechWorker, NullEngine, INFO
+from capture import (OpenCVSource, Picamera2Source, LatestFrameBuffer, CaptureThread, FrameRecorder,
+                     lores_size, open_replay_source)
+from metrics import Metrics, MetricsExporter
+from startup import StartupProfiler, ModelWarmup, lazy_module
+
+try:
+    pyttsx3 = lazy_module("pyttsx3") # imported on first use, off the model warm-up's critical path
+except ImportError:
+    pyttsx3 = None
+
 # --- HARDWARE ABSTRACTION LAYER ---
 try:
-    from picamera2 import Picamera2
+    from picamera2 import Picamera2  # noqa: F401
     HAS_PICAMERA = True
 except ImportError:
     HAS_PICAMERA = False
@@ -22,140 +42,413 @@ PRIORITIES = {
     "refrigerator": 2, "book": 2, "clock": 2, "vase": 2, "scissors": 2, "teddy bear": 2, "hair drier": 2, "toothbrush": 2
 }
 
+# --- MULTI-CAMERA ---
+# Extra cameras are named by where they face. All cameras share one model: the newest frame of
+# each goes through a single batched predict() call, and their detections merge into one hazard
+# picture in the wearer's frame for one announcement stream.
+CAMERA_ROLES = ("front", "left", "right", "rear")
+SYNC_WINDOW = 0.1   # s; a secondary frame older than the lead frame by more than this is skipped
+VIEW_MAX_AGE = 1.0  # s; a camera's detections are dropped from the merged picture after this
+
+class Camera:
+    """One input stream: source, latest-frame buffer, capture thread and its last detections."""
+
+    def __init__(self, name, source, lossless=False, recorder=None, on_read=None, recorded_time=False):
+        self.name = name
+        self.source = source
+        self.recorder = recorder
+        self.frames = LatestFrameBuffer(lossless=lossless)
+        self.capture = CaptureThread(source, self.frames, on_read=on_read, recorder=recorder,
+                                     recorded_time=recorded_time)
+        self.capture.name = f"capture-{name}"
+        self.preproc = None
+        self.packet = None
+        self.objs = EMPTY_DETS
+        self.detected_at = None
+
+def merge_views(cameras, now, max_age=VIEW_MAX_AGE):
+    """
+    Merges per-camera detections into (ahead, behind). Side cameras' objects count as LEFT/RIGHT
+    with zero area, so they rank after front objects of the same priority and never trigger the
+    straight-ahead stop cue; the rear camera is kept apart.
+    """
+    ahead, behind = [], []
+    for cam in cameras:
+        if not len(cam.objs) or cam.detected_at is None or now - cam.detected_at > max_age:
+            continue
+        if cam.name == "rear":
+            behind.append(cam.objs)
+        elif cam.name in ("left", "right"):
+            objs = cam.objs.copy()
+            objs["dir"] = LEFT if cam.name == "left" else RIGHT
+            objs["area"] = 0.0
+            ahead.append(objs)
+        else:
+            ahead.append(cam.objs)
+    join = lambda parts: parts[0] if len(parts) == 1 else (np.concatenate(parts) if parts else EMPTY_DETS)
+    return join(ahead), join(behind)
+
+def parse_camera(spec):
+    """'NAME[=SOURCE]' -> (name, source): SOURCE is a device index or a video / image folder."""
+    name, _, source = spec.partition("=")
+    if name not in CAMERA_ROLES:
+        raise argparse.ArgumentTypeError(f"camera name must be one of {', '.join(CAMERA_ROLES)}")
+    if not source:
+        return name, None
+    return name, int(source) if source.isdigit() else source
+
 class NavigatorPi:
-    def __init__(self, frequency=1.0, display=False, pc_test=False):
+    def __init__(self, frequency=1.0, display=False, pc_test=False, backend=None, imgsz=320, stats_every=5.0,
+                 metrics_file=None, metrics_port=None, input_path=None, realtime=False, record_dir=None,
+                 startup=None, cameras=None, foveated=False, ttc=True):
         self.frequency = frequency
         self.display = display
         self.pc_test = pc_test or (not HAS_PICAMERA)
+        self.stats_every = stats_every
+        self.imgsz = imgsz
+        self.foveated = foveated
+        self.fovea = None
+        # Per-frame looming estimate on the lead camera, between inference ticks
+        self.looming = LoomingEstimator(dir_split=(1/3, 2/3)) if ttc else None
+        # cameras: [(name, source)], source a device index, a replay path or None (default device).
+        # The first one leads: it paces inference and the scheduler watches its motion.
+        cameras = cameras or [("front", input_path)]
+        # Replay from a file: speech is stubbed. Without --realtime every frame is inferred and
+        # nothing is dropped, so runs on the same footage are deterministic.
+        self.replay = all(isinstance(src, str) for _, src in cameras)
+        if not self.replay and any(isinstance(src, str) for _, src in cameras):
+            raise ValueError("Cannot mix live cameras and replay inputs")
+        self.fast_replay = self.replay and not realtime
+        self.startup = startup or StartupProfiler("pi")
+
+        # Load Model (fastest available backend on this CPU: OpenVINO, ONNX Runtime, PyTorch or cv2.dnn).
+        # Loading and warm-up run in the background while TTS and the camera come up; the
+        # inference thread picks the model up in _init_model().
+        self.warmup = ModelWarmup(lambda: load_detector(imgsz=imgsz, backend=backend), profiler=self.startup)
+        self.model = None
         
         # Initialize TTS Engine
-        try:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty('rate', 160)
-            self.has_tts = True
-        except Exception as e:
-            print(f"[WARN] TTS failed to initialize: {e}. Falling back to terminal output.")
-            self.has_tts = False
-        
-        # Load Model (Prioritize OpenVINO for RPi 5, otherwise standard YOLOv8n)
-        from ultralytics import YOLO
-        ov_model = "yolov8n_openvino_model"
-        if os.path.exists(ov_model) and not self.pc_test:
-            print(f"[INFO] Using ACCELERATED OpenVINO engine: {ov_model}")
-            self.model = YOLO(ov_model, task="detect")
-        else:
-            engine_name = "STANDARD YOLOv8-nano" if not self.pc_test else "PC EMULATION"
-            print(f"[INFO] Using {engine_name} engine (yolov8n.pt)...")
-            self.model = YOLO("yolov8n.pt")
+        self.has_tts = False
+        if not self.replay:
+            with self.startup.phase("tts_init"):
+                try:
+                    if pyttsx3 is None: raise ImportError("pyttsx3 is not installed")
+                    self.engine = pyttsx3.init()
+                    self.engine.setProperty('rate', 160)
+                    self.has_tts = True
+                except Exception as e:
+                    print(f"[WARN] TTS failed to initialize: {e}. Falling back to terminal output.")
         
-        # Initialize Camera
-        if self.pc_test:
-            print("[INFO] Initializing PC Webcam (cv2.VideoCapture)...")
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                raise ConnectionError("Could not open PC Webcam. Please check connection.")
-        else:
-            print("[INFO] Initializing Picamera2...")
-            self.picam2 = Picamera2()
-            self.picam2.configure(self.picam2.create_video_configuration(main={"size": (640, 480)}))
-            self.picam2.start()
+        # Initialize Cameras (Picamera2 feeds inference from a lores stream sized for imgsz, or from
+        # the main stream when imgsz is as wide as it)
+        self.metrics = Metrics(labels={"app": "pi"})
+        self.cameras = []
+        with self.startup.phase("camera_init"):
+            for i, (name, src) in enumerate(cameras):
+                if self.replay:
+                    print(f"[INFO] Replaying {src} as {name} ({'real-time' if realtime else 'as fast as possible'})")
+                    source = open_replay_source(src, realtime=realtime)
+                else:
+                    index = i if src is None else src
+                    source = OpenCVSource(index) if self.pc_test else Picamera2Source(main_size=(640, 480), lores_size=lores_size(imgsz), camera_num=index)
+                # With several cameras each one records into its own subfolder
+                out_dir = record_dir if len(cameras) == 1 else (record_dir and os.path.join(record_dir, name))
+                self.cameras.append(Camera(name, source, lossless=self.fast_replay,
+                                           recorder=FrameRecorder(out_dir) if out_dir else None,
+                                           on_read=self._on_read, recorded_time=self.fast_replay))
+        self.lead = self.cameras[0]
         
-        self.last_speech_time = 0
-        self.lock = threading.Lock()
+        # Speaks only when the hazard picture changes; `frequency` is the minimum gap between
+        # non-escalating announcements
+        self.announcer = Announcer(NavPhrasebook(), dir_split=(1/3, 2/3), min_gap=frequency)
+        # Inference no longer runs on every captured frame; the scheduler adapts the rate
+        self.scheduler = InferenceScheduler(base_interval=0.25, min_interval=0.05, max_interval=1.0)
+        self.objs = EMPTY_DETS
+        self.behind = EMPTY_DETS
+        self.objs_time = None
+        self.unsynced = 0
+        self.batches = 0
+        self.batched_frames = 0
         self.running = True
 
-    def speak(self, text):
-        if not self.has_tts:
-            print(f"[VOICE SIM] {text}")
+        # Pipeline: capture (one thread per camera) -> latest-frame buffers -> batched inference
+        # -> bounded queue -> output (main thread)
+        self.exporter = None
+        if metrics_file or metrics_port:
+            self.exporter = MetricsExporter(path=metrics_file, port=metrics_port, interval=stats_every)
+            self.exporter.register("pi", self.metrics)
+        self.results = queue.Queue(maxsize=2)
+        self.infer_thread = threading.Thread(target=self._inference_loop, name="inference", daemon=True)
+
+        # Single speech thread: urgent cues preempt, superseded/stale cues are dropped.
+        # Cues play from pre-rendered clips (phrase_cache.py --pi); live TTS only for cache misses.
+        if self.replay:
+            self.voice = NullEngine()
+        else:
+            self.voice = CachedVoice(PhraseCache(), engine=self.engine if self.has_tts else None)
+        self.speech = SpeechWorker(self.voice, on_start=self._on_speech_start)
+
+    def _init_model(self):
+        self.model = self.warmup.result()
+        if self.model.imgsz != self.imgsz:
+            print(f"[WARN] The model runs at {self.model.imgsz} px but the camera streams were sized for "
+                  f"--imgsz {self.imgsz}. Re-export the model at {self.imgsz} or pass --imgsz {self.model.imgsz}.")
+        for cam in self.cameras:
+            cam.preproc = Preprocessor(target_size=self.model.imgsz)   # each keeps its own tensor buffer
+        self.prio_table = build_priority_table(self.model.names, PRIORITIES, default=3)
+        if self.foveated:
+            # Corridor crop of the lead camera only: that is where the walking path is
+            self.fovea = Fovea(self.model.imgsz, dir_split=(1/3, 2/3))
+
+    def _on_read(self, seconds):
+        self.metrics.add("capture", seconds)
+        if "first_frame" not in self.startup.phases:
+            self.startup.mark("first_frame")
+
+    def _on_speech_start(self, text, meta):
+        # meta: (frame capture time, time the announced detection finished)
+        if not meta: return
+        captured_at, detected_at = meta
+        now = time.time()
+        if captured_at:
+            self.metrics.add("end_to_end", now - captured_at)
+        if detected_at:
+            self.metrics.add("detect_to_cue", now - detected_at)
+
+    def speak(self, text, priority=INFO, captured_at=None, detected_at=None):
+        self.speech.say(text, priority=priority, meta=(captured_at, detected_at))
+
+    def _gather(self, lead_packet):
+        """Newest frame of every camera, taken together so they share one model call."""
+        batch = [(self.lead, lead_packet)]
+        for cam in self.cameras[1:]:
+            packet = cam.frames.get(timeout=0.5 if self.fast_replay else 0)
+            if packet is None:
+                continue
+            if not self.fast_replay and lead_packet.ts - packet.ts > SYNC_WINDOW:
+                self.unsynced += 1
+                continue
+            batch.append((cam, packet))
+        return batch
+
+    def _detect(self, batch):
+        lead = batch[0][1]
+        with self.metrics.timer("preprocess"):
+            prepped = [cam.preproc(packet.infer_frame) for cam, packet in batch]
+            crop = None
+            if self.fovea is not None and self.fovea.due(lead.frame):
+                # Crop the main stream: an upscaled lores crop has no pixels the full pass lacked.
+                # Its boxes come back in lores (infer_frame) coordinates.
+                crop = self.fovea.prepare(lead.frame, out_w=lead.infer_frame.shape[1])
+            tensors = [p[0] for p in prepped] + ([crop[0]] if crop is not None else [])
+            tensor = tensors[0] if len(tensors) == 1 else np.concatenate(tensors)
+        with self.metrics.timer("inference"):
+            outputs = self.model.predict(tensor, conf=0.45)
+        with self.metrics.timer("postprocess"):
+            now = time.time()
+            for (cam, packet), (_, scale, pad_x, pad_y), (xyxy, cls, conf) in zip(batch, prepped, outputs):
+                h, w = packet.infer_frame.shape[:2]
+                cam.objs = process_boxes(xyxy, cls, conf, w, h, self.prio_table, scale, pad_x, pad_y, dir_split=(1/3, 2/3))
+                cam.packet = packet
+                cam.detected_at = now
+            if self.fovea is not None:
+                h, w = lead.infer_frame.shape[:2]
+                if crop is not None:
+                    self.fovea.crop_boxes(*outputs[-1], w, h, self.prio_table, *crop[1:])
+                self.lead.objs = self.fovea.merge(self.lead.objs)
+            self.batches += 1
+            self.batched_frames += len(batch)
+            return merge_views(self.cameras, now)
+
+    def _inference_loop(self):
+        try:
+            self._init_model()
+            while self.running:
+                packet = self.lead.frames.get(timeout=0.5)
+                if packet is None:
+                    if self.lead.frames.closed: break
+                    continue
+
+                # YOLO Inference (when the scheduler says so; otherwise keep the last objects)
+                self.scheduler.observe_frame(packet.infer_frame)
+                if self.fast_replay or self.scheduler.due(packet.ts):
+                    t0 = time.perf_counter()
+                    self.objs, self.behind = self._detect(self._gather(packet))
+                    self.objs_time = time.time()
+                    self.scheduler.record_latency(time.perf_counter() - t0)
+                    if not self.startup.reported:
+                        self.startup.first_inference(time.perf_counter() - t0)
+                    self.scheduler.update_hazard(self.objs)
+                else:
+                    self.lead.packet = packet
+
+                looming = None
+                if self.looming is not None:
+                    with self.metrics.timer("ttc"):
+                        center_ttc, box_ttc = self.looming.update(packet.infer_frame, packet.ts, self.lead.objs)
+                        looming = ttc_level(center_ttc)
+                    if raise_urgency(self.lead.objs, box_ttc) or looming is not None:
+                        self.objs, self.behind = merge_views(self.cameras, time.time())
+                        self.scheduler.update_hazard(self.objs, None if looming is None else DIST_LEVELS[looming])
+
+                views = [(cam.name, cam.packet, cam.objs) for cam in self.cameras if cam.packet is not None]
+                self._offer((packet, self.objs, self.behind, self.objs_time, views, looming is not None))
+        except Exception as e:
+            print(f"[ERROR] Inference failed: {e}")
+        finally:
+            self._offer(None)
+
+    def _offer(self, item):
+        if self.fast_replay:
+            # Lossless hand-off for deterministic replay
+            while self.running:
+                try:
+                    self.results.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    pass
             return
-            
-        def _say():
-            with self.lock:
-                self.engine.say(text)
-                self.engine.runAndWait()
-        threading.Thread(target=_say).start()
+        # Bounded hand-off: if the output stage falls behind, drop the oldest result
+        while True:
+            try:
+                self.results.put_nowait(item)
+                return
+            except queue.Full:
+                try: self.results.get_nowait()
+                except queue.Empty: pass
+
+    def _announce(self, packet, objs, behind, looming, now, detected_at=None):
+        h, w = packet.infer_frame.shape[:2]
+        with self.metrics.timer("announce"):
+            event = self.announcer.update(objs, w, h, now, names=self.model.names, behind=behind, looming=looming)
+        if event is None: return
+        print(f"[NAV] {event.text}")
+        self.speak(event.text, event.priority, None if self.fast_replay else packet.ts, detected_at)
+
+    def _draw(self, frame, infer_frame, objs, title):
+        # Boxes are in inference-frame coordinates; scale them if display uses the main stream
+        sx = frame.shape[1] / infer_frame.shape[1]
+        sy = frame.shape[0] / infer_frame.shape[0]
+        with self.metrics.timer("annotate"):
+            draw_detections(frame, objs, self.model.names, sx, sy)
+        cv2.imshow(title, frame)
 
     def run(self):
-        mode_str = "PC EMULATION" if self.pc_test else "HARDWARE"
-        print(f"[INFO] Starting Navigator Loop | Mode: {mode_str} | Interval: {self.frequency}s")
+        mode_str = "REPLAY" if self.replay else ("PC EMULATION" if self.pc_test else "HARDWARE")
+        print(f"[INFO] Starting Navigator Loop | Mode: {mode_str} | Min. announcement gap: {self.frequency}s")
+        started = time.perf_counter()
+        for cam in self.cameras:
+            cam.capture.start()
+        self.infer_thread.start()
+        last_stats = time.time()
         try:
+            # Output stage runs on the main thread (cv2.imshow requires it)
             while self.running:
-                # Capture frame
-                if self.pc_test:
-                    ret, frame = self.cap.read()
-                    if not ret: break
-                else:
-                    frame = self.picam2.capture_array()
-                
-                h, w = frame.shape[:2]
+                try:
+                    item = self.results.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if item is None: break
+                packet, objs, behind, detected_at, views, looming = item
+                t0 = time.perf_counter()
                 current_time = time.time()
-                
-                # YOLO Inference
-                results = self.model(frame, verbose=False, conf=0.45)
-                objs = []
-                
-                for r in results:
-                    for box in r.boxes:
-                        x1, y1, x2, y2 = box.xyxy[0].tolist()
-                        cls = int(box.cls[0])
-                        label = self.model.names[cls]
-                        area = ((x2 - x1) * (y2 - y1)) / (w * h)
-                        cx = (x1 + x2) / 2
-                        zone = "center" if w/3 < cx < 2*w/3 else ("left" if cx < w/3 else "right")
-                        priority = PRIORITIES.get(label, 3)
-                        objs.append({"label": label, "zone": zone, "area": area, "prio": priority, "coords": (int(x1), int(y1), int(x2), int(y2))})
-
-                # Speech Logic
-                if current_time - self.last_speech_time >= self.frequency:
-                    msg, speech = "PATH CLEAR", "The path ahead is clear."
-                    objs_sorted = sorted(objs, key=lambda x: (x['prio'], -x['area']))
-                    
-                    if objs:
-                        primary = objs_sorted[0]
-                        label = primary['label']
-                        zone = primary['zone']
-                        
-                        if primary['area'] > 0.4:
-                            speech = f"Stop immediately. A {label} is directly in front of you."
-                        elif zone == "center":
-                            left_clear = len([o for o in objs if o['zone'] == 'left']) == 0
-                            dir_hint = "Move left." if left_clear else "Move right."
-                            speech = f"A {label} is blocking the center. {dir_hint}"
-                        else:
-                            speech = f"I see a {label} on your {zone}."
-                    
-                    print(f"[NAV] {speech}")
-                    self.speak(speech)
-                    self.last_speech_time = current_time
-
-                # Display Logic
+                # Fast replay announces on the recording's clock, not the wall clock
+                speech_time = packet.ts if self.fast_replay else current_time
+
+                # Speech Logic (event-driven: silent while the hazard picture is unchanged)
+                self._announce(packet, objs, behind, looming, speech_time, detected_at)
+
+                # Display Logic (one window per camera)
                 if self.display:
-                    for o in objs:
-                        x1, y1, x2, y2 = o['coords']
-                        color = (0, 255, 0) if o['area'] < 0.4 else (0, 0, 255)
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                        cv2.putText(frame, o['label'], (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                    
-                    title = f"SEEING WITH SOUND - {mode_str}"
-                    cv2.imshow(title, frame)
+                    for name, view, view_objs in views:
+                        title = f"SEEING WITH SOUND - {mode_str}" + ("" if view is packet else f" [{name}]")
+                        self._draw(view.frame, view.infer_frame, view_objs, title)
                     if cv2.waitKey(1) & 0xFF == ord('q'):
                         break
+                self.metrics.add("output", time.perf_counter() - t0)
+
+                if current_time - last_stats >= self.stats_every:
+                    self._update_counters()
+                    print(f"[STATS] {self.metrics.report()}")
+                    print(f"[STATS] speech {self.speech.metrics()}")
+                    last_stats = current_time
+        except KeyboardInterrupt:
+            pass
         except Exception as e:
             print(f"[ERROR] {e}")
         finally:
-            if self.pc_test:
-                self.cap.release()
-            else:
-                self.picam2.stop()
-                self.picam2.close()
+            self.shutdown()
+            if self.replay:
+                elapsed = time.perf_counter() - started
+                frames = self.lead.capture.frames
+                self._update_counters()
+                print(f"[INFO] Replayed {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-6):.1f} FPS)")
+                print(f"[STATS] {self.metrics.report()}")
+
+    def _update_counters(self):
+        m = self.metrics
+        m.set_counter("frames_captured", self.lead.capture.frames)
+        m.set_counter("frames_dropped", sum(cam.frames.dropped for cam in self.cameras))
+        m.set_counter("frames_skipped", self.scheduler.skipped)
+        m.set_counter("announcements", self.announcer.events)
+        if self.fovea is not None:
+            m.set_counter("fovea_runs", self.fovea.runs)
+            m.set_counter("fovea_reused", self.fovea.reused)
+        if len(self.cameras) > 1:
+            for cam in self.cameras[1:]:
+                m.set_counter(f"frames_captured_{cam.name}", cam.capture.frames)
+            m.set_counter("frames_unsynced", self.unsynced)
+            m.set_gauge("batch_size", round(self.batched_frames / max(1, self.batches), 2))
+        for key, value in self.speech.metrics().items():
+            m.set_gauge(f"speech_{key}", value)
+
+    def shutdown(self):
+        self.running = False
+        for cam in self.cameras:
+            cam.capture.stop()
+            cam.frames.close()
+        for t in [cam.capture for cam in self.cameras] + [self.infer_thread]:
+            if t.is_alive():
+                t.join(timeout=2.0)
+        self.speech.stop()
+        for cam in self.cameras:
+            cam.source.close()
+            if cam.recorder is not None:
+                cam.recorder.close()
+                print(f"[INFO] Recorded {cam.recorder.written} {cam.name} frames ({cam.recorder.dropped} skipped)")
+        if self.exporter is not None:
+            self._update_counters()
+            self.exporter.stop()
+        if self.display:
             cv2.destroyAllWindows()
 
 if __name__ == "__main__":
+    startup = StartupProfiler("pi")
     parser = argparse.ArgumentParser(description="SEEING WITH SOUND - RPi 5 Navigator")
-    parser.add_argument("--freq", type=float, default=1.0, help="Scan frequency in seconds")
+    parser.add_argument("--freq", type=float, default=1.0, help="Minimum seconds between non-urgent announcements")
     parser.add_argument("--display", action="store_true", help="Show video window")
     parser.add_argument("--pc-test", action="store_true", help="Force PC Emulation mode (uses Webcam)")
+    parser.add_argument("--backend", choices=list(BACKENDS), help="Force a detector backend (default: fastest available)")
+    parser.add_argument("--imgsz", type=int, default=320,
+                        help="Inference resolution; 640 reads the main stream instead of the 320x240 lores one")
+    parser.add_argument("--metrics-file", help="Append metrics as JSON lines (or write Prometheus text if it ends in .prom)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port (/metrics)")
+    parser.add_argument("--input", help="Replay a video file or image folder instead of the camera (speech is stubbed)")
+    parser.add_argument("--realtime", action="store_true", help="With --input, replay at the original timestamps")
+    parser.add_argument("--record", metavar="DIR", help="Save captured frames (JPEG + frames.csv) for later replay")
+    parser.add_argument("--foveated", action="store_true",
+                        help="Add a same-size inference pass on a crop of the center corridor (small distant hazards)")
+    parser.add_argument("--no-ttc", action="store_true", help="Disable the optical-flow time-to-collision estimate")
+    parser.add_argument("--camera", metavar="NAME[=SOURCE]", action="append", type=parse_camera,
+                        help=f"Add a camera ({'/'.join(CAMERA_ROLES)}); SOURCE is a device index or a replay "
+                             "path. Repeat for several; the first one leads.")
     args = parser.parse_args()
+    if args.camera and args.input:
+        parser.error("use --camera front=PATH instead of --input with several cameras")
 
-    nav = NavigatorPi(frequency=args.freq, display=args.display, pc_test=args.pc_test)
+    nav = NavigatorPi(frequency=args.freq, display=args.display, pc_test=args.pc_test,
+                      backend=args.backend, imgsz=args.imgsz,
+                      metrics_file=args.metrics_file, metrics_port=args.metrics_port,
+                      input_path=args.input, realtime=args.realtime, record_dir=args.record, startup=startup,
+                      cameras=args.camera, foveated=args.foveated, ttc=not args.no_ttc)
     nav.run()
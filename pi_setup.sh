@@ -7,10 +7,17 @@ sudo apt-get update
 sudo apt-get install -y libcamera-apps espeak-ng python3-opencv
 
 # Install Python requirements
-pip3 install pyttsx3 numpy picamera2 ultralytics openvino
+pip3 install pyttsx3 numpy picamera2 ultralytics openvino nncf onnx onnxruntime pyyaml
 
 echo "--- Optimizing Model (OpenVINO) ---"
-yolo export model=yolov8n.pt format=openvino
+# With recorded frames (python3 pi_navigator.py --record recordings/), build calibrated INT8 models
+CALIB_DIR=${CALIB_DIR:-recordings}
+if [ -d "$CALIB_DIR" ]; then
+    python3 export_quant.py --calib-dir "$CALIB_DIR" --imgsz 320
+else
+    yolo export model=yolov8n.pt format=openvino imgsz=320
+    echo "No $CALIB_DIR/ folder found: skipped INT8 export (see export_quant.py)"
+fi
 
 echo "--- Setup Complete ---"
 echo "To run the navigator: python3 pi_navigator.py"
@@ -0,0 +1,118 @@
+import numpy as np
+
+# --- VECTORIZED DETECTION POST-PROCESSING ---
+# Shared by app.py and pi_navigator.py. Works on whole xyxy/cls/conf arrays at once and
+# returns a compact structured array instead of a list of dicts.
+
+DIST_LEVELS = ("VERY_CLOSE", "CLOSE", "MEDIUM", "FAR")
+DIRECTIONS = ("LEFT", "CENTER", "RIGHT")
+VERY_CLOSE, CLOSE, MEDIUM, FAR = range(4)
+LEFT, CENTER, RIGHT = range(3)
+
+# bbox height / frame height thresholds for VERY_CLOSE, CLOSE, MEDIUM
+DIST_THRESHOLDS = (0.60, 0.40, 0.20)
+# bbox center x / frame width: LEFT below the first split, RIGHT above the second
+DIR_SPLIT = (0.35, 0.65)
+
+DET_DTYPE = np.dtype([
+    ("x1", np.float32), ("y1", np.float32), ("x2", np.float32), ("y2", np.float32),
+    ("conf", np.float32), ("cls", np.int16),
+    ("dist", np.uint8), ("dir", np.uint8),
+    ("area", np.float32), ("prio", np.uint8),
+    ("tid", np.int32),   # track id from tracker.Tracker, -1 when untracked
+])
+
+EMPTY_DETS = np.zeros(0, dtype=DET_DTYPE)
+
+
+def build_priority_table(names, priorities, default=3):
+    """Maps class id -> priority (lower is more important) as a lookup array."""
+    n = max(names) + 1 if isinstance(names, dict) else len(names)
+    table = np.full(n, default, dtype=np.uint8)
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    for cls_id, label in items:
+        if label in priorities:
+            table[cls_id] = priorities[label]
+    return table
+
+
+def box_arrays(results):
+    """Pulls (xyxy, cls, conf) numpy arrays out of an Ultralytics Results object."""
+    boxes = results.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.int16), np.zeros(0, np.float32)
+    boxes = boxes.cpu().numpy()
+    return boxes.xyxy, boxes.cls, boxes.conf
+
+
+def distance_levels(box_h, frame_h):
+    ratio = np.asarray(box_h, dtype=np.float32) / frame_h
+    vc, c, m = DIST_THRESHOLDS
+    return (FAR - (ratio > m) - (ratio > c) - (ratio > vc)).astype(np.uint8)
+
+
+def directions(center_x, frame_w, split=DIR_SPLIT):
+    ratio = np.asarray(center_x, dtype=np.float32) / frame_w
+    return ((ratio >= split[0]).astype(np.uint8) + (ratio > split[1])).astype(np.uint8)
+
+
+def process_boxes(xyxy, cls, conf, frame_w, frame_h, prio_table,
+                  scale=1.0, pad_x=0, pad_y=0, dir_split=DIR_SPLIT):
+    """
+    Un-letterboxes boxes back to frame coordinates and buckets distance/direction,
+    normalized area and class priority for every detection in one pass.
+    """
+    n = len(xyxy)
+    dets = np.empty(n, dtype=DET_DTYPE)
+    if n == 0:
+        return dets
+
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(n, 4)
+    inv = 1.0 / scale
+    x1 = (xyxy[:, 0] - pad_x) * inv
+    y1 = (xyxy[:, 1] - pad_y) * inv
+    x2 = (xyxy[:, 2] - pad_x) * inv
+    y2 = (xyxy[:, 3] - pad_y) * inv
+    cls = np.asarray(cls).astype(np.int16, copy=False)
+
+    dets["x1"], dets["y1"], dets["x2"], dets["y2"] = x1, y1, x2, y2
+    dets["conf"] = conf
+    dets["cls"] = cls
+    dets["dist"] = distance_levels(y2 - y1, frame_h)
+    dets["dir"] = directions((x1 + x2) * 0.5, frame_w, dir_split)
+    dets["area"] = (x2 - x1) * (y2 - y1) / float(frame_w * frame_h)
+    dets["prio"] = prio_table[np.clip(cls, 0, len(prio_table) - 1)]
+    dets["tid"] = -1
+    return dets
+
+
+def refresh_geometry(dets, frame_w, frame_h, dir_split=DIR_SPLIT):
+    """Recomputes distance, direction and area in place after the boxes were moved."""
+    if len(dets) == 0:
+        return dets
+    dets["dist"] = distance_levels(dets["y2"] - dets["y1"], frame_h)
+    dets["dir"] = directions((dets["x1"] + dets["x2"]) * 0.5, frame_w, dir_split)
+    dets["area"] = (dets["x2"] - dets["x1"]) * (dets["y2"] - dets["y1"]) / float(frame_w * frame_h)
+    return dets
+
+
+def rank_order(dets, by="dist"):
+    """
+    Indices that sort detections most-important first.
+    by="dist": class priority, then distance (MEDIUM and FAR share a rank) — the app's ordering.
+    by="area": class priority, then largest area first — the Pi navigator's ordering.
+    """
+    if by == "area":
+        return np.lexsort((-dets["area"], dets["prio"]))
+    return np.lexsort((np.minimum(dets["dist"], MEDIUM), dets["prio"]))
+
+
+def primary_index(dets, by="dist"):
+    """Index of the most important detection, or -1 when there are none."""
+    if len(dets) == 0:
+        return -1
+    return int(rank_order(dets, by)[0])
+
+
+def det_bbox(det):
+    return int(det["x1"]), int(det["y1"]), int(det["x2"]), int(det["y2"])
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+
+def letterbox(image_bgr, target_size=320): # [FIX 3] Target 320
+    h, w = image_bgr.shape[:2]
+    scale = target_size / max(h, w)
+    new_w, new_h = int(w * scale), int(h * scale)
+    resized = cv2.resize(image_bgr, (new_w, new_h))
+    canvas = np.zeros((target_size, target_size, 3), dtype=np.uint8)
+    pad_x, pad_y = (target_size - new_w) // 2, (target_size - new_h) // 2
+    canvas[pad_y:pad_y+new_h, pad_x:pad_x+new_w] = resized
+    return canvas, scale, pad_x, pad_y
+
+
+class Preprocessor:
+    """
+    Allocation-free replacement for letterbox() + the model's own preprocessing.
+    Keeps one padded uint8 canvas and one float32 NCHW tensor per session: the resize writes
+    straight into the canvas, and the BGR->RGB / HWC->CHW / [0,1] conversion writes straight
+    into the tensor, which can be fed to Ultralytics as-is (tensor inputs skip its letterbox).
+    Buffers are reused on the next call, so consume the outputs before calling again.
+    """
+
+    def __init__(self, target_size=320):
+        self.target_size = target_size
+        self.canvas = np.zeros((target_size, target_size, 3), dtype=np.uint8)
+        self.tensor = np.zeros((1, 3, target_size, target_size), dtype=np.float32)
+        self._geometry = {}   # (h, w) -> (scale, new_w, new_h, pad_x, pad_y)
+        self._last_shape = None
+
+    def _layout(self, h, w):
+        geo = self._geometry.get((h, w))
+        if geo is None:
+            scale = self.target_size / max(h, w)
+            new_w, new_h = int(w * scale), int(h * scale)
+            pad_x, pad_y = (self.target_size - new_w) // 2, (self.target_size - new_h) // 2
+            geo = self._geometry[(h, w)] = (scale, new_w, new_h, pad_x, pad_y)
+        return geo
+
+    def letterbox(self, image_bgr):
+        h, w = image_bgr.shape[:2]
+        scale, new_w, new_h, pad_x, pad_y = self._layout(h, w)
+        if self._last_shape != (h, w):
+            # Padding only needs clearing when the frame geometry changes
+            self.canvas.fill(0)
+            self._last_shape = (h, w)
+        roi = self.canvas[pad_y:pad_y+new_h, pad_x:pad_x+new_w]
+        cv2.resize(image_bgr, (new_w, new_h), dst=roi, interpolation=cv2.INTER_LINEAR)
+        return self.canvas, scale, pad_x, pad_y
+
+    def to_tensor(self):
+        """Converts the current canvas (BGR, HWC, uint8) into the tensor buffer (RGB, CHW, 0..1)."""
+        out = self.tensor[0]
+        for c in range(3):
+            np.multiply(self.canvas[:, :, 2 - c], 1.0 / 255.0, out=out[c], casting="unsafe")
+        return self.tensor
+
+    def __call__(self, image_bgr):
+        _, scale, pad_x, pad_y = self.letterbox(image_bgr)
+        return self.to_tensor(), scale, pad_x, pad_y
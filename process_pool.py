@@ -0,0 +1,308 @@
+import contextlib
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detectors import load_detector
+from obstacle import ObstacleDetector
+from postprocess import build_priority_table, process_boxes
+from preprocess import Preprocessor
+
+# --- PROCESS-POOL INFERENCE ---
+# Detection (model + obstacle detector) runs in worker processes so sessions are not
+# serialized on one GIL. Each worker owns a shared-memory ring of frame slots: the parent
+# copies a frame into a free slot and sends only (request id, slot, shape) through the queue;
+# detections come back as compact DET_DTYPE arrays. Sessions are pinned to one worker, which
+# keeps their obstacle-detector state and spreads sessions across cores.
+
+
+def _worker_main(index, shm_name, slot_bytes, requests, results, cfg):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        model = cfg["loader"](imgsz=cfg["imgsz"], backend=cfg["backend"])
+        prio = build_priority_table(model.names, cfg["priorities"], cfg["default_priority"])
+        pre = Preprocessor(target_size=model.imgsz)
+        model.predict(np.full((1, 3, model.imgsz, model.imgsz), 114 / 255, np.float32))   # warm-up
+        names = model.names if isinstance(model.names, dict) else dict(enumerate(model.names))
+        results.put(("ready", index, names, model.name))
+    except Exception as e:
+        results.put(("failed", index, repr(e), None))
+        shm.close()
+        return
+
+    obstacles = {}   # session id -> ObstacleDetector (stateful smoothing)
+    max_batch = max(1, getattr(model, "max_batch", 1))
+    running = True
+    while running:
+        msg = requests.get()
+        batch = []
+        while msg is not None:
+            if msg[0] == "close":
+                obstacles.pop(msg[1], None)
+            else:
+                batch.append(msg)
+            if len(batch) >= max_batch:
+                break
+            try:
+                msg = requests.get_nowait()   # batch whatever else is already waiting
+            except queue.Empty:
+                break
+        if msg is None:
+            running = False
+        if not batch:
+            continue
+
+        t0 = time.perf_counter()
+        frames, tensors, geometry = [], [], []
+        for _, req_id, sid, slot, shape, _ in batch:
+            frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            tensor, scale, pad_x, pad_y = pre(frame)
+            frames.append(frame)
+            tensors.append(tensor.copy() if len(batch) > 1 else tensor)
+            geometry.append((scale, pad_x, pad_y))
+        try:
+            outputs = model.predict(tensors[0] if len(tensors) == 1 else np.concatenate(tensors), conf=cfg["conf"])
+        except Exception as e:
+            for _, req_id, _, slot, _, _ in batch:
+                results.put(("error", req_id, index, slot, repr(e)))
+            continue
+        latency = (time.perf_counter() - t0) / len(batch)
+        for (_, req_id, sid, slot, shape, run_obstacle), frame, (xyxy, cls, conf), (scale, pad_x, pad_y) in \
+                zip(batch, frames, outputs, geometry):
+            dets = process_boxes(xyxy, cls, conf, shape[1], shape[0], prio, scale, pad_x, pad_y,
+                                 dir_split=cfg["dir_split"])
+            obs = None
+            if run_obstacle and len(dets) == 0:
+                det = obstacles.get(sid)
+                if det is None:
+                    det = obstacles[sid] = ObstacleDetector()
+                obs = det(frame)
+            del frame   # release the shared-memory view before the slot is handed back
+            results.put(("result", req_id, index, slot, (dets, obs, latency, len(batch))))
+    frames = frame = None   # drop shared-memory views so the mapping can be closed
+    shm.close()
+
+
+@contextlib.contextmanager
+def _hidden_main():
+    """Spawned children re-import the parent's __main__ (as __mp_main__) before running their
+    target. Under `streamlit run` that is the app script, which must not run again in a worker
+    (it crashes the bootstrap before the worker can report). The workers only need importable
+    modules, so hide __main__'s origin while they start. Loaders must not live in __main__."""
+    main = sys.modules.get("__main__")
+    if main is None:
+        yield
+        return
+    saved = {k: main.__dict__[k] for k in ("__file__", "__spec__") if k in main.__dict__}
+    main.__dict__.pop("__file__", None)
+    main.__spec__ = None
+    try:
+        yield
+    finally:
+        main.__dict__.pop("__spec__", None)
+        main.__dict__.update(saved)
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class ProcessInferencePool:
+    """
+    `workers` detector processes, each with `slots` shared-memory frame slots of up to
+    `max_frame` (h, w) BGR pixels. Use session() to get a handle pinned to one worker.
+    `loader(imgsz=, backend=)` builds the detector inside each worker (default: load_detector).
+    """
+
+    def __init__(self, workers=None, imgsz=320, backend=None, conf=0.5, priorities=None, default_priority=1,
+                 dir_split=(0.35, 0.65), slots=8, max_frame=(1080, 1920), loader=load_detector):
+        self.workers = workers or default_workers()
+        self.slot_bytes = max_frame[0] * max_frame[1] * 3
+        cfg = {"loader": loader, "imgsz": imgsz, "backend": backend, "conf": conf, "dir_split": dir_split,
+               "priorities": priorities or {}, "default_priority": default_priority}
+        ctx = mp.get_context("spawn")
+        self._results = ctx.Queue()
+        self._shms, self._requests, self._free, self._procs = [], [], [], []
+        for i in range(self.workers):
+            shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+            requests = ctx.Queue()
+            proc = ctx.Process(target=_worker_main, name=f"visionaid-detector-{i}", daemon=True,
+                               args=(i, shm.name, self.slot_bytes, requests, self._results, cfg))
+            with _hidden_main():
+                proc.start()
+            free = queue.Queue()
+            for s in range(slots):
+                free.put(s)
+            self._shms.append(shm)
+            self._requests.append(requests)
+            self._free.append(free)
+            self._procs.append(proc)
+
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sessions = [0] * self.workers
+        self._ready_count = 0
+        self._ready = threading.Event()
+        self.names = None
+        self.name = None
+        self.error = None
+        self._closing = False
+        self.check_every = 1.0      # s between worker liveness checks
+        self._next_check = 0.0
+
+        # Stats
+        self.frames_run = 0
+        self.batch_total = 0
+        self.last_latency = 0.0
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="pool-results", daemon=True)
+        self._dispatcher.start()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    @property
+    def avg_batch_size(self):
+        return self.batch_total / self.frames_run if self.frames_run else 0.0
+
+    def session(self):
+        """Pins a new session to the worker with the fewest sessions."""
+        with self._lock:
+            worker = self._sessions.index(min(self._sessions))
+            self._sessions[worker] += 1
+        return PoolSession(self, worker)
+
+    def _release(self, worker, sid):
+        with self._lock:
+            self._sessions[worker] -= 1
+        self._requests[worker].put(("close", sid))
+
+    def submit(self, worker, sid, frame, obstacle=True, timeout=2.0):
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame {frame.shape} {frame.dtype} does not fit a {self.slot_bytes}-byte slot")
+        self._check_workers()
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        try:
+            slot = self._free[worker].get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free frame slot on detector worker {worker}")
+        view = np.ndarray(frame.shape, np.uint8, buffer=self._shms[worker].buf, offset=slot * self.slot_bytes)
+        view[...] = frame
+        del view
+        fut = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            self._pending[req_id] = fut
+        self._requests[worker].put(("infer", req_id, sid, slot, frame.shape, obstacle))
+        return fut
+
+    def _fail(self, error):
+        if self.error is not None:
+            return
+        self.error = error
+        print(f"[ERROR] {error}")
+        self._ready.set()   # wake wait_ready(); callers check .error
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(RuntimeError(error))
+
+    def _check_workers(self):
+        """A worker that dies (before or after reporting ready) fails the pool instead of hanging it.
+        Runs at most every `check_every` seconds, whatever the traffic."""
+        now = time.monotonic()
+        if self._closing or self.error is not None or now < self._next_check:
+            return
+        self._next_check = now + self.check_every
+        for i, proc in enumerate(self._procs):
+            if not proc.is_alive():
+                self._fail(f"Detector worker {i} exited unexpectedly (exit code {proc.exitcode})")
+                return
+
+    def _dispatch(self):
+        while True:
+            try:
+                msg = self._results.get(timeout=self.check_every)
+            except queue.Empty:
+                msg = False
+            # On a timer, not only when idle: results from healthy workers must not hide a dead one
+            self._check_workers()
+            if msg is False:
+                continue
+            if msg is None:
+                return
+            kind = msg[0]
+            if kind == "ready":
+                _, index, names, name = msg
+                self.names, self.name = names, name
+                self._ready_count += 1
+                if self._ready_count == self.workers:
+                    print(f"[INFO] {self.workers} detector worker process(es) ready ({name})")
+                    self._ready.set()
+            elif kind == "failed":
+                self._fail(f"Detector worker {msg[1]} failed to start: {msg[2]}")
+            else:
+                _, req_id, worker, slot, payload = msg
+                self._free[worker].put(slot)
+                with self._lock:
+                    fut = self._pending.pop(req_id, None)
+                if fut is None or fut.done():
+                    continue
+                if kind == "error":
+                    fut.set_exception(RuntimeError(payload))
+                else:
+                    dets, obs, latency, batch_size = payload
+                    self.frames_run += 1
+                    self.batch_total += batch_size
+                    self.last_latency = latency
+                    fut.set_result((dets, obs))
+
+    def close(self, timeout=2.0):
+        self._closing = True
+        for requests in self._requests:
+            requests.put(None)
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        self._results.put(None)
+        self._dispatcher.join(timeout)
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+
+
+class PoolSession:
+    """One video session's handle: always talks to the same worker process."""
+
+    _sid = itertools.count(1)
+
+    def __init__(self, pool, worker):
+        self.pool = pool
+        self.worker = worker
+        self.sid = next(self._sid)
+        self.closed = False
+
+    def infer(self, frame, obstacle=True, timeout=5.0):
+        """Returns (detections, obstacle level or None) for one BGR frame."""
+        return self.pool.submit(self.worker, self.sid, frame, obstacle).result(timeout=timeout)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.pool._release(self.worker, self.sid)
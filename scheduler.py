@@ -0,0 +1,119 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from postprocess import VERY_CLOSE, CLOSE, CENTER
+
+
+class InferenceScheduler:
+    """
+    Decides when the next inference should run instead of a fixed interval.
+    Inputs: an EWMA of measured model latency, scene motion from a tiny downsampled frame
+    difference, the current hazard level (VERY_CLOSE objects or a center-blocking obstacle
+    shorten the interval) and CPU load (back off when the host is saturated).
+    """
+
+    HAZARD_NONE, HAZARD_CLOSE, HAZARD_DANGER = 0, 1, 2
+
+    def __init__(self, base_interval=0.4, min_interval=0.1, max_interval=1.5,
+                 latency_alpha=0.2, motion_low=0.01, motion_high=0.06,
+                 block_area=0.4, cpu_high=0.9, motion_size=(64, 48)):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.latency_alpha = latency_alpha
+        self.motion_low = motion_low        # mean abs diff (0..1) treated as a static scene
+        self.motion_high = motion_high      # ... and as fast motion
+        self.block_area = block_area        # center object covering this much of the frame blocks the path
+        self.cpu_high = cpu_high            # 1-min load per core considered saturated
+        self.motion_size = motion_size
+
+        self.latency = None
+        self.motion = 0.0
+        self.hazard = self.HAZARD_NONE
+        self.interval = base_interval
+        self.next_time = 0.0
+        self.skipped = 0
+        self._prev_small = None
+        self._cpu_factor = 1.0
+        self._cpu_checked = 0.0
+
+    # --- Inputs ---
+    def record_latency(self, seconds):
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.latency_alpha * (seconds - self.latency)
+
+    def observe_frame(self, frame_bgr):
+        """Updates the motion estimate from a downsampled grayscale frame difference (~0.05 ms)."""
+        small = cv2.resize(frame_bgr, self.motion_size, interpolation=cv2.INTER_NEAREST)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        if self._prev_small is not None:
+            diff = cv2.absdiff(small, self._prev_small)
+            # Light smoothing so a single noisy frame doesn't swing the interval
+            self.motion = 0.7 * self.motion + 0.3 * (float(diff.mean()) / 255.0)
+        self._prev_small = small
+        return self.motion
+
+    def update_hazard(self, dets, obstacle=None):
+        """Sets the hazard level from detections and the obstacle detector's output."""
+        level = self.HAZARD_NONE
+        if len(dets):
+            center = dets["dir"] == CENTER
+            if (dets["dist"] == VERY_CLOSE).any() or (center & (dets["area"] > self.block_area)).any():
+                level = self.HAZARD_DANGER
+            elif (dets["dist"] == CLOSE).any():
+                level = self.HAZARD_CLOSE
+        if obstacle == "VERY_CLOSE":
+            level = self.HAZARD_DANGER
+        elif obstacle == "CLOSE":
+            level = max(level, self.HAZARD_CLOSE)
+        self.hazard = level
+        return level
+
+    def _cpu_backoff(self, now):
+        # getloadavg is cheap but only changes every few seconds; poll it at most once a second
+        if now - self._cpu_checked >= 1.0:
+            self._cpu_checked = now
+            try:
+                load = os.getloadavg()[0] / (os.cpu_count() or 1)
+            except (AttributeError, OSError):
+                load = 0.0
+            self._cpu_factor = 1.0 if load < self.cpu_high else min(2.0, load / self.cpu_high)
+        return self._cpu_factor
+
+    # --- Decision ---
+    def compute_interval(self, now=None):
+        now = time.time() if now is None else now
+        interval = self.base_interval
+
+        # Motion: static scenes stretch the interval up to 2x, fast motion halves it
+        span = max(self.motion_high - self.motion_low, 1e-6)
+        m = float(np.clip((self.motion - self.motion_low) / span, 0.0, 1.0))
+        interval *= 2.0 - 1.5 * m
+
+        if self.hazard == self.HAZARD_DANGER:
+            interval *= 0.35
+        elif self.hazard == self.HAZARD_CLOSE:
+            interval *= 0.7
+
+        interval *= self._cpu_backoff(now)
+
+        # Never schedule faster than the model can actually run
+        if self.latency is not None:
+            interval = max(interval, 1.2 * self.latency)
+
+        self.interval = float(np.clip(interval, self.min_interval, self.max_interval))
+        return self.interval
+
+    def due(self, now=None):
+        """True when inference should run now; schedules the following run."""
+        now = time.time() if now is None else now
+        if now < self.next_time:
+            self.skipped += 1
+            return False
+        self.next_time = now + self.compute_interval(now)
+        return True
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import threading
+import time
+
+# Priorities: lower is more urgent
+URGENT, WARNING, INFO = 0, 1, 2
+
+
+class SpeechWorker:
+    """
+    One long-lived speech thread fed by a priority queue.
+    - A newer message with the same key supersedes queued ones of the same or lower urgency.
+    - Non-urgent repeats of what was just said inside `repeat_window` are dropped.
+    - Messages older than `max_age` (per priority) when they reach the front are dropped.
+    - An URGENT message interrupts lower-priority speech in progress.
+    `engine` is a pyttsx3 engine, or None to print cues to the terminal instead.
+    """
+
+    def __init__(self, engine=None, max_age=(1.0, 2.0, 3.0), repeat_window=2.0, on_start=None):
+        self.engine = engine
+        self.max_age = max_age
+        self.repeat_window = repeat_window
+        self.on_start = on_start   # callback(text, meta) when a cue starts playing
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._current = None        # (priority, text) being spoken
+        self._last_text = None
+        self._last_time = 0.0
+
+        # Metrics
+        self.enqueued = 0
+        self.spoken = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.preempted = 0
+        self.max_depth = 0
+        self.latency_ms = 0.0       # EWMA enqueue -> start of playback
+
+        self._thread = threading.Thread(target=self._loop, name="speech", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self):
+        return len(self._heap)
+
+    def say(self, text, priority=INFO, key="nav", meta=None):
+        now = time.time()
+        with self._cond:
+            if priority > URGENT and text == self._last_text and now - self._last_time < self.repeat_window:
+                self.coalesced += 1
+                return False
+            # Drop queued messages this one supersedes (same key) or duplicates, but never a more urgent one
+            before = len(self._heap)
+            self._heap = [e for e in self._heap if e[0] < priority or (e[3] != key and e[4] != text)]
+            if len(self._heap) != before:
+                heapq.heapify(self._heap)
+                self.coalesced += before - len(self._heap)
+            heapq.heappush(self._heap, (priority, next(self._seq), now, key, text, meta))
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._heap))
+
+            if priority == URGENT and self._current is not None and self._current[0] > URGENT:
+                self._interrupt()
+            self._cond.notify()
+        return True
+
+    def _interrupt(self):
+        self.preempted += 1
+        if self.engine is not None:
+            try:
+                self.engine.stop()
+            except Exception:
+                pass
+
+    def _next(self):
+        with self._cond:
+            while self._running:
+                while self._heap:
+                    priority, _, created, key, text, meta = heapq.heappop(self._heap)
+                    if time.time() - created > self.max_age[min(priority, len(self.max_age) - 1)]:
+                        self.stale += 1
+                        continue
+                    self._current = (priority, text)
+                    return priority, created, text, meta
+                self._cond.wait()
+            return None
+
+    def _loop(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            priority, created, text, meta = item
+            started = time.time()
+            self.latency_ms += 0.2 * ((started - created) * 1000 - self.latency_ms)
+            if self.on_start:
+                self.on_start(text, meta)
+            try:
+                if self.engine is None:
+                    print(f"[VOICE SIM] {text}")
+                else:
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+            except Exception as e:
+                print(f"[WARN] Speech failed: {e}")
+            with self._cond:
+                self._current = None
+                self._last_text = text
+                self._last_time = time.time()
+                self.spoken += 1
+
+    def metrics(self):
+        return {
+            "queue_depth": self.depth, "max_depth": self.max_depth, "latency_ms": round(self.latency_ms, 1),
+            "spoken": self.spoken, "coalesced": self.coalesced, "stale": self.stale, "preempted": self.preempted,
+        }
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._heap = []
+            if self._current is not None:
+                self._interrupt()
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+class NullEngine:
+    """pyttsx3 stand-in that says nothing; for headless replay and load tests."""
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
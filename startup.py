@@ -0,0 +1,168 @@
+import importlib.util
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+# --- COLD START ---
+# Lazy heavy imports, background model load + warm-up, and a startup timing report.
+
+STARTUP_LOG = os.path.expanduser(os.environ.get("VISIONAID_STARTUP_LOG", "~/.cache/visionaid/startup.jsonl"))
+
+
+def lazy_module(name):
+    """Returns `name` as a module that is only actually imported on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def process_start_time():
+    """Wall-clock time this process started (Linux /proc), or None."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfiler:
+    """
+    Records named startup phases (duration and offset since process start) and, once the
+    first inference is in, prints a report and appends it to STARTUP_LOG as a JSON line.
+    """
+
+    def __init__(self, app, log_path=STARTUP_LOG):
+        self.app = app
+        self.log_path = log_path
+        self.t0 = process_start_time() or time.time()
+        self.phases = {}
+        self.reported = False
+        self._lock = threading.Lock()
+        self.mark("imports")   # process start -> profiler creation (interpreter + module imports)
+
+    def since_start(self):
+        return time.time() - self.t0
+
+    def mark(self, name, duration=None):
+        """Records a phase that ends now; duration defaults to 'since process start'."""
+        with self._lock:
+            if name in self.phases:
+                return
+            at = self.since_start()
+            self.phases[name] = {"ms": round((at if duration is None else duration) * 1000, 1),
+                                 "at_ms": round(at * 1000, 1)}
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def first_inference(self, seconds):
+        """Call with the latency of the first real-frame inference; triggers the report."""
+        self.mark("first_inference", seconds)
+        self.report()
+
+    def report(self):
+        with self._lock:
+            if self.reported:
+                return
+            self.reported = True
+            phases = dict(self.phases)
+        lines = [f"{name:<18} {p['ms']:9.1f} ms   (t+{p['at_ms'] / 1000:.2f}s)" for name, p in phases.items()]
+        print("[STARTUP] " + "\n[STARTUP] ".join(lines))
+        record = {"app": self.app, "ts": round(time.time(), 1), "host": platform.node(),
+                  "machine": platform.machine(), "python": platform.python_version(), "phases": phases}
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"[WARN] Could not write startup log: {e}")
+        return record
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.mark(self.name, time.perf_counter() - self.t)
+
+
+class ModelWarmup:
+    """
+    Loads the detector on a background thread and runs a few inferences at its imgsz so graph
+    compilation / allocator warm-up is paid before the first real frame. `build(model)` can
+    construct anything else that needs the model (e.g. a batching server); result() returns
+    its value once ready.
+    """
+
+    def __init__(self, load, build=None, iters=2, profiler=None):
+        self._load = load
+        self._build = build
+        self.iters = iters
+        self.profiler = profiler
+        self.model = None
+        self.error = None
+        self._value = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._run, name="model-warmup", daemon=True).start()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def _run(self):
+        import numpy as np
+        try:
+            with self._phase("model_load"):
+                model = self._load()
+            with self._phase("warmup"):
+                x = np.full((1, 3, model.imgsz, model.imgsz), 114 / 255, np.float32)
+                for _ in range(self.iters):
+                    model.predict(x)
+            self.model = model
+            self._value = self._build(model) if self._build else model
+            if self.profiler:
+                self.profiler.mark("model_ready")
+        except Exception as e:
+            self.error = e
+            print(f"[ERROR] Model load failed: {e}")
+        finally:
+            self._ready.set()
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler else _NullPhase()
+
+    def result(self, timeout=None):
+        """Blocks until the model is warm; raises the load error if it failed."""
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Model is still loading")
+        if self.error is not None:
+            raise self.error
+        return self._value
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
@@ -0,0 +1,110 @@
+import numpy as np
+
+from announcer import Announcer, AppPhrasebook
+from postprocess import EMPTY_DETS, build_priority_table, process_boxes
+from speech import INFO, URGENT, WARNING
+
+W, H = 640, 480
+NAMES = {0: "person", 1: "chair"}
+PRIO = build_priority_table(NAMES, {"person": 0}, default=1)
+
+
+def person(h_ratio, cx=0.5, tid=0):
+    """One tracked person, h_ratio of the frame tall, centered at cx of the frame width."""
+    xyxy = np.array([[cx * W - 40, 40, cx * W + 40, 40 + h_ratio * H]], np.float32)
+    dets = process_boxes(xyxy, [0], [0.9], W, H, PRIO)
+    dets["tid"] = tid
+    return dets
+
+
+def announcer(**kwargs):
+    return Announcer(AppPhrasebook("English"), **kwargs)
+
+
+def feed(ann, frames, start=0.0, step=0.05):
+    """Feeds (dets) frames at a fixed rate; returns [(time, Announcement)] for the emitted events."""
+    events = []
+    for i, dets in enumerate(frames):
+        now = round(start + i * step, 6)
+        event = ann.update(dets, W, H, now, names=NAMES)
+        if event is not None:
+            events.append((now, event))
+    return events
+
+
+def test_first_picture_is_announced_at_once():
+    ann = announcer()
+    event = ann.update(person(0.3), W, H, 0.0, names=NAMES)
+    assert event.kind == "object" and event.dist == "MEDIUM" and event.priority == INFO
+    assert "person" in event.text.lower()
+    assert ann.update(person(0.3), W, H, 0.05, names=NAMES) is None
+
+
+def test_jitter_around_a_distance_boundary_is_held():
+    jitter = [0.38, 0.42, 0.39, 0.43, 0.41, 0.37] * 20   # around the 0.40 CLOSE/MEDIUM threshold
+    ann = announcer()
+    events = feed(ann, [person(r) for r in jitter])
+    assert [e.dist for _, e in events] == ["MEDIUM"]
+    # Without the band the same frames flap between CLOSE and MEDIUM
+    assert len(feed(announcer(dist_band=0.0), [person(r) for r in jitter])) > 1
+
+
+def test_distance_band_releases_past_the_boundary():
+    ann = announcer(settle=0.25)
+    feed(ann, [person(0.38)])
+    assert ann.update(person(0.43), W, H, 0.25, names=NAMES) is None
+    assert ann.update(person(0.45), W, H, 0.5, names=NAMES).dist == "CLOSE"
+    # Coming back down, CLOSE holds until the ratio is a band below the threshold
+    assert feed(ann, [person(0.37)] * 4, start=0.75, step=0.25) == []
+    events = feed(ann, [person(0.35)] * 4, start=1.75, step=0.25)
+    assert [(t, e.dist) for t, e in events] == [(2.0, "MEDIUM")]
+
+
+def test_jitter_around_a_direction_boundary_is_held():
+    ann = announcer()
+    events = feed(ann, [person(0.3, cx) for cx in [0.33, 0.37, 0.34, 0.36] * 20])
+    assert len(events) == 1 and events[0][1].text == ann.phrasebook.render(("object", 0, 2, 0), NAMES)
+
+
+def test_escalation_is_announced_on_the_same_frame():
+    ann = announcer()
+    feed(ann, [person(0.3)] * 5)
+    event = ann.update(person(0.5), W, H, 0.25, names=NAMES)
+    assert event.dist == "CLOSE" and event.priority == WARNING
+    event = ann.update(person(0.7), W, H, 0.30, names=NAMES)
+    assert event.dist == "VERY_CLOSE" and event.priority == URGENT
+
+
+def test_deescalation_waits_for_settle():
+    ann = announcer(settle=0.3)
+    feed(ann, [person(0.7)])
+    events = feed(ann, [person(0.3)] * 10, start=0.1, step=0.1)
+    assert [(t, e.dist) for t, e in events] == [(0.4, "MEDIUM")]
+
+
+def test_brief_change_is_not_announced():
+    ann = announcer(settle=0.3)
+    frames = [person(0.7)] + [person(0.3)] * 2 + [person(0.7)] * 10
+    assert len(feed(ann, frames, step=0.1)) == 1
+
+
+def test_clear_waits_for_clear_after_without_hazards():
+    ann = announcer(clear_after=1.5, settle=0.25)
+    frames = [person(0.3)] * 5 + [EMPTY_DETS] * 12     # last hazard at t=1.0
+    events = feed(ann, frames, step=0.25)
+    assert [(t, e.kind) for t, e in events] == [(0.0, "object"), (2.75, "clear")]
+    assert events[1][1].text == "Path appears clear"
+
+
+def test_hazard_returning_within_clear_after_cancels_clear():
+    ann = announcer(clear_after=1.5)
+    frames = [person(0.3)] + [EMPTY_DETS] * 14 + [person(0.3)] * 20
+    assert len(feed(ann, frames, step=0.1)) == 1
+
+
+def test_urgent_picture_is_repeated():
+    ann = announcer(urgent_repeat=5.0)
+    events = feed(ann, [person(0.7)] * 25, step=0.5)
+    assert [t for t, _ in events] == [0.0, 5.0, 10.0]
+    # Non-urgent pictures are not repeated
+    assert len(feed(announcer(), [person(0.5)] * 25, step=0.5)) == 1
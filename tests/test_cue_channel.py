@@ -0,0 +1,87 @@
+import http.client
+import json
+
+import pytest
+
+from cue_channel import CueEmitter, CueHub, start_cue_server
+
+
+@pytest.fixture
+def channel():
+    hub, server = start_cue_server(0, host="127.0.0.1")
+    yield hub, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def get(port, sid):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", f"/cues/{sid}")
+    return conn, conn.getresponse()
+
+
+def read_event(resp):
+    while True:
+        line = resp.fp.readline().decode("utf-8")
+        if line.startswith("data: "):
+            return json.loads(line[6:])
+        assert line, "stream ended"
+
+
+def test_unknown_session_is_not_served_or_created(channel):
+    hub, port = channel
+    conn, resp = get(port, "nobody")
+    assert resp.status == 404
+    conn.close()
+    assert not hub.publish("nobody", {"type": "cue"})
+    assert len(hub) == 0 and "nobody" not in hub
+
+
+def test_registered_session_streams_its_events(channel):
+    hub, port = channel
+    cues, other = CueEmitter(hub, "abc"), CueEmitter(hub, "def")
+    conn, resp = get(port, "abc")
+    assert resp.status == 200
+    other.send("stats", html="other session")
+    assert cues.emit("Person ahead, close", "CLOSE")
+    ev = read_event(resp)
+    assert ev["type"] == "cue" and ev["text"] == "Person ahead, close" and ev["vib"] == [200, 100, 200]
+    assert hub.connected("abc") and not hub.connected("def")
+    conn.close()
+    other.close()
+    cues.close()
+
+
+def test_session_end_closes_the_stream_and_removes_it(channel):
+    hub, port = channel
+    cues = CueEmitter(hub, "abc")
+    conn, resp = get(port, "abc")
+    assert resp.status == 200
+    cues.close()
+    assert resp.fp.readline() == b"retry: 1000\n"
+    assert resp.fp.read() == b"\n"    # server ended the stream
+    conn.close()
+    assert len(hub) == 0 and not hub.connected("abc")
+    conn, resp = get(port, "abc")    # a browser reconnect does not bring the session back
+    assert resp.status == 404
+    conn.close()
+
+
+def test_session_lives_until_its_last_emitter_closes():
+    hub = CueHub()
+    old, new = CueEmitter(hub, "abc"), CueEmitter(hub, "abc")
+    old.close()
+    assert "abc" in hub and new.emit("Path appears clear")
+    new.close()
+    assert "abc" not in hub
+
+
+def test_next_events_drains_and_times_out():
+    hub = CueHub()
+    cues = CueEmitter(hub, "abc")
+    cues.send("stats", html="x")
+    cues.send("overlay", boxes=[])
+    assert [ev["type"] for ev in hub.next_events("abc", timeout=0.01)] == ["stats", "overlay"]
+    assert hub.next_events("abc", timeout=0.01) == []
+    cues.close()
+    assert hub.next_events("abc", timeout=0.01) is None
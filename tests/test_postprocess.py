@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from postprocess import DIRECTIONS, DIST_LEVELS, build_priority_table, det_bbox, process_boxes, rank_order
+
+NAMES = {0: "person", 1: "chair", 2: "cup", 3: "car"}
+PRIORITY_OBJECTS = {"person", "chair", "car"}
+
+
+# --- BASELINE (the per-box loop process_boxes replaced) ---
+
+def unletterbox_bbox(x1, y1, x2, y2, scale, pad_x, pad_y):
+    return (x1-pad_x)/scale, (y1-pad_y)/scale, (x2-pad_x)/scale, (y2-pad_y)/scale
+
+
+def estimate_distance(bbox_height, frame_height):
+    ratio = bbox_height / frame_height
+    if ratio > 0.60:   return "VERY_CLOSE"
+    elif ratio > 0.40: return "CLOSE"
+    elif ratio > 0.20: return "MEDIUM"
+    return "FAR"
+
+
+def classify_direction(bbox_center_x, frame_width):
+    ratio = bbox_center_x / frame_width
+    if ratio < 0.35: return "LEFT"
+    elif ratio > 0.65: return "RIGHT"
+    return "CENTER"
+
+
+def baseline(xyxy, cls, w, h, scale, pad_x, pad_y):
+    detections = []
+    for box, cls_id in zip(xyxy.tolist(), cls.tolist()):
+        ux1, uy1, ux2, uy2 = unletterbox_bbox(*box, scale, pad_x, pad_y)
+        label_en = NAMES[cls_id]
+        dist = estimate_distance(uy2-uy1, h)
+        detections.append({
+            "label_en": label_en,
+            "dist": dist,
+            "dir": classify_direction((ux1+ux2)/2, w),
+            "bbox": (int(ux1), int(uy1), int(ux2), int(uy2)),
+            "rank": (0 if label_en in PRIORITY_OBJECTS else 1,
+                     0 if dist == "VERY_CLOSE" else (1 if dist == "CLOSE" else 2)),
+        })
+    detections.sort(key=lambda x: x["rank"])
+    return [{k: v for k, v in d.items() if k != "rank"} for d in detections]
+
+
+def vectorized(xyxy, cls, w, h, scale, pad_x, pad_y):
+    prio = build_priority_table(NAMES, {label: 0 for label in PRIORITY_OBJECTS}, default=1)
+    dets = process_boxes(xyxy, cls, np.ones(len(cls), np.float32), w, h, prio, scale, pad_x, pad_y)
+    return [{"label_en": NAMES[int(d["cls"])], "dist": DIST_LEVELS[d["dist"]], "dir": DIRECTIONS[d["dir"]],
+             "bbox": det_bbox(d)} for d in dets[rank_order(dets)]]
+
+
+def random_boxes(rng, n, w, h, scale, pad_x, pad_y):
+    """Letterboxed boxes whose ratios stay clear of the float32/float64 rounding gap at the thresholds."""
+    xyxy = np.empty((0, 4), np.float32)
+    while len(xyxy) < n:
+        x = np.sort(rng.uniform(0, w, (n, 2)), axis=1)
+        y = np.sort(rng.uniform(0, h, (n, 2)), axis=1)
+        boxes = (np.stack([x[:, 0], y[:, 0], x[:, 1], y[:, 1]], axis=1) * scale
+                 + [pad_x, pad_y, pad_x, pad_y]).astype(np.float32)
+        ux1, uy1, ux2, uy2 = ((boxes.astype(np.float64) - [pad_x, pad_y, pad_x, pad_y]) / scale).T
+        h_ratio, x_ratio = (uy2 - uy1) / h, (ux1 + ux2) / 2 / w
+        clear = (np.abs(h_ratio[:, None] - [0.2, 0.4, 0.6]).min(axis=1) > 1e-4) & \
+                (np.abs(x_ratio[:, None] - [0.35, 0.65]).min(axis=1) > 1e-4)
+        xyxy = np.concatenate([xyxy, boxes[clear]])
+    return xyxy[:n]
+
+
+@pytest.mark.parametrize("w,h,imgsz", [(640, 480, 320), (1280, 720, 640), (480, 640, 320)])
+def test_process_boxes_matches_baseline_loop(w, h, imgsz):
+    rng = np.random.default_rng(w + h)
+    scale = min(imgsz / w, imgsz / h)
+    pad_x, pad_y = (imgsz - round(w * scale)) // 2, (imgsz - round(h * scale)) // 2
+    for n in (0, 1, 7, 40):
+        xyxy = random_boxes(rng, n, w, h, scale, pad_x, pad_y)
+        cls = rng.integers(0, len(NAMES), n)
+        assert vectorized(xyxy, cls, w, h, scale, pad_x, pad_y) == baseline(xyxy, cls, w, h, scale, pad_x, pad_y)
+
+
+def test_process_boxes_thresholds_match_baseline():
+    # Boxes exactly on each distance and direction boundary
+    w, h = 640, 480
+    xyxy = np.array([[0, 0, 448, 96], [0, 0, 448, 192], [0, 0, 448, 288], [0, 0, 832, 100],
+                     [100, 0, 348, 10], [300, 0, 532, 300]], np.float32)
+    cls = np.array([2, 0, 2, 1, 3, 0])
+    assert vectorized(xyxy, cls, w, h, 1.0, 0, 0) == baseline(xyxy, cls, w, h, 1.0, 0, 0)
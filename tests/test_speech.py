@@ -0,0 +1,104 @@
+import threading
+import time
+
+from speech import INFO, URGENT, WARNING, SpeechWorker
+
+
+class BlockingEngine:
+    """pyttsx3 stand-in whose runAndWait blocks until released; stop() interrupts only if `interruptible`."""
+
+    def __init__(self, interruptible=False):
+        self.interruptible = interruptible
+        self.spoken = []
+        self.started = threading.Event()
+        self._release = threading.Event()
+        self._text = None
+
+    def say(self, text):
+        self._text = text
+
+    def runAndWait(self):
+        self.spoken.append(self._text)
+        self.started.set()
+        self._release.wait(2.0)
+        self._release.clear()
+
+    def stop(self):
+        if self.interruptible:
+            self._release.set()
+
+    def release(self):
+        self._release.set()
+
+
+def wait_for(cond, timeout=2.0):
+    deadline = time.time() + timeout
+    while not cond():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def shut_down(worker, engine):
+    engine.interruptible = True
+    engine.release()
+    worker.stop()
+
+
+def speak_first(worker, engine, text):
+    worker.say(text, priority=INFO)
+    assert engine.started.wait(2.0)
+
+
+def test_newer_cue_does_not_drop_a_more_urgent_one():
+    engine = BlockingEngine(interruptible=False)
+    worker = SpeechWorker(engine)
+    try:
+        speak_first(worker, engine, "Person on your left")
+        worker.say("Stop immediately, person ahead", priority=URGENT)
+        worker.say("I see a chair on your right", priority=INFO)
+        assert worker.depth == 2 and worker.max_depth == 2
+        while len(engine.spoken) < 3:
+            engine.release()
+            time.sleep(0.02)
+        assert engine.spoken == ["Person on your left", "Stop immediately, person ahead",
+                                 "I see a chair on your right"]
+    finally:
+        shut_down(worker, engine)
+
+
+def test_newer_cue_replaces_queued_cues_of_same_or_lower_urgency():
+    engine = BlockingEngine()
+    worker = SpeechWorker(engine)
+    try:
+        speak_first(worker, engine, "Person on your left")
+        worker.say("Chair on your right", priority=INFO)
+        worker.say("Car ahead, close", priority=WARNING)
+        worker.say("Door on your left", priority=WARNING)
+        assert worker.depth == 1 and worker.coalesced == 2
+        engine.release()
+        wait_for(lambda: len(engine.spoken) == 2)
+        assert engine.spoken[-1] == "Door on your left"
+        engine.release()
+    finally:
+        shut_down(worker, engine)
+
+
+def test_urgent_cue_preempts_lower_priority_speech():
+    engine = BlockingEngine(interruptible=True)
+    worker = SpeechWorker(engine)
+    try:
+        speak_first(worker, engine, "Person on your left")
+        engine.started.clear()
+        worker.say("Stop immediately, person ahead", priority=URGENT)
+        assert engine.started.wait(2.0)
+        assert worker.preempted == 1
+        assert engine.spoken == ["Person on your left", "Stop immediately, person ahead"]
+        # An urgent cue does not interrupt another urgent cue
+        worker.say("Stop immediately, car ahead", priority=URGENT)
+        assert worker.preempted == 1
+        engine.release()
+        wait_for(lambda: len(engine.spoken) == 3)
+        engine.release()
+    finally:
+        shut_down(worker, engine)
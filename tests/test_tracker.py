@@ -0,0 +1,84 @@
+import numpy as np
+
+from postprocess import CLOSE, MEDIUM, build_priority_table, process_boxes
+from tracker import Tracker
+
+W, H = 640, 480
+PRIO = build_priority_table({0: "person", 1: "chair"}, {"person": 0}, default=1)
+
+
+def dets(*boxes, cls=0):
+    xyxy = np.array(boxes, np.float32).reshape(-1, 4)
+    return process_boxes(xyxy, np.full(len(xyxy), cls), np.ones(len(xyxy), np.float32), W, H, PRIO)
+
+
+def test_matched_tracks_keep_their_id():
+    tracker = Tracker()
+    first = tracker.update(dets([100, 100, 200, 300], [400, 100, 500, 300]), 0.0)
+    second = tracker.update(dets([410, 100, 510, 300], [105, 100, 205, 300]), 0.1)
+    assert first["tid"].tolist() == [0, 1]
+    assert second["tid"].tolist() == [1, 0]
+
+
+def test_other_class_starts_a_new_track():
+    tracker = Tracker()
+    tracker.update(dets([100, 100, 200, 300]), 0.0)
+    out = tracker.update(dets([100, 100, 200, 300], cls=1), 0.1)
+    assert out["tid"].tolist() == [1]
+
+
+def test_unmatched_track_coasts_then_retires():
+    tracker = Tracker(max_coast=0.5)
+    tracker.update(dets([100, 100, 200, 300]), 0.0)
+    tracker.update(dets(), 0.4)
+    assert len(tracker) == 1
+    # A match within max_coast keeps the id
+    assert tracker.update(dets([100, 100, 200, 300]), 0.45)["tid"].tolist() == [0]
+    tracker.update(dets(), 0.9)
+    assert len(tracker) == 1
+    tracker.update(dets(), 1.0)
+    assert len(tracker) == 0
+    assert tracker.update(dets([100, 100, 200, 300]), 1.1)["tid"].tolist() == [1]
+
+
+def test_predict_extrapolates_and_refreshes_geometry():
+    tracker = Tracker(max_extrapolate=0.8, smoothing=1.0)
+    tracker.update(dets([300, 100, 340, 280]), 0.0)
+    last = tracker.update(dets([290, 100, 330, 290]), 0.1)   # moving left and growing at 100 px/s
+    out = tracker.predict(0.3, W, H)
+    assert np.allclose([out["x1"][0], out["y2"][0]], [270, 310])
+    assert out["tid"][0] == 0
+    assert last["dist"][0] == MEDIUM and out["dist"][0] == CLOSE
+    # Velocity is applied for at most max_extrapolate seconds, and boxes stay inside the frame
+    far = tracker.predict(2.0, W, H)
+    assert np.allclose([far["x1"][0], far["y2"][0]], [210, 370])
+    assert tracker.predict(1.5, W, H)["x1"][0] == far["x1"][0]
+    assert (tracker.predict(0.9, 100, 100)["y2"] <= 100).all()
+
+
+def test_predict_expires_tracks_when_updates_stop():
+    tracker = Tracker(max_coast=0.5, max_gap=2.0)
+    tracker.update(dets([100, 100, 200, 300]), 0.0)
+    # Between inference ticks, and across a slow tick, the track is still reported
+    assert len(tracker.predict(1.0, W, H)) == 1
+    assert len(tracker.predict(2.5, W, H)) == 1
+    # Updates stopped: the track is dropped rather than reported forever
+    assert len(tracker.predict(2.6, W, H)) == 0
+    assert len(tracker.predict(30.0, W, H)) == 0
+
+
+def test_predict_drops_only_stale_tracks():
+    tracker = Tracker(max_coast=0.5, max_gap=1.0)
+    tracker.update(dets([100, 100, 200, 300]), 0.0)
+    tracker.update(dets([100, 100, 200, 300], [400, 100, 500, 300]), 0.4)
+    tracker.update(dets([400, 100, 500, 300]), 0.8)
+    out = tracker.predict(2.0, W, H)
+    assert out["tid"].tolist() == [1]
+    assert len(tracker) == 2
+
+
+def test_reset_clears_tracks():
+    tracker = Tracker()
+    tracker.update(dets([100, 100, 200, 300]), 0.0)
+    tracker.reset()
+    assert len(tracker) == 0 and len(tracker.predict(0.1, W, H)) == 0
@@ -0,0 +1,123 @@
+import threading
+
+import numpy as np
+
+from postprocess import EMPTY_DETS, DIR_SPLIT, refresh_geometry
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy arrays."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def _xyxy(dets):
+    return np.stack([dets["x1"], dets["y1"], dets["x2"], dets["y2"]], axis=1)
+
+
+class Tracker:
+    """
+    Cheap IoU tracker with a constant-velocity box model.
+    update() runs on inference ticks and assigns stable track ids; predict() runs on every
+    frame in between and extrapolates the boxes (and their distance/direction buckets)
+    to the current time. Safe to call update() and predict() from different threads.
+    If updates stop (inference stalled or failing), predict() drops tracks once they are
+    older than max_coast + max_gap instead of reporting them indefinitely.
+    """
+
+    def __init__(self, iou_thresh=0.3, max_coast=0.5, max_extrapolate=0.8, smoothing=0.6,
+                 dir_split=DIR_SPLIT, max_gap=2.0):
+        self.iou_thresh = iou_thresh
+        self.max_coast = max_coast              # seconds a track survives without a match
+        self.max_extrapolate = max_extrapolate  # seconds of velocity applied at most
+        self.smoothing = smoothing              # weight of the newest velocity measurement
+        self.max_gap = max_gap                  # longest expected wait between update() calls
+        self.dir_split = dir_split
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._tracks = EMPTY_DETS.copy()
+        self._vel = np.zeros((0, 4), dtype=np.float32)     # px/s for x1, y1, x2, y2
+        self._stamp = np.zeros(0, dtype=np.float64)        # time of last matched detection
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def _extrapolate(self, t):
+        dt = np.clip(t - self._stamp, 0.0, self.max_extrapolate)[:, None]
+        return _xyxy(self._tracks) + self._vel * dt
+
+    def update(self, dets, t):
+        """Associates fresh detections with existing tracks. Returns dets with `tid` filled in."""
+        dets = dets.copy()
+        with self._lock:
+            pred = self._extrapolate(t)
+            boxes = _xyxy(dets)
+            iou = iou_matrix(pred, boxes)
+            # Only associate boxes of the same class
+            iou[self._tracks["cls"][:, None] != dets["cls"][None, :]] = 0.0
+
+            track_idx, det_idx = [], []
+            if iou.size:
+                order = np.argsort(iou, axis=None)[::-1]
+                used_t, used_d = set(), set()
+                for flat in order:
+                    ti, di = divmod(int(flat), iou.shape[1])
+                    if iou[ti, di] < self.iou_thresh:
+                        break
+                    if ti in used_t or di in used_d:
+                        continue
+                    used_t.add(ti); used_d.add(di)
+                    track_idx.append(ti); det_idx.append(di)
+            track_idx = np.asarray(track_idx, dtype=np.intp)
+            det_idx = np.asarray(det_idx, dtype=np.intp)
+
+            # Matched tracks: blend the measured velocity into the estimate
+            if len(track_idx):
+                dt = np.maximum(t - self._stamp[track_idx], 1e-3)[:, None]
+                measured = (boxes[det_idx] - _xyxy(self._tracks[track_idx])) / dt
+                self._vel[track_idx] = self.smoothing * measured + (1 - self.smoothing) * self._vel[track_idx]
+                dets["tid"][det_idx] = self._tracks["tid"][track_idx]
+                self._tracks[track_idx] = dets[det_idx]
+                self._stamp[track_idx] = t
+
+            # Unmatched detections start new tracks
+            new = np.setdiff1d(np.arange(len(dets)), det_idx, assume_unique=True)
+            if len(new):
+                dets["tid"][new] = np.arange(self._next_id, self._next_id + len(new))
+                self._next_id += len(new)
+                self._tracks = np.concatenate([self._tracks, dets[new]])
+                self._vel = np.concatenate([self._vel, np.zeros((len(new), 4), np.float32)])
+                self._stamp = np.concatenate([self._stamp, np.full(len(new), t)])
+
+            # Retire tracks that have coasted too long
+            keep = (t - self._stamp) <= self.max_coast
+            if not keep.all():
+                self._tracks, self._vel, self._stamp = self._tracks[keep], self._vel[keep], self._stamp[keep]
+        return dets
+
+    def predict(self, t, frame_w, frame_h):
+        """Tracks extrapolated to time t, with distance/direction/area recomputed."""
+        with self._lock:
+            live = (t - self._stamp) <= self.max_coast + self.max_gap
+            if not live.any():
+                return EMPTY_DETS
+            boxes = self._extrapolate(t)[live]
+            out = self._tracks[live]
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, frame_w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, frame_h)
+        out["x1"], out["y1"], out["x2"], out["y2"] = boxes.T
+        return refresh_geometry(out, frame_w, frame_h, self.dir_split)
+
+    def reset(self):
+        with self._lock:
+            self._tracks = EMPTY_DETS.copy()
+            self._vel = np.zeros((0, 4), dtype=np.float32)
+            self._stamp = np.zeros(0, dtype=np.float64)
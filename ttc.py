@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+
+from postprocess import CLOSE, DIR_SPLIT, VERY_CLOSE
+
+# --- TIME TO COLLISION ---
+# A depth proxy between detector ticks. Sparse corners are tracked with pyramidal Lucas-Kanade on a
+# small grayscale frame; the median change of the distances between the points inside a region
+# is its expansion (looming) rate, and time to contact is 1 / rate. Walking towards a static
+# obstacle makes it loom just like an approaching one, which is what a collision cue wants.
+
+TTC_VERY_CLOSE = 1.0   # s
+TTC_CLOSE = 2.0        # s
+
+
+def ttc_level(ttc):
+    """Distance level a time to contact implies (VERY_CLOSE / CLOSE), or None."""
+    if ttc < TTC_VERY_CLOSE: return VERY_CLOSE
+    if ttc < TTC_CLOSE: return CLOSE
+    return None
+
+
+def raise_urgency(dets, box_ttc):
+    """Lowers detections' distance levels (in place) to what their TTC implies. Returns how many changed."""
+    if not len(dets):
+        return 0
+    level = np.where(box_ttc < TTC_VERY_CLOSE, VERY_CLOSE, np.where(box_ttc < TTC_CLOSE, CLOSE, 255))
+    changed = level < dets["dist"]
+    dets["dist"][changed] = level[changed]
+    return int(changed.sum())
+
+
+class LoomingEstimator:
+    """
+    Per-frame TTC for the center zone (the CENTER direction band below `zone_top`) and for each
+    detection box. A few ms per frame on one core at the default 160 px working width.
+    """
+
+    def __init__(self, width=160, max_points=120, min_points=5, max_pair_points=24, refresh_every=8,
+                 dir_split=DIR_SPLIT, zone_top=0.25, alpha=0.4):
+        self.width = width
+        self.max_points = max_points
+        self.min_points = min_points            # fewer tracked points than this in a region: no estimate
+        self.max_pair_points = max_pair_points  # caps the pairwise-distance work per region
+        self.refresh_every = refresh_every      # re-detect corners every N frames
+        self.dir_split = dir_split
+        self.zone_top = zone_top
+        self.alpha = alpha                      # EWMA weight of the newest expansion rate
+        self.lk = dict(winSize=(15, 15), maxLevel=2,
+                       criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self._prev = None
+        self._pts = None
+        self._t = None
+        self._frames = 0
+        self._rates = {}   # "center" / track id -> smoothed expansion rate (1/s)
+        self.center_ttc = np.inf
+
+    def _features(self, gray):
+        return cv2.goodFeaturesToTrack(gray, self.max_points, 0.01, 5)
+
+    def _rate(self, p0, p1, box, dt):
+        x1, y1, x2, y2 = box
+        inside = (p0[:, 0] >= x1) & (p0[:, 0] <= x2) & (p0[:, 1] >= y1) & (p0[:, 1] <= y2)
+        if inside.sum() < self.min_points:
+            return None
+        a, b = p0[inside][:self.max_pair_points], p1[inside][:self.max_pair_points]
+        iu = np.triu_indices(len(a), 1)
+        d0 = np.linalg.norm(a[:, None] - a[None], axis=2)[iu]
+        d1 = np.linalg.norm(b[:, None] - b[None], axis=2)[iu]
+        keep = d0 > 2.0   # near-coincident points only add noise
+        if not keep.any():
+            return None
+        return (float(np.median(d1[keep] / d0[keep])) - 1.0) / dt
+
+    def _smooth(self, key, rate):
+        prev = self._rates.get(key)
+        if rate is None:
+            return prev
+        rate = rate if prev is None else prev + self.alpha * (rate - prev)
+        self._rates[key] = rate
+        return rate
+
+    @staticmethod
+    def _to_ttc(rate):
+        return 1.0 / rate if rate is not None and rate > 1e-3 else np.inf
+
+    def update(self, frame_bgr, now, dets=None):
+        """Returns (center TTC, per-detection TTC array) in seconds; inf = not approaching / unknown."""
+        h, w = frame_bgr.shape[:2]
+        s = self.width / w
+        gray = cv2.cvtColor(cv2.resize(frame_bgr, (self.width, max(1, int(h * s))), interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+        n = 0 if dets is None else len(dets)
+        box_ttc = np.full(n, np.inf, np.float32)
+        prev, pts, t_prev = self._prev, self._pts, self._t
+        self._prev, self._t = gray, now
+        if prev is None or pts is None or len(pts) < self.min_points or prev.shape != gray.shape or now <= t_prev:
+            self._pts = self._features(gray)
+            self._rates.clear()
+            self.center_ttc = np.inf
+            return self.center_ttc, box_ttc
+
+        new, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, pts, None, **self.lk)
+        ok = status.reshape(-1) == 1
+        p0, p1 = pts.reshape(-1, 2)[ok], new.reshape(-1, 2)[ok]
+        dt = now - t_prev
+
+        gh, gw = gray.shape
+        zone = (self.dir_split[0] * gw, self.zone_top * gh, self.dir_split[1] * gw, gh)
+        self.center_ttc = self._to_ttc(self._smooth("center", self._rate(p0, p1, zone, dt)))
+        live = {"center"}
+        for i in range(n):
+            d = dets[i]
+            # Inner 80% of the box: points on its edge are often background
+            mx, my = (d["x2"] - d["x1"]) * 0.1, (d["y2"] - d["y1"]) * 0.1
+            rate = self._rate(p0, p1, ((d["x1"] + mx) * s, (d["y1"] + my) * s, (d["x2"] - mx) * s, (d["y2"] - my) * s), dt)
+            if d["tid"] >= 0:
+                # Tracked boxes keep a smoothed rate across frames
+                key = int(d["tid"])
+                live.add(key)
+                rate = self._smooth(key, rate)
+            box_ttc[i] = self._to_ttc(rate)
+        for key in [k for k in self._rates if k not in live]:
+            del self._rates[key]
+
+        self._frames += 1
+        if self._frames % self.refresh_every == 0 or len(p1) < self.max_points // 2:
+            self._pts = self._features(gray)
+        else:
+            self._pts = p1.reshape(-1, 1, 2)
+        return self.center_ttc, box_ttc